@@ -0,0 +1,277 @@
+# -*- coding: utf-8 -*-
+import inspect
+import json
+from pathlib import Path
+
+from FBD.core.cache import source_signature, staged_dir
+from FBD.core.config import Config
+from FBD.core.events import Events
+from FBD.core.lazy import lazy_import
+
+np = lazy_import("numpy")
+pd = lazy_import("pandas")
+
+
+def _codes_dtype(n: int):
+    """Integer dtype pandas uses for the codes of a Categorical with n categories."""
+    for dtype in (np.int8, np.int16, np.int32):
+        if n < np.iinfo(dtype).max:
+            return dtype
+    return np.int64
+
+
+def _key(value) -> str:
+    """Dictionary key of a value: strings as themselves, anything else as NUL + its JSON text."""
+    if isinstance(value, str):
+        return value
+    if isinstance(value, float) and value != value:
+        value = None
+    return "\x00" + json.dumps(value, ensure_ascii=False, default=str)
+
+
+class _ColumnWriter:
+    """
+    Collects one column over the chunks of a parse. Numeric and boolean
+    columns are kept as arrays; anything else is dictionary-encoded, with
+    the distinct values keyed by _key so that a column can move from
+    numeric to strings, or to unhashable values, between chunks.
+    """
+
+    def __init__(self, name):
+        self.name = name
+        self.kind = None  # "numeric", "category" or "object"
+        self._arrays = []
+        self._codes = {}
+
+    def update(self, series) -> None:
+        numeric = pd.api.types.is_numeric_dtype(series.dtype) or pd.api.types.is_bool_dtype(series.dtype)
+        if self.kind in (None, "numeric") and numeric:
+            self.kind = "numeric"
+            self._arrays.append(series.to_numpy())
+            return
+
+        if self.kind == "numeric":
+            arrays, self._arrays = self._arrays, []
+            self.kind = "category"
+            for array in arrays:
+                self._encode(pd.Series(array, dtype=object))
+        self.kind = self.kind if self.kind == "object" else "category"
+        self._encode(series)
+
+    def _encode(self, series) -> None:
+        values = series.to_numpy(dtype=object)
+        if self.kind == "category":
+            try:
+                codes, uniques = pd.factorize(values)
+                keys = [_key(v) for v in uniques]
+            except TypeError:
+                self.kind = "object"
+        known = self._codes
+        if self.kind == "object":
+            # Not pd.factorize: its string hashing stops at the NUL that prefixes these keys.
+            self._arrays.append(np.array([known.setdefault(_key(v), len(known)) for v in values], dtype=np.int64))
+            return
+
+        mapping = np.array([known.setdefault(k, len(known)) for k in keys] + [-1], dtype=np.int64)
+        self._arrays.append(mapping[codes])
+
+    def finish(self, directory: Path, stem: str) -> dict:
+        if self.kind == "numeric":
+            values = np.concatenate(self._arrays) if self._arrays else np.empty(0)
+            np.save(directory / f"{stem}.npy", values)
+            present = values[~np.isnan(values)] if values.dtype.kind == "f" else values
+            return {
+                "name": self.name, "kind": "numeric", "dtype": values.dtype.str,
+                "distinct": len(pd.unique(present)),
+                "min": present.min().item() if present.size else None,
+                "max": present.max().item() if present.size else None,
+            }
+
+        codes = np.concatenate(self._arrays) if self._arrays else np.empty(0, dtype=np.int64)
+        np.save(directory / f"{stem}.npy", codes.astype(_codes_dtype(len(self._codes))))
+
+        # Plain strings are stored NUL-separated and split in one call on load;
+        # columns holding other values fall back to one JSON text per value.
+        keys = list(self._codes)
+        text = "\x00".join(keys)
+        strings = text.count("\x00") == max(len(keys) - 1, 0) and not text.startswith("\x00")
+        if strings:
+            encoding = "text"
+        else:
+            encoding = "json"
+            text = "\n".join(k[1:] if k.startswith("\x00") else json.dumps(k, ensure_ascii=False) for k in keys)
+        with open(directory / f"{stem}.values.txt", "w", encoding="utf-8", newline="") as fh:
+            fh.write(text)
+
+        # min/max only when every value is a string, so that they compare meaningfully.
+        ordered = strings and self.kind != "object" and keys
+        return {
+            "name": self.name, "kind": self.kind or "category", "categories": len(keys), "encoding": encoding,
+            "distinct": len(keys), "min": min(keys) if ordered else None, "max": max(keys) if ordered else None,
+        }
+
+
+class _FrameWriter:
+    """Collects the columns of a DataFrame over its chunks; see _ColumnWriter."""
+
+    def __init__(self):
+        self.rows = 0
+        self._writers = None
+
+    def update(self, chunk) -> None:
+        if self._writers is None:
+            self._writers = [_ColumnWriter(name) for name in chunk.columns]
+        for writer, (_, series) in zip(self._writers, chunk.items()):
+            writer.update(series)
+        self.rows += len(chunk)
+
+    def finish(self, directory: Path) -> dict:
+        """Write the column files to directory; returns their "rows" and "columns" metadata."""
+        columns = [writer.finish(directory, f"c{i}") for i, writer in enumerate(self._writers or [])]
+        return {"rows": self.rows, "columns": columns}
+
+
+def _read_frame(directory: Path, meta: dict, columns: list[str] | None = None):
+    """The DataFrame written to directory by _FrameWriter (meta being its finish() result)."""
+    stored = {column["name"]: (i, column) for i, column in enumerate(meta["columns"])}
+    missing = [c for c in columns or () if c not in stored]
+    if missing:
+        raise ValueError(f"Unknown columns: {missing}")
+
+    data = {}
+    for name in columns or list(stored):
+        i, column = stored[name]
+        data[name] = _read_column(directory, f"c{i}", column)
+    return pd.DataFrame(data, index=pd.RangeIndex(meta["rows"]), copy=False)
+
+
+def _read_column(directory: Path, stem: str, column: dict):
+    values = np.load(directory / f"{stem}.npy", mmap_mode="r")
+    if column["kind"] == "numeric":
+        return pd.Series(values, copy=False)
+
+    with open(directory / f"{stem}.values.txt", "r", encoding="utf-8", newline="") as fh:
+        text = fh.read()
+    if not column["categories"]:
+        categories = []
+    elif column["encoding"] == "text":
+        categories = text.split("\x00")
+    else:
+        categories = [json.loads(line) for line in text.split("\n")]
+    if column["kind"] == "object":
+        lookup = np.empty(len(categories) + 1, dtype=object)
+        lookup[:-1] = categories
+        return pd.Series(lookup[values], dtype=object)
+
+    dtype = pd.CategoricalDtype(pd.Index(categories, dtype=object))
+    return pd.Series(pd.Categorical.from_codes(values, dtype=dtype, validate=False), copy=False)
+
+
+class ColumnarCache:
+    """
+    Parsed datasets persisted column by column as .npy files under
+    Config.CACHE_DIR / "columnar" / <dataset>, and loaded back as
+    DataFrames whose columns are read-only memory maps of those files.
+
+    Numeric and boolean columns map directly; text columns are stored as
+    Categoricals, whose integer codes map directly and whose distinct
+    values are decoded on load. Processes loading the same dataset
+    therefore share the pages of the column data through the OS page
+    cache, and only hold their own copy of the distinct values. Columns of
+    nested values (dicts, lists) are decoded into regular object columns.
+
+    All attributes and methods are class-level; the class is not
+    instantiated. A cached dataset records the signature of the file it was
+    parsed from and is rebuilt once that file changes.
+    """
+
+    FORMAT_VERSION = 2
+    CHUNKSIZE = 100_000
+
+    @classmethod
+    def path(cls, dataset: str) -> Path:
+        return Path(Config.CACHE_DIR) / "columnar" / dataset.replace("/", "_")
+
+    @classmethod
+    def meta(cls, dataset: str) -> dict | None:
+        try:
+            with open(cls.path(dataset) / "meta.json", "r", encoding="utf-8") as fh:
+                meta = json.load(fh)
+        except (OSError, json.JSONDecodeError):
+            return None
+        return meta if meta.get("version") == cls.FORMAT_VERSION else None
+
+    @classmethod
+    def write(cls, dataset: str, chunks, local_path=None) -> Path:
+        """
+        Persist a DataFrame or an iterable of DataFrame chunks as dataset's
+        columnar cache, replacing any previous one. local_path is the
+        source file whose signature makes the cache fresh.
+
+        The files are written to a private directory and moved into place
+        with a rename, so concurrent writers and readers never see a
+        partial cache. Emits a "columnar.write" event with the rows written.
+        """
+        if isinstance(chunks, pd.DataFrame):
+            chunks = [chunks]
+
+        target = cls.path(dataset)
+        with Events.span("columnar.write", dataset=dataset) as event:
+            with staged_dir(target) as staging:
+                writer = _FrameWriter()
+                for chunk in chunks:
+                    writer.update(chunk)
+                meta = {
+                    "version": cls.FORMAT_VERSION,
+                    "dataset": dataset,
+                    "source": None if local_path is None else source_signature(local_path),
+                    **writer.finish(staging),
+                }
+                with open(staging / "meta.json", "w", encoding="utf-8") as fh:
+                    json.dump(meta, fh, ensure_ascii=False)
+            event["rows"] = meta["rows"]
+        return target
+
+    @classmethod
+    def load(cls, dataset: str, columns: list[str] | None = None, local_path=None):
+        """
+        The cached DataFrame (only the given columns, if any), or None when
+        there is no cache or, with local_path, it was built from another
+        version of that file.
+        """
+        meta = cls.meta(dataset)
+        if meta is None:
+            return None
+        if local_path is not None and meta.get("source") != source_signature(local_path):
+            return None
+
+        try:
+            return _read_frame(cls.path(dataset), meta, columns)
+        except OSError:
+            return None
+
+    @classmethod
+    def get(cls, dataset: str, columns: list[str] | None = None, refresh: bool = False, **download_options):
+        """
+        dataset as a memory-mapped DataFrame: from the columnar cache while
+        it matches the downloaded file, otherwise downloaded (or read from
+        the download cache), parsed in chunks and written first. refresh
+        re-downloads the file. download_options go to
+        Downloader.download_asset.
+        """
+        from FBD.client.downloader import Downloader
+        from FBD.client.parser_dispatcher import ParserDispatcher
+
+        asset = Downloader.download_asset(dataset, refresh=refresh, **download_options)
+        if asset.get("status") != "ok":
+            raise ValueError(asset.get("message", f"Download of '{dataset}' failed"))
+
+        df = cls.load(dataset, columns, local_path=asset["local_path"])
+        if df is not None:
+            return df
+
+        chunks = ParserDispatcher.parse(dataset, asset["local_path"], asset["metadata"], chunksize=cls.CHUNKSIZE)
+        if not isinstance(chunks, pd.DataFrame) and not inspect.isgenerator(chunks):
+            raise ValueError(f"Dataset '{dataset}' is not tabular")
+        cls.write(dataset, chunks, asset["local_path"])
+        return cls.load(dataset, columns)
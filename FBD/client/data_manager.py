@@ -1,6 +1,9 @@
 # -*- coding: utf-8 -*-
-import requests
 from FBD.core.config import Config
+from FBD.core.events import Events
+from FBD.core.lazy import lazy_import
+
+requests = lazy_import("requests")
 
 
 class DataManager:
@@ -13,11 +16,16 @@ class DataManager:
 
     @staticmethod
     def _get(path: str, params: dict | None = None) -> dict:
-        """Perform a GET request to the edge function and return the JSON payload."""
+        """
+        Perform a GET request to the edge function and return the JSON
+        payload. Emits an "http.request" event with the path as endpoint.
+        """
         url = f"{Config.EDGE_FUNCTION_URL}/{path}"
-        response = requests.get(url, params=params, timeout=10)
-        response.raise_for_status()
-        return response.json()
+        with Events.span("http.request", endpoint=path) as event:
+            response = requests.get(url, params=params, timeout=10)
+            event["status_code"] = response.status_code
+            response.raise_for_status()
+            return response.json()
 
     @staticmethod
     def get_categories() -> list[str]:
@@ -0,0 +1,126 @@
+# -*- coding: utf-8 -*-
+from pathlib import Path
+
+from FBD.client.downloader import Downloader
+from FBD.client.parse import Parse, STREAMING_PARSERS
+
+
+class DatasetHandle:
+    """
+    Lazy view of one dataset for exploration. Creating it costs nothing;
+    metadata is resolved on first use (from the metadata cache when
+    possible) and columns, head() and estimate_rows() parse only the start
+    of the file: the cached copy if there is one, otherwise the first bytes
+    of the HTTP response, without downloading the file or using a
+    rate-limit slot. load() runs the full download_file.
+
+    Previews are available for the parser types that can be parsed from a
+    prefix (STREAMING_PARSERS: tsv, fb, json). The prefix starts at
+    PREVIEW_BYTES and grows geometrically until it holds the requested rows.
+    """
+
+    PREVIEW_BYTES = 1 << 20
+    MAX_PREVIEW_BYTES = 256 << 20
+
+    def __init__(self, dataset: str, refresh: bool = False):
+        if not dataset:
+            raise ValueError("No dataset provided")
+        self.dataset = dataset
+        self.refresh = refresh
+        self._metadata = None
+        self._prefix = None
+        self._preview = None
+
+    def __repr__(self):
+        return f"<DatasetHandle {self.dataset!r}>"
+
+    @property
+    def metadata(self) -> dict:
+        """Dataset metadata: filename, link, header, parser_type, parse_config."""
+        if self._metadata is None:
+            metadata = Downloader.dataset_metadata(self.dataset, refresh=self.refresh)
+            if metadata.get("status") != "ok":
+                raise ValueError(metadata.get("message", f"Dataset '{self.dataset}' not found"))
+            self._metadata = metadata
+        return self._metadata
+
+    @property
+    def parser_type(self) -> str | None:
+        return self.metadata.get("parser_type")
+
+    @property
+    def local_path(self) -> Path | None:
+        """Decompressed file in the download cache, or None if it was never downloaded."""
+        return Downloader.local_path(self.metadata)
+
+    @property
+    def cached(self) -> bool:
+        return self.local_path is not None
+
+    @property
+    def columns(self) -> list[str]:
+        """Column names of the parsed dataset."""
+        config = self.metadata.get("parse_config") or {}
+        if self.parser_type == "fb":
+            return list(config["columns"])
+        return list(self._preview_rows(1).columns)
+
+    def head(self, n: int = 5):
+        """First n rows, exactly as download_file would return them."""
+        return self._preview_rows(n).head(n)
+
+    def estimate_rows(self) -> int | None:
+        """
+        Row count extrapolated from the rows per byte of the preview prefix
+        and the file size (for a compressed download, itself extrapolated
+        from the prefix's compression ratio). Exact when the whole file fits
+        in the prefix; None when the size is unknown.
+        """
+        df = self._preview_rows(1)
+        prefix = self._prefix
+        if prefix["eof"]:
+            return len(df)
+        if prefix["size"] is None or not prefix["data"]:
+            return None
+        return round(len(df) * prefix["size"] / len(prefix["data"]))
+
+    def load(self, **kwargs):
+        """
+        Full download and parse; keyword arguments are those of
+        Downloader.download_file (columns, chunksize, refresh, wait, ...).
+        """
+        result = Downloader.download_file(self.dataset, **kwargs)
+        if result.get("status") != "ok" or "data" not in result:
+            raise ValueError(result.get("message", "Download failed"))
+        return result["data"]
+
+    def _preview_rows(self, n: int):
+        """Parsed preview holding at least n rows, or the whole file if it is shorter."""
+        if self.parser_type not in STREAMING_PARSERS:
+            raise ValueError(
+                f"No preview for parser_type '{self.parser_type}' ('{self.dataset}'); use load()"
+            )
+
+        size = self.PREVIEW_BYTES if self._prefix is None else len(self._prefix["data"])
+        while True:
+            if self._preview is None:
+                self._prefix = Downloader.read_prefix(self.dataset, self.metadata, size)
+                try:
+                    self._preview = Parse.parse_prefix(
+                        self._prefix["data"],
+                        self.parser_type,
+                        self.metadata.get("parse_config"),
+                        self.metadata.get("header"),
+                        eof=self._prefix["eof"],
+                    )
+                except (RuntimeError, ValueError):
+                    if self._prefix["eof"] or size >= self.MAX_PREVIEW_BYTES:
+                        raise
+
+            if self._preview is not None and (len(self._preview) >= n or self._prefix["eof"]):
+                return self._preview
+            if size >= self.MAX_PREVIEW_BYTES:
+                raise ValueError(f"Fewer than {n} rows in the first {size} bytes of '{self.dataset}'")
+
+            size *= 4
+            self._preview = None
@@ -1,11 +1,22 @@
 # -*- coding: utf-8 -*-
 import json
-import requests
 from pathlib import Path
 from FBD.core.config import Config
-from FBD.core.rate_limiter import RateLimiter
+from FBD.core.events import Events
+from FBD.core.profiling import Profile
+from FBD.core.lazy import lazy_import
+from FBD.core.rate_limiter import RateLimiter, RateLimitExceeded
+from FBD.client.formats import FileFormat
+from FBD.client.id_index import IdentifierStore
+from FBD.client.text_index import ContentStore
 from FBD.client.parse import Parse
+from FBD.client.partitions import PartitionedCache
 from FBD.client.parser_dispatcher import ParserDispatcher
+from FBD.client.pipeline import DownloadStream, inflate
+from FBD.client.sql_store import SQLStore
+from FBD.client.transfer import Transfer
+
+requests = lazy_import("requests")
 
 _rate_limiter = RateLimiter()
 
@@ -28,14 +39,18 @@ class Downloader:
                 "partial"   -> one partial match
                 "multiple"  -> multiple partial matches
                 "not_found" -> no matches
+
+        Emits an "http.request" event (endpoint "search").
         """
-        response = requests.get(
-            f"{Config.EDGE_FUNCTION_URL}/search",
-            params={"q": dataset},
-            timeout=10,
-        )
-        response.raise_for_status()
-        data = response.json()
+        with Events.span("http.request", endpoint="search", dataset=dataset) as event:
+            response = requests.get(
+                f"{Config.EDGE_FUNCTION_URL}/search",
+                params={"q": dataset},
+                timeout=10,
+            )
+            event["status_code"] = response.status_code
+            response.raise_for_status()
+            data = response.json()
 
         status = data.get("status")
 
@@ -93,6 +108,9 @@ class Downloader:
             "parser_type": metadata.get("parser_type"),
             "parse_config": metadata.get("parse_config"),
         }
+        for key in (FileFormat.METADATA_KEY, FileFormat.PROBES_KEY):
+            if key in metadata:
+                cache_payload[key] = metadata[key]
         try:
             with open(cache_path, "w", encoding="utf-8") as fh:
                 json.dump(cache_payload, fh, indent=2, ensure_ascii=False)
@@ -132,13 +150,153 @@ class Downloader:
                 ),
             }
 
+        cls._describe_local_file(dataset, local_path, metadata)
         return {
             "status": "ok",
             "file": dataset,
             "local_path": local_path,
             "metadata": metadata,
+            "cache_hit": True,
         }
 
+    @classmethod
+    def _describe_local_file(cls, dataset: str, local_path: Path, metadata: dict) -> None:
+        """Record the local file's compression in metadata and persist it if it changed."""
+        try:
+            changed = FileFormat.describe(local_path, metadata)
+        except OSError:
+            return
+        if changed:
+            cls._save_metadata_cache(dataset, metadata)
+
+    @classmethod
+    def _observe_transfer(cls, dataset: str, local_path: Path, metadata: dict) -> None:
+        """Hooks run once a new copy of dataset's file is in place."""
+        cls._describe_local_file(dataset, local_path, metadata)
+        SQLStore.observe_download(dataset, local_path, metadata)
+
+    @classmethod
+    def _start_stream(cls, dataset: str, metadata: dict, file_url: str, local_path: Path, progress) -> dict:
+        response = requests.get(file_url, stream=True, timeout=60)
+        try:
+            response.raise_for_status()
+        except Exception:
+            response.close()
+            raise
+
+        download = DownloadStream(
+            response,
+            local_path,
+            compression="gzip" if metadata["filename"].endswith(".gz") else None,
+            scanner=Parse.stream_scanner(metadata.get("parser_type"), metadata.get("header")),
+            progress=progress,
+            on_complete=lambda path: cls._observe_transfer(dataset, path, metadata),
+            dataset=dataset,
+        ).start()
+        return {
+            "status": "ok",
+            "file": dataset,
+            "local_path": local_path,
+            "metadata": metadata,
+            "cache_hit": False,
+            "stream": download,
+        }
+
+    @classmethod
+    def dataset_metadata(cls, dataset: str, refresh: bool = False) -> dict:
+        """
+        Metadata of an exact dataset match as download_asset resolves it:
+        from the local metadata cache when present (unless refresh), else
+        from the edge function, which is then cached. Returns a dict with
+        status "ok" plus the metadata fields, or the failed search result.
+        """
+        if not refresh:
+            cached_metadata = cls._load_metadata_cache(dataset)
+            Events.emit("metadata.cache", dataset=dataset, cache_hit=cached_metadata is not None)
+            if cached_metadata is not None:
+                return cached_metadata
+
+        search_result = cls.search_file(dataset)
+        if search_result.get("status") == "ok":
+            cls._save_metadata_cache(dataset, search_result)
+        return search_result
+
+    @classmethod
+    def local_path(cls, metadata: dict) -> Path | None:
+        """Path of the dataset's decompressed file in the download cache, or None if it is not there."""
+        local_path = cls._local_asset_path(metadata)
+        return local_path if local_path is not None and local_path.exists() else None
+
+    @classmethod
+    def read_prefix(cls, dataset: str, metadata: dict, size: int) -> dict:
+        """
+        Read the first size bytes of a dataset file as it is parsed (that
+        is, decompressed), from the download cache when the file is there
+        and otherwise from the start of the HTTP response, which is closed
+        as soon as enough has arrived. Nothing is written to disk and no
+        rate-limit slot is used.
+
+        Returns a dict with "data" (bytes), "eof" (True when data is the
+        whole file), "source" ("cache" or "http") and "size", the plain
+        file size: exact for plain files, extrapolated from the compression
+        ratio of the prefix for compressed downloads, None if unknown.
+
+        Emits a "download.preview" event.
+        """
+        with Events.span("download.preview", dataset=dataset, size=size) as event:
+            local_path = cls.local_path(metadata)
+            if local_path is not None:
+                compression = FileFormat.compression(local_path, metadata)
+                with FileFormat.open(local_path, "rb", compression=compression) as f:
+                    data = f.read(size + 1)
+                eof = len(data) <= size
+                if eof:
+                    total = len(data)
+                elif compression is None:
+                    total = local_path.stat().st_size
+                else:
+                    total = None
+                result = {"data": data[:size], "eof": eof, "source": "cache", "size": total}
+            else:
+                result = cls._read_http_prefix(metadata, size)
+                event["bytes"] = result.pop("received")
+            event["source"] = result["source"]
+        return result
+
+    @classmethod
+    def _read_http_prefix(cls, metadata: dict, size: int) -> dict:
+        response = requests.get(metadata["link"], stream=True, timeout=60)
+        try:
+            response.raise_for_status()
+            compressed = metadata["filename"].endswith(".gz")
+            received = 0
+
+            def blocks():
+                nonlocal received
+                for block in Transfer.iter_into(response, buffer_size=1 << 16):
+                    received += len(block)
+                    yield block if compressed else bytes(block)
+
+            data = bytearray()
+            eof = True
+            for plain in inflate(blocks()) if compressed else blocks():
+                data += plain
+                if len(data) > size:
+                    eof = False
+                    break
+            length = Transfer.content_length(response)
+        finally:
+            response.close()
+
+        if eof:
+            total = len(data)
+        elif length is None:
+            total = None
+        else:
+            total = round(length * len(data) / received) if compressed else length
+
+        return {"data": bytes(data[:size]), "eof": eof, "source": "http", "size": total, "received": received}
+
     @classmethod
     def _rate_limit_cached_fallback(cls, dataset: str, metadata: dict | None, exc: RuntimeError) -> dict:
         if metadata is not None:
@@ -146,37 +304,147 @@ class Downloader:
             if cached_result.get("status") == "ok":
                 return cached_result
 
-        return {
+        result = {
             "status": "error",
             "message": str(exc),
         }
+        if isinstance(exc, RateLimitExceeded):
+            result["retry_after"] = exc.retry_after
+        return result
+
+    @classmethod
+    def rate_limit_status(cls) -> dict:
+        """
+        Current download budget accounting. Only real file transfers are
+        counted; cache hits never consume a slot.
+        """
+        return _rate_limiter.usage()
 
     @classmethod
-    def download_file(cls, dataset: str) -> dict:
+    def estimate_wait(cls, priority: int = 0) -> float:
+        """
+        Estimated seconds until a download with the given priority gets a
+        rate-limit slot (0.0 when one is available right away).
+        """
+        return _rate_limiter.estimate_wait(priority)
+
+    @classmethod
+    def download_file(
+        cls,
+        dataset: str,
+        wait: bool | None = None,
+        priority: int = 0,
+        deadline: float | None = None,
+        refresh: bool = False,
+        columns: list[str] | None = None,
+        chunksize: int | None = None,
+        profile: bool = False,
+        progress=None,
+        pipeline: bool = False,
+        where: dict | None = None,
+    ) -> dict:
         """
         Download and parse a dataset file.
 
         Flow:
-        1. Check the local rate limit
+        1. Serve the dataset from the local cache when possible
         2. Fetch metadata from the edge function
-        3. Download the file from the registered URL
-        4. Decompress it if it is a .gz file
-        5. Delegate parsing to the parse dispatcher
+        3. Check the local rate limit
+        4. Download the file from the registered URL
+        5. Decompress it if it is a .gz file
+        6. Delegate parsing to the parse dispatcher
 
-        Uses a local cache: if the decompressed file already exists in
-        DOWNLOAD_DIR, the download step is skipped.
+        Uses a local cache: if the decompressed file and its metadata already
+        exist locally, no HTTP request is made and no rate-limit slot is used.
         Only proceeds for exact matches (status "ok").
+
+        wait, priority, deadline, refresh and progress are forwarded to
+        download_asset.
+        columns (projection) and chunksize (iterator of DataFrames) are
+        forwarded to the parser.
+
+        Every stage emits a structured event through FBD.core.events.Events
+        (metadata lookup, rate limiter, transfer, decompression, header
+        detection, parsing, cleaning); "download.file" covers the whole call.
+
+        profile=True adds a "profile" report with elapsed time and peak
+        traced memory per stage, see FBD.core.profiling.Profile (RuntimeError
+        while another profile is active). With chunksize only the work done
+        before the iterator is returned is measured.
+
+        Full parses (no columns) also feed the persistent identifier and
+        full-text indexes, see FBD.client.id_index.IdentifierStore.observe
+        and FBD.client.text_index.ContentStore.observe.
+
+        where ({column: value or list of values}) keeps only the matching
+        rows. When the dataset has a fresh partitioned layout (see
+        FBD.client.partitions.PartitionedCache) they are read from the
+        partitions that can match, without parsing the file; otherwise the
+        file is parsed and filtered as it goes.
+
+        pipeline=True overlaps steps 4-6 on a cold download of a TSV (with a
+        known header), .fb or JSON dataset: the body is decompressed as it
+        arrives and parsed from a bounded queue while the transfer goes on,
+        and the plain file is still written to the cache. With chunksize the
+        first chunk is available before the download finishes. Other
+        datasets and cache hits take the sequential path.
         """
-        asset = cls.download_asset(dataset)
+        if profile:
+            with Profile(dataset) as prof:
+                result = cls.download_file(
+                    dataset, wait, priority, deadline, refresh, columns, chunksize,
+                    profile=False, progress=progress, pipeline=pipeline, where=where,
+                )
+            result["profile"] = prof.report()
+            return result
+
+        with Events.span("download.file", dataset=dataset) as event:
+            result = cls._download_file(
+                dataset, wait, priority, deadline, refresh, columns, chunksize, progress, pipeline, where, event
+            )
+            event["status"] = result.get("status")
+        return result
+
+    @classmethod
+    def _download_file(
+        cls, dataset, wait, priority, deadline, refresh, columns, chunksize, progress, pipeline, where, event
+    ) -> dict:
+        asset = cls.download_asset(
+            dataset, wait=wait, priority=priority, deadline=deadline, refresh=refresh,
+            progress=progress, stream=pipeline,
+        )
+        event["cache_hit"] = asset.get("cache_hit")
         if asset.get("status") != "ok":
             return asset
 
+        # Filter columns must be parsed even when the projection leaves them out.
+        parse_columns = columns
+        if where and columns is not None:
+            parse_columns = list(dict.fromkeys([*columns, *where]))
+
         try:
-            data = ParserDispatcher.parse(
-                dataset=dataset,
-                local_path=asset["local_path"],
-                metadata=asset["metadata"],
-            )
+            if where and "stream" not in asset:
+                data = PartitionedCache.read(dataset, where, columns, chunksize, local_path=asset["local_path"])
+                if data is not None:
+                    event["partitioned"] = True
+                    return {"status": "ok", "file": dataset, "data": data}
+
+            if "stream" in asset:
+                data = ParserDispatcher.parse_stream(
+                    dataset=dataset,
+                    stream=asset["stream"],
+                    metadata=asset["metadata"],
+                    columns=parse_columns,
+                    chunksize=chunksize,
+                )
+            else:
+                data = ParserDispatcher.parse(
+                    dataset=dataset,
+                    local_path=asset["local_path"],
+                    metadata=asset["metadata"],
+                    columns=parse_columns,
+                    chunksize=chunksize,
+                )
         except (KeyError, ValueError) as exc:
             return {
                 "status": "error",
@@ -185,22 +453,75 @@ class Downloader:
             }
 
         if data is not None:
+            if columns is None:
+                data = IdentifierStore.observe(dataset, asset["local_path"], data)
+                data = ContentStore.observe(dataset, asset["local_path"], data)
+            try:
+                data = PartitionedCache.filter(data, where, columns)
+            except ValueError as exc:
+                return {"status": "error", "file": dataset, "message": str(exc)}
             return {"status": "ok", "file": dataset, "data": data}
         else:
             return {"status": "error", "file": dataset}
 
     @classmethod
-    def download_asset(cls, dataset: str) -> dict:
+    def download_asset(
+        cls,
+        dataset: str,
+        wait: bool | None = None,
+        priority: int = 0,
+        deadline: float | None = None,
+        refresh: bool = False,
+        progress=None,
+        stream: bool = False,
+    ) -> dict:
         """
         Transport-layer helper: resolve metadata, download, decompress, and
         return the local file path together with its metadata.
+
+        Datasets already in the local cache are served from disk without any
+        HTTP request and without spending a rate-limit slot ("cache_hit" is
+        True in the result). refresh=True bypasses that fast path: metadata is
+        looked up again and the file is downloaded anew.
+
+        Only real file transfers count toward the download budget. When it is
+        exhausted, wait=True (or Config.DOWNLOAD_RATE_LIMIT_MODE = "wait")
+        queues the request until the next free slot instead of failing.
+        Higher priority requests are served first; deadline is a time.time()
+        timestamp after which the request gives up. Failed requests report
+        "retry_after" seconds.
+
+        The file is streamed to disk with Transfer.to_file; progress, if
+        given, receives its periodic progress dicts (bytes, total, seconds,
+        bytes_per_second, done).
+
+        stream=True, for datasets ParserDispatcher.streamable accepts, does
+        not wait for the transfer: the result carries a started
+        DownloadStream under "stream" that yields the decompressed body as it
+        arrives and completes "local_path" in the background. The caller
+        must read it to the end or close() it.
+
+        After a transfer, a table loaded from the dataset into the SQL store
+        is reloaded from the new file (SQLStore.observe_download).
+
+        Emits "metadata.cache", "rate_limit.check" and "download.transfer"
+        events for the stages it runs and "download.asset" for the whole call.
         """
+        with Events.span("download.asset", dataset=dataset) as event:
+            result = cls._download_asset(dataset, wait, priority, deadline, refresh, progress, stream)
+            event["status"] = result.get("status")
+            event["cache_hit"] = result.get("cache_hit")
+        return result
+
+    @classmethod
+    def _download_asset(cls, dataset, wait, priority, deadline, refresh, progress, stream) -> dict:
         cached_metadata = cls._load_metadata_cache(dataset)
+        Events.emit("metadata.cache", dataset=dataset, cache_hit=cached_metadata is not None)
 
-        try:
-            _rate_limiter.check()
-        except RuntimeError as exc:
-            return cls._rate_limit_cached_fallback(dataset, cached_metadata, exc)
+        if cached_metadata is not None and not refresh:
+            cached_result = cls._cached_asset_result(dataset, cached_metadata)
+            if cached_result.get("status") == "ok":
+                return cached_result
 
         try:
             search_result = cls.search_file(dataset)
@@ -232,24 +553,37 @@ class Downloader:
         _filename       = filename[:-3] if filename.endswith(".gz") else filename
         destination     = download_dir / filename
         decompress_path = download_dir / _filename
-
-        if not decompress_path.exists():
-            response = requests.get(file_url, stream=True, timeout=60)
-            response.raise_for_status()
-
-            with open(destination, "wb") as f:
-                for chunk in response.iter_content(chunk_size=8192):
-                    if chunk:
-                        f.write(chunk)
+        cache_hit       = decompress_path.exists() and not refresh
+
+        if not cache_hit:
+            try:
+                with Events.span("rate_limit.check", dataset=dataset, priority=priority):
+                    _rate_limiter.check(wait=wait, priority=priority, deadline=deadline)
+            except RuntimeError as exc:
+                return cls._rate_limit_cached_fallback(dataset, search_result, exc)
+
+            if stream and ParserDispatcher.streamable(search_result):
+                return cls._start_stream(dataset, search_result, file_url, decompress_path, progress)
+
+            with Events.span("download.transfer", dataset=dataset, url=file_url) as event:
+                response = requests.get(file_url, stream=True, timeout=60)
+                try:
+                    response.raise_for_status()
+                    event["bytes"] = Transfer.to_file(response, destination, progress=progress)
+                finally:
+                    response.close()
 
             if filename.endswith(".gz"):
                 decompress_path = Parse.decompress_gz(destination)
             else:
                 decompress_path = destination
-
+            cls._observe_transfer(dataset, decompress_path, search_result)
+        else:
+            cls._describe_local_file(dataset, decompress_path, search_result)
         return {
             "status": "ok",
             "file": dataset,
             "local_path": decompress_path,
             "metadata": search_result,
+            "cache_hit": cache_hit,
         }
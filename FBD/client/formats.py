@@ -0,0 +1,173 @@
+# -*- coding: utf-8 -*-
+import gzip
+import io
+import os
+from pathlib import Path
+
+from FBD.core.cache import source_signature
+from FBD.core.lazy import optional_import
+
+
+class FileFormat:
+    """
+    Compression sniffing and stream opening shared by every parser.
+
+    The codec of a local file ("gzip", "bgzip", "zstd" or None for plain
+    files) is read from its magic bytes once and remembered per (path, size,
+    mtime), so later opens only cost a stat. describe() also stores it in the
+    dataset metadata under "local_format", which the downloader persists in
+    the metadata cache, next to the parser probe answers of probe_results()
+    ("local_probes"). open() returns a buffered binary or text stream with
+    the decompressor already in place.
+    """
+
+    BUFFER_SIZE = 1 << 18
+
+    METADATA_KEY = "local_format"
+    PROBES_KEY = "local_probes"
+
+    _GZIP_MAGIC = b"\x1f\x8b"
+    _ZSTD_MAGIC = b"\x28\xb5\x2f\xfd"
+
+    _known: dict[str, tuple] = {}
+
+    @staticmethod
+    def _signature(path: Path) -> tuple:
+        stat = path.stat()
+        return stat.st_size, stat.st_mtime_ns
+
+    @classmethod
+    def sniff(cls, path: str | Path) -> str | None:
+        """Read the magic bytes of path and return its compression codec."""
+        with open(path, "rb") as f:
+            head = f.read(18)
+
+        if head.startswith(cls._GZIP_MAGIC):
+            # BGZF: gzip member with FEXTRA set and a "BC" extra subfield.
+            if len(head) >= 14 and head[3] & 0x04 and head[12:14] == b"BC":
+                return "bgzip"
+            return "gzip"
+        if head.startswith(cls._ZSTD_MAGIC):
+            return "zstd"
+        return None
+
+    @classmethod
+    def remember(cls, path: str | Path, compression: str | None) -> None:
+        path = Path(path)
+        cls._known[os.fspath(path)] = (*cls._signature(path), compression)
+
+    @classmethod
+    def compression(cls, path: str | Path, metadata: dict | None = None) -> str | None:
+        """
+        Codec of path, sniffed at most once while the file is unchanged.
+        A matching "local_format" entry in metadata is trusted as well.
+        """
+        path = Path(path)
+        signature = cls._signature(path)
+
+        known = cls._known.get(os.fspath(path))
+        if known is not None and known[:2] == signature:
+            return known[2]
+
+        described = (metadata or {}).get(cls.METADATA_KEY)
+        if (
+            isinstance(described, dict)
+            and described.get("path") == os.fspath(path)
+            and (described.get("size"), described.get("mtime_ns")) == signature
+        ):
+            codec = described.get("compression")
+        else:
+            codec = cls.sniff(path)
+
+        cls._known[os.fspath(path)] = (*signature, codec)
+        return codec
+
+    @classmethod
+    def describe(cls, path: str | Path, metadata: dict) -> bool:
+        """
+        Store the codec of path in metadata["local_format"]. Returns True if
+        the entry changed and the metadata should be saved again.
+        """
+        path = Path(path)
+        codec = cls.compression(path, metadata)
+        size, mtime_ns = cls._signature(path)
+        entry = {"path": os.fspath(path), "size": size, "mtime_ns": mtime_ns, "compression": codec}
+
+        if metadata.get(cls.METADATA_KEY) == entry:
+            return False
+        metadata[cls.METADATA_KEY] = entry
+        return True
+
+    @classmethod
+    def probe_results(cls, path: str | Path, metadata: dict) -> dict:
+        """
+        The parser probe answers recorded in metadata["local_probes"] for
+        the current contents of path (see ParserRegistry.select), to be
+        read and filled in; a new, empty dict when path changed since.
+        """
+        source = source_signature(path)
+        recorded = metadata.get(cls.PROBES_KEY)
+        if not isinstance(recorded, dict) or recorded.get("source") != source:
+            recorded = metadata[cls.PROBES_KEY] = {"source": source, "results": {}}
+        return recorded["results"]
+
+    @classmethod
+    def _decompressor(cls, raw, codec: str):
+        if codec in ("gzip", "bgzip"):
+            return gzip.GzipFile(fileobj=raw)
+
+        if codec == "zstd":
+            zstd = optional_import("compression.zstd")
+            if zstd is not None:
+                return zstd.ZstdFile(raw)
+            zstandard = optional_import("zstandard")
+            if zstandard is not None:
+                return zstandard.ZstdDecompressor().stream_reader(raw, closefd=True)
+            raise RuntimeError("Reading zstd-compressed files requires the 'zstandard' package.")
+
+        raise ValueError(f"Unknown compression: {codec}")
+
+    @classmethod
+    def open(
+        cls,
+        path: str | Path,
+        mode: str = "rb",
+        encoding: str = "utf-8",
+        errors: str = "strict",
+        compression: str | None = ...,
+        buffer_size: int | None = None,
+    ):
+        """
+        Open path for reading ("rb" or "rt"), decompressing transparently.
+        compression defaults to the cached sniff result for path.
+
+        path may also be an already open binary stream (e.g. a pipelined
+        download); it is read as is, decompressed only if compression is
+        given explicitly.
+        """
+        if mode not in ("rb", "rt", "r"):
+            raise ValueError(f"Unsupported mode: {mode}")
+
+        buffer_size = buffer_size or cls.BUFFER_SIZE
+        if hasattr(path, "read"):
+            raw = io.BufferedReader(path, buffer_size) if isinstance(path, io.RawIOBase) else path
+            if compression is ...:
+                compression = None
+        else:
+            path = Path(path)
+            if compression is ...:
+                compression = cls.compression(path)
+            raw = open(path, "rb", buffering=buffer_size)
+
+        if compression is None:
+            stream = raw
+        else:
+            try:
+                stream = io.BufferedReader(cls._decompressor(raw, compression), buffer_size)
+            except Exception:
+                raw.close()
+                raise
+
+        if mode == "rb":
+            return stream
+        return io.TextIOWrapper(stream, encoding=encoding, errors=errors)
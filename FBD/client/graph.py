@@ -0,0 +1,255 @@
+# -*- coding: utf-8 -*-
+import re
+
+from FBD.core.lazy import lazy_import, optional_import
+from FBD.client.dataset_handle import DatasetHandle
+from FBD.client.downloader import Downloader
+
+np = lazy_import("numpy")
+pd = lazy_import("pandas")
+
+
+def _split_lists(frame, columns, sep):
+    """
+    Explode the sep-separated cells of columns together (one row per list
+    item; cells of a row must have equal lengths). Returns the exploded
+    frame, whose index is the source row position.
+    """
+    split = pd.DataFrame({c: frame[c].str.split(sep, regex=False) for c in columns}, index=frame.index)
+    return split.explode(list(columns))
+
+
+def _coo_to_csr(rows, cols, data, n: int) -> tuple:
+    """(indptr, indices, data) of an n x n matrix, columns sorted per row and duplicates summed."""
+    order = np.lexsort((cols, rows))
+    rows, cols, data = rows[order], cols[order], data[order]
+    if len(rows):
+        starts = np.flatnonzero(np.r_[True, (rows[1:] != rows[:-1]) | (cols[1:] != cols[:-1])])
+        data = np.add.reduceat(data, starts)
+        rows, cols = rows[starts], cols[starts]
+    indptr = np.zeros(n + 1, dtype=np.int64)
+    np.cumsum(np.bincount(rows, minlength=n), out=indptr[1:])
+    return indptr, cols, data
+
+
+class InteractionGraph:
+    """
+    Edge list of an interaction dataset with its nodes interned to integer
+    codes, for graph-ML inputs.
+
+    nodes[code] is the node ID (e.g. an FBgn) and labels[code] its label
+    (e.g. the gene symbol) when one was given. Edge e goes from
+    sources[e] to targets[e] (int32 codes) and comes from row rows[e] of the
+    parsed dataset; FlyBase cells listing several genes ("a|b") yield one
+    edge per pair. Edge attributes are typed arrays: numeric columns become
+    float64 (int64 when integral and complete), others int32 category codes
+    with categories[name] holding the values (-1 for missing).
+
+    Everything is built with pandas.factorize and numpy; no per-edge Python
+    objects are created.
+    """
+
+    def __init__(
+        self,
+        nodes,
+        sources,
+        targets,
+        rows=None,
+        edge_attributes: dict | None = None,
+        categories: dict | None = None,
+        labels=None,
+        directed: bool = True,
+    ):
+        self.nodes = np.asarray(nodes, dtype=object)
+        self.sources = np.asarray(sources, dtype=np.int32)
+        self.targets = np.asarray(targets, dtype=np.int32)
+        self.rows = None if rows is None else np.asarray(rows, dtype=np.int64)
+        self.edge_attributes = edge_attributes or {}
+        self.categories = categories or {}
+        self.labels = None if labels is None else np.asarray(labels, dtype=object)
+        self.directed = directed
+        self._node_index = None
+
+    def __repr__(self):
+        kind = "directed" if self.directed else "undirected"
+        return f"InteractionGraph({self.n_nodes} nodes, {self.n_edges} {kind} edges)"
+
+    @property
+    def n_nodes(self) -> int:
+        return len(self.nodes)
+
+    @property
+    def n_edges(self) -> int:
+        return len(self.sources)
+
+    # ── Construction ─────────────────────────────────────────────────────────
+
+    @classmethod
+    def from_frame(
+        cls,
+        df,
+        source: str,
+        target: str,
+        attributes=(),
+        labels: tuple[str, str] | None = None,
+        sep: str | None = "|",
+        directed: bool = True,
+    ):
+        """
+        Build from a parsed DataFrame. source and target name the endpoint
+        columns, labels an optional (source_label, target_label) pair of
+        columns aligned with them (e.g. the symbol columns). With sep, cells
+        are split on it and every source item is paired with every target
+        item of the row. Rows with a missing or empty endpoint are skipped.
+        """
+        missing = [c for c in (source, target, *(labels or ()), *attributes) if c not in df.columns]
+        if missing:
+            raise ValueError(f"Unknown columns: {missing}")
+
+        frame = df.reset_index(drop=True)
+        src_cols = [source] + ([labels[0]] if labels else [])
+        tgt_cols = [target] + ([labels[1]] if labels else [])
+        if sep is not None:
+            try:
+                left = _split_lists(frame, src_cols, sep)
+                right = _split_lists(frame, tgt_cols, sep)
+            except ValueError:
+                raise ValueError(f"Label columns {labels} do not list as many items as {source}/{target}")
+            pairs = left.join(right, how="inner")
+        else:
+            pairs = frame[src_cols + tgt_cols]
+
+        src = pairs[source]
+        tgt = pairs[target]
+        valid = (src.notna() & tgt.notna() & (src != "") & (tgt != "")).to_numpy()
+        pairs = pairs[valid]
+        rows = pairs.index.to_numpy(dtype=np.int64)
+
+        m = len(pairs)
+        codes, nodes = pd.factorize(np.concatenate([pairs[source].to_numpy(object), pairs[target].to_numpy(object)]))
+
+        node_labels = None
+        if labels:
+            all_labels = np.concatenate([pairs[labels[0]].to_numpy(object), pairs[labels[1]].to_numpy(object)])
+            node_labels = all_labels[np.unique(codes, return_index=True)[1]]
+
+        edge_attributes, categories = {}, {}
+        for name in attributes:
+            values = frame[name].to_numpy(object)[rows]
+            edge_attributes[name], category = cls._typed(values)
+            if category is not None:
+                categories[name] = category
+
+        return cls(
+            nodes, codes[:m], codes[m:], rows=rows, edge_attributes=edge_attributes,
+            categories=categories, labels=node_labels, directed=directed,
+        )
+
+    @staticmethod
+    def _typed(values) -> tuple:
+        series = pd.Series(values, dtype=object)
+        present = series.notna() & (series != "")
+        numeric = pd.to_numeric(series.where(present), errors="coerce")
+        if present.any() and numeric[present].notna().all():
+            array = numeric.to_numpy(dtype=np.float64)
+            if present.all() and np.all(np.mod(array, 1) == 0):
+                return array.astype(np.int64), None
+            return array, None
+
+        codes, uniques = pd.factorize(series.where(present))
+        return codes.astype(np.int32), np.asarray(uniques, dtype=object)
+
+    @classmethod
+    def default_columns(cls, columns) -> tuple:
+        """
+        (source, target, labels) guessed from a dataset's columns: the
+        first two columns naming FBgn IDs, and matching "symbol" columns
+        if present.
+        """
+        ids = [c for c in columns if re.search(r"FBgn", c)]
+        if len(ids) < 2:
+            raise ValueError("Cannot guess the source/target columns; pass source= and target=")
+        source, target = ids[:2]
+        labels = tuple(re.sub(r"FBgn(_ID)?", "symbol", c) for c in (source, target))
+        return source, target, labels if all(c in columns for c in labels) else None
+
+    @classmethod
+    def from_dataset(
+        cls,
+        dataset: str,
+        source: str | None = None,
+        target: str | None = None,
+        attributes=(),
+        labels: tuple[str, str] | None = None,
+        sep: str | None = "|",
+        directed: bool = True,
+        **download_options,
+    ):
+        """
+        Download (or reuse the cached copy of) dataset, parsing only the
+        columns needed, and build the graph. Without source/target the FBgn
+        columns are used, labelled with their symbol columns (see
+        default_columns). download_options go to Downloader.download_file.
+        """
+        if source is None or target is None:
+            source, target, guessed = cls.default_columns(DatasetHandle(dataset).columns)
+            labels = labels or guessed
+
+        columns = list(dict.fromkeys([source, target, *(labels or ()), *attributes]))
+        result = Downloader.download_file(dataset, columns=columns, **download_options)
+        if result.get("status") != "ok":
+            raise ValueError(result.get("message", "Download failed"))
+        return cls.from_frame(result["data"], source, target, attributes, labels, sep, directed)
+
+    # ── Model inputs ─────────────────────────────────────────────────────────
+
+    def codes(self, ids) -> "np.ndarray":
+        """Vectorized node lookup; unknown IDs map to -1."""
+        if self._node_index is None:
+            self._node_index = pd.Index(self.nodes)
+        return self._node_index.get_indexer(pd.Index(np.asarray(ids, dtype=object)))
+
+    def edge_index(self) -> "np.ndarray":
+        """(2, n_edges) int64 array of [sources, targets], both directions when undirected."""
+        index = np.vstack([self.sources, self.targets]).astype(np.int64)
+        if not self.directed:
+            index = np.hstack([index, index[::-1]])
+        return index
+
+    def to_csr(self, weight: str | None = None, symmetric: bool | None = None, dtype="float64"):
+        """
+        n_nodes x n_nodes adjacency with parallel edges summed; weight
+        names a numeric edge attribute (default 1 per edge). symmetric
+        defaults to not directed. Returns its (indptr, indices, data)
+        arrays, data being of dtype whether or not weight is given; see
+        to_scipy for a scipy.sparse.csr_matrix.
+        """
+        if symmetric is None:
+            symmetric = not self.directed
+        if weight is None:
+            data = np.ones(self.n_edges, dtype=dtype)
+        elif weight in self.categories:
+            raise ValueError(f"Edge attribute '{weight}' is categorical")
+        else:
+            data = self.edge_attributes[weight].astype(dtype)
+
+        rows = self.sources.astype(np.int64)
+        cols = self.targets.astype(np.int64)
+        if symmetric:
+            loops = rows == cols
+            rows, cols, data = (
+                np.concatenate([rows, cols[~loops]]),
+                np.concatenate([cols, rows[~loops]]),
+                np.concatenate([data, data[~loops]]),
+            )
+
+        indptr, indices, data = _coo_to_csr(rows, cols, data, self.n_nodes)
+        return indptr, indices.astype(np.int32), data
+
+    def to_scipy(self, weight: str | None = None, symmetric: bool | None = None, dtype="float64"):
+        """to_csr as a scipy.sparse.csr_matrix. Raises ImportError without scipy."""
+        sparse = optional_import("scipy.sparse")
+        if sparse is None:
+            raise ImportError("InteractionGraph.to_scipy requires scipy (pip install scipy)")
+        indptr, indices, data = self.to_csr(weight, symmetric, dtype)
+        return sparse.csr_matrix((data, indices, indptr), shape=(self.n_nodes, self.n_nodes))
@@ -0,0 +1,313 @@
+# -*- coding: utf-8 -*-
+import json
+from pathlib import Path
+
+from FBD.client.index_store import IndexStore
+from FBD.core.cache import save_npz
+from FBD.core.events import Events
+from FBD.core.lazy import lazy_import
+
+np = lazy_import("numpy")
+pd = lazy_import("pandas")
+
+# FlyBase identifiers: "FB", a two-letter class (gn, al, tr, pp, rf, ...) and seven to ten
+# digits (ten for newer classes such as FBsf).
+ID_PATTERN = r"\bFB([a-z]{2})(\d{7,10})\b"
+
+_BLOOM_BITS_PER_ID = 10
+_BLOOM_HASHES = 7
+_NUMBERS = 10 ** 10
+
+
+def encode_ids(ids) -> "np.ndarray":
+    """
+    Pack FlyBase IDs into int64 keys: ((class * 4 + digits - 7) * 10**10 +
+    number, the class being the two letters read as a base-26 number and
+    digits the length of the zero-padded number, so that FBsf0000000001 and
+    FBsf0000001 stay apart). Values that are not FlyBase IDs map to -1.
+    """
+    matched = pd.Series(np.asarray(ids, dtype=object)).str.extract(r"^FB([a-z]{2})(\d{7,10})$")
+    valid = matched[0].notna().to_numpy(dtype=bool)
+    keys = np.full(len(matched), -1, dtype=np.int64)
+    if valid.any():
+        keys[valid] = _keys(matched[0][valid], matched[1][valid])
+    return keys
+
+
+def decode_ids(keys) -> list[str]:
+    keys = np.asarray(keys, dtype=np.int64)
+    prefixes, numbers = np.divmod(keys, _NUMBERS)
+    classes, widths = np.divmod(prefixes, 4)
+    return [
+        f"FB{chr(97 + c // 26)}{chr(97 + c % 26)}{n:0{w + 7}d}"
+        for c, w, n in zip(classes.tolist(), widths.tolist(), numbers.tolist())
+    ]
+
+
+def _keys(classes, digits) -> "np.ndarray":
+    """int64 keys from aligned Series of two-letter classes and seven- to ten-digit strings."""
+    codes, uniques = pd.factorize(classes)
+    values = np.array([(ord(u[0]) - 97) * 26 + ord(u[1]) - 97 for u in uniques], dtype=np.int64)
+    widths = digits.str.len().to_numpy(dtype=np.int64) - 7
+    return (values[codes] * 4 + widths) * _NUMBERS + pd.to_numeric(digits).to_numpy(dtype=np.int64)
+
+
+def _mix(x) -> "np.ndarray":
+    """splitmix64 finalizer over a uint64 array (wrapping arithmetic)."""
+    x = x + np.uint64(0x9E3779B97F4A7C15)
+    x = (x ^ (x >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+    x = (x ^ (x >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+    return x ^ (x >> np.uint64(31))
+
+
+def _bloom_positions(keys, bits: int) -> "np.ndarray":
+    """(len(keys), _BLOOM_HASHES) bit positions by double hashing."""
+    h1 = _mix(np.asarray(keys, dtype=np.int64).astype(np.uint64))
+    h2 = _mix(h1) | np.uint64(1)
+    steps = np.arange(_BLOOM_HASHES, dtype=np.uint64)
+    return ((h1[:, None] + steps[None, :] * h2[:, None]) % np.uint64(bits)).astype(np.int64)
+
+
+class IdentifierIndex:
+    """
+    On-disk index of the FlyBase identifiers found in one parsed dataset.
+
+    keys holds the sorted distinct IDs (see encode_ids) and
+    rows[indptr[i]:indptr[i + 1]] the row positions of the parsed dataset
+    (0-based, in file order) whose cells mention keys[i]. A Bloom filter
+    over keys (about 1% false positives) answers most negative lookups
+    from a few bytes without reading the key and row arrays; load() reads
+    only the metadata and the filter, the rest on first use.
+
+    Build one with IdentifierIndex.builder(); IdentifierStore keeps one
+    per downloaded dataset.
+    """
+
+    FORMAT_VERSION = 2
+
+    def __init__(self, dataset: str, keys, indptr, rows, bloom=None, meta: dict | None = None):
+        self.dataset = dataset
+        self.meta = dict(meta or {})
+        self._path = None
+        self._keys = None if keys is None else np.asarray(keys, dtype=np.int64)
+        self._indptr = None if indptr is None else np.asarray(indptr, dtype=np.int64)
+        self._rows = None if rows is None else np.asarray(rows, dtype=np.int64)
+        if bloom is None:
+            bloom = self._bloom(self._keys)
+        self.bloom = bloom
+
+    def __repr__(self):
+        ids = self.meta["ids"] if "ids" in self.meta else len(self.keys)
+        return f"IdentifierIndex({self.dataset!r}, {ids} ids)"
+
+    @classmethod
+    def builder(cls, dataset: str):
+        return _IndexBuilder(cls, dataset)
+
+    @staticmethod
+    def _bloom(keys) -> "np.ndarray":
+        bits = max(64, len(keys) * _BLOOM_BITS_PER_ID)
+        bits += -bits % 8
+        flags = np.zeros(bits, dtype=bool)
+        flags[_bloom_positions(keys, bits).ravel()] = True
+        return np.packbits(flags)
+
+    # ── Queries ──────────────────────────────────────────────────────────────
+
+    def _load_arrays(self):
+        if self._keys is None:
+            with np.load(self._path, allow_pickle=False) as data:
+                self._keys, self._indptr, self._rows = data["keys"], data["indptr"], data["rows"]
+
+    @property
+    def keys(self) -> "np.ndarray":
+        self._load_arrays()
+        return self._keys
+
+    def might_contain(self, keys) -> "np.ndarray":
+        """Bloom filter test: False means the ID is certainly not in the dataset."""
+        keys = np.asarray(keys, dtype=np.int64)
+        bits = len(self.bloom) * 8
+        positions = _bloom_positions(keys, bits)
+        flags = (self.bloom[positions >> 3] >> (7 - (positions & 7)).astype(np.uint8)) & 1
+        return flags.all(axis=1) & (keys >= 0)
+
+    def rows_for(self, keys) -> "np.ndarray":
+        """Sorted distinct row positions mentioning any of keys."""
+        keys = np.asarray(keys, dtype=np.int64)
+        keys = keys[self.might_contain(keys)]
+        if not keys.size:
+            return np.empty(0, dtype=np.int64)
+
+        self._load_arrays()
+        pos = np.searchsorted(self._keys, keys)
+        pos = pos[(pos < len(self._keys)) & (self._keys[np.minimum(pos, len(self._keys) - 1)] == keys)]
+        if not pos.size:
+            return np.empty(0, dtype=np.int64)
+        return np.unique(np.concatenate([self._rows[self._indptr[p]:self._indptr[p + 1]] for p in pos]))
+
+    # ── Persistence ──────────────────────────────────────────────────────────
+
+    def save(self, path: str | Path) -> Path:
+        path = Path(path)
+        meta = dict(self.meta, version=self.FORMAT_VERSION, dataset=self.dataset, ids=len(self.keys))
+        return save_npz(
+            path, meta=np.array(json.dumps(meta)), bloom=self.bloom,
+            keys=self.keys, indptr=self._indptr, rows=self._rows,
+        )
+
+    @classmethod
+    def load(cls, path: str | Path):
+        """
+        Open an index written by save, reading only its metadata and Bloom
+        filter. Returns None for another format version.
+        """
+        with np.load(Path(path), allow_pickle=False) as data:
+            meta = json.loads(str(data["meta"]))
+            if meta.get("version") != cls.FORMAT_VERSION:
+                return None
+            bloom = data["bloom"]
+
+        index = cls(meta["dataset"], None, None, None, bloom=bloom, meta=meta)
+        index._path = Path(path)
+        return index
+
+
+class _IndexBuilder:
+    """Accumulates (ID, row) pairs over the chunks of a parse."""
+
+    def __init__(self, index_cls, dataset: str):
+        self.index_cls = index_cls
+        self.dataset = dataset
+        self.rows_seen = 0
+        self._keys = []
+        self._rows = []
+
+    def update(self, chunk) -> None:
+        offset = self.rows_seen
+        self.rows_seen += len(chunk)
+        positions = np.arange(offset, self.rows_seen, dtype=np.int64)
+
+        for column in chunk.columns:
+            values = chunk[column]
+            if not pd.api.types.is_string_dtype(values.dtype):
+                continue
+            series = pd.Series(values.to_numpy(dtype=object), index=positions)
+            series = series[series.str.contains("FB", regex=False, na=False).to_numpy(dtype=bool)]
+            if series.empty:
+                continue
+            found = series.str.extractall(ID_PATTERN)
+            if found.empty:
+                continue
+            self._keys.append(_keys(found[0], found[1]))
+            self._rows.append(found.index.get_level_values(0).to_numpy(dtype=np.int64))
+
+    def build(self, meta: dict | None = None) -> IdentifierIndex:
+        keys = np.concatenate(self._keys) if self._keys else np.empty(0, dtype=np.int64)
+        rows = np.concatenate(self._rows) if self._rows else np.empty(0, dtype=np.int64)
+
+        pairs = np.unique(np.stack([keys, rows]), axis=1) if keys.size else np.empty((2, 0), dtype=np.int64)
+        distinct, counts = np.unique(pairs[0], return_counts=True)
+        indptr = np.zeros(len(distinct) + 1, dtype=np.int64)
+        np.cumsum(counts, out=indptr[1:])
+
+        meta = dict(meta or {}, rows=self.rows_seen)
+        return self.index_cls(self.dataset, distinct, indptr, pairs[1], meta=meta)
+
+
+class IdentifierStore(IndexStore):
+    """
+    Persistent identifier indexes of the downloaded datasets, kept in
+    Config.CACHE_DIR / "id_index" (one IdentifierIndex file per dataset);
+    see IndexStore for how they are stored, built and kept fresh.
+
+    With Config.INDEX_IDENTIFIERS = True (off by default),
+    Downloader.download_file calls observe() on every full parse (no column
+    projection), so a dataset is indexed the first time it is parsed after
+    its file was downloaded; an index whose source file changed is stale and
+    ignored until the dataset is parsed again. Otherwise datasets are
+    indexed only when named in lookup() or build().
+    """
+
+    INDEX_CLASS = IdentifierIndex
+    DIRECTORY = "id_index"
+    SUFFIX = ".ids.npz"
+    CONFIG_FLAG = "INDEX_IDENTIFIERS"
+    EVENT = "index.identifiers"
+
+    @classmethod
+    def summary(cls, index) -> dict:
+        return {"ids": len(index.keys)}
+
+    @classmethod
+    def lookup(cls, ids, datasets=None) -> dict:
+        """
+        {dataset: sorted row positions} for the datasets whose rows mention
+        any of ids (a FlyBase ID or a sequence of them). datasets restricts
+        the search and indexes missing ones (see build); by default every
+        fresh index on disk is searched. Datasets are skipped on the Bloom
+        filter alone when it rules all ids out.
+
+        Emits an "index.lookup" event with the datasets searched, skipped
+        by the filter and matched.
+        """
+        keys = encode_ids([ids] if isinstance(ids, str) else list(ids))
+        keys = np.unique(keys[keys >= 0])
+
+        if datasets is None:
+            indexes = cls.indexes()
+        else:
+            indexes = (cls.build(dataset) for dataset in ([datasets] if isinstance(datasets, str) else datasets))
+
+        hits = {}
+        with Events.span("index.lookup", ids=len(keys)) as event:
+            searched = skipped = 0
+            for index in indexes:
+                if index is None:
+                    continue
+                searched += 1
+                if not index.might_contain(keys).any():
+                    skipped += 1
+                    continue
+                rows = index.rows_for(keys)
+                if rows.size:
+                    hits[index.dataset] = rows
+            event.update(searched=searched, skipped=skipped, matched=len(hits))
+        return hits
+
+    @classmethod
+    def fetch(cls, dataset: str, rows, chunksize: int | None = None, **download_options):
+        """
+        The rows at the given positions of dataset, indexed by position.
+        The dataset is parsed in chunks and parsing stops after the last
+        requested row, so only the matching rows are kept in memory.
+        """
+        from FBD.client.downloader import Downloader
+
+        rows = np.unique(np.asarray(rows, dtype=np.int64))
+        result = Downloader.download_file(dataset, chunksize=chunksize or cls.CHUNKSIZE, **download_options)
+        if result.get("status") != "ok":
+            raise ValueError(result.get("message", "Download failed"))
+
+        chunks = result["data"]
+        if isinstance(chunks, pd.DataFrame):
+            chunks = iter([chunks])
+
+        parts, offset = [], 0
+        try:
+            for chunk in chunks:
+                lo, hi = np.searchsorted(rows, [offset, offset + len(chunk)])
+                if hi > lo:
+                    part = chunk.iloc[rows[lo:hi] - offset]
+                    parts.append(part.set_axis(rows[lo:hi], axis=0))
+                offset += len(chunk)
+                if hi == len(rows):
+                    break
+        finally:
+            close = getattr(chunks, "close", None)
+            if close is not None:
+                close()
+
+        if not parts:
+            return pd.DataFrame()
+        return pd.concat(parts)
@@ -0,0 +1,154 @@
+# -*- coding: utf-8 -*-
+import inspect
+from pathlib import Path
+
+from FBD.core.cache import cache_dir, dataset_path, source_signature
+from FBD.core.config import Config
+from FBD.core.events import Events
+from FBD.core.lazy import lazy_import
+
+pd = lazy_import("pandas")
+
+
+class IndexStore:
+    """
+    Persistent per-dataset indexes kept in Config.CACHE_DIR / DIRECTORY,
+    one INDEX_CLASS file (named <dataset>SUFFIX) per dataset. Subclasses
+    set those attributes, the Config flag that turns indexing on (CONFIG_FLAG),
+    the event emitted when an index is built (EVENT) and summary(), and
+    add their queries. All attributes and methods are class-level; the
+    classes are not instantiated.
+
+    An index records the signature of the file it was built from and is
+    stale, and ignored, once that file changes.
+    """
+
+    INDEX_CLASS = None
+    DIRECTORY = None
+    SUFFIX = None
+    CONFIG_FLAG = None
+    EVENT = None
+    CHUNKSIZE = 100_000
+
+    @classmethod
+    def summary(cls, index) -> dict:
+        """Fields added to the EVENT event of a newly built index."""
+        return {}
+
+    @classmethod
+    def index_dir(cls) -> Path | None:
+        return cache_dir(cls.DIRECTORY)
+
+    @classmethod
+    def path(cls, dataset: str) -> Path | None:
+        return dataset_path(cls.DIRECTORY, dataset, cls.SUFFIX)
+
+    @classmethod
+    def load(cls, dataset: str, fresh: bool = True):
+        """The dataset's index, or None when there is none (or, with fresh, it is stale)."""
+        path = cls.path(dataset)
+        if path is None or not path.exists():
+            return None
+        return cls._open(path, fresh)
+
+    @classmethod
+    def _open(cls, path: Path, fresh: bool):
+        try:
+            index = cls.INDEX_CLASS.load(path)
+        except (OSError, ValueError, KeyError):
+            return None
+        if index is None:
+            return None
+        if fresh and source_signature(index.meta.get("local_path", "")) != index.meta.get("source"):
+            return None
+        return index
+
+    @classmethod
+    def indexes(cls, fresh: bool = True) -> list:
+        """The indexes on disk (only the fresh ones, with fresh), each opened once."""
+        index_dir = cls.index_dir()
+        if index_dir is None:
+            return []
+        indexes = (cls._open(path, fresh) for path in sorted(index_dir.glob(f"*{cls.SUFFIX}")))
+        return [index for index in indexes if index is not None]
+
+    @classmethod
+    def datasets(cls) -> list[str]:
+        """Datasets with an index on disk, fresh or not."""
+        return [index.dataset for index in cls.indexes(fresh=False)]
+
+    @classmethod
+    def observe(cls, dataset: str, local_path, data):
+        """
+        Index a parse result on its way to the caller and return it. A
+        DataFrame is indexed at once; a generator of chunks is wrapped so
+        that each chunk is indexed as it is yielded, and the index is saved
+        once the iterator is exhausted. Other results, and datasets whose
+        index is fresh, pass through untouched, as does everything while
+        the CONFIG_FLAG setting is off.
+        """
+        if not getattr(Config, cls.CONFIG_FLAG) or cls.load(dataset) is not None:
+            return data
+        if isinstance(data, pd.DataFrame):
+            cls._build(dataset, local_path, [data])
+            return data
+        if inspect.isgenerator(data):
+            return cls._observe_chunks(dataset, local_path, data)
+        return data
+
+    @classmethod
+    def _observe_chunks(cls, dataset, local_path, chunks):
+        builder = cls.INDEX_CLASS.builder(dataset)
+        for chunk in chunks:
+            builder.update(chunk)
+            yield chunk
+        cls._save(dataset, local_path, builder)
+
+    @classmethod
+    def _build(cls, dataset, local_path, chunks):
+        builder = cls.INDEX_CLASS.builder(dataset)
+        for chunk in chunks:
+            builder.update(chunk)
+        return cls._save(dataset, local_path, builder)
+
+    @classmethod
+    def _save(cls, dataset, local_path, builder):
+        with Events.span(cls.EVENT, dataset=dataset, rows=builder.rows_seen) as event:
+            index = builder.build({"local_path": str(local_path), "source": source_signature(local_path)})
+            event.update(cls.summary(index))
+            path = cls.path(dataset)
+            if path is not None:
+                try:
+                    index.save(path)
+                except OSError:
+                    pass
+        return index
+
+    @classmethod
+    def build(cls, dataset: str, **download_options):
+        """
+        Index dataset now, downloading it if it is not cached, unless its
+        index is fresh. Returns the index, or None if the download or parse
+        failed or the dataset is not tabular. download_options go to
+        Downloader.download_asset.
+        """
+        from FBD.client.downloader import Downloader
+        from FBD.client.parser_dispatcher import ParserDispatcher
+
+        index = cls.load(dataset)
+        if index is not None:
+            return index
+
+        asset = Downloader.download_asset(dataset, **download_options)
+        if asset.get("status") != "ok":
+            return None
+        try:
+            data = ParserDispatcher.parse(dataset, asset["local_path"], asset["metadata"], chunksize=cls.CHUNKSIZE)
+        except (KeyError, ValueError):
+            return None
+
+        if isinstance(data, pd.DataFrame):
+            data = [data]
+        elif not inspect.isgenerator(data):
+            return None
+        return cls._build(dataset, asset["local_path"], data)
@@ -0,0 +1,336 @@
+# -*- coding: utf-8 -*-
+from pathlib import Path
+
+from FBD.core.cache import cache_dir, save_npz, source_signature
+from FBD.core.lazy import lazy_import
+
+np = lazy_import("numpy")
+
+
+def _encode_strings(values) -> tuple:
+    """Pack a list of str/None into (offsets, utf-8 blob) arrays; None -> empty string."""
+    encoded = [(v or "").encode("utf-8") for v in values]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    np.cumsum([len(e) for e in encoded], out=offsets[1:])
+    blob = np.frombuffer(b"".join(encoded), dtype=np.uint8)
+    return offsets, blob
+
+
+def _decode_strings(offsets, blob) -> list[str]:
+    raw = blob.tobytes()
+    return [raw[offsets[i]:offsets[i + 1]].decode("utf-8") for i in range(len(offsets) - 1)]
+
+
+def _csr(sources, targets, n: int) -> tuple:
+    """CSR (indptr, indices) for edges sources[i] -> targets[i], targets sorted per row."""
+    sources = np.asarray(sources, dtype=np.int64)
+    targets = np.asarray(targets, dtype=np.int32)
+    order = np.lexsort((targets, sources))
+    indptr = np.zeros(n + 1, dtype=np.int64)
+    np.cumsum(np.bincount(sources, minlength=n), out=indptr[1:])
+    return indptr, targets[order]
+
+
+class OntologyIndex:
+    """
+    Compact, read-only representation of an OBO ontology.
+
+    Term IDs are interned to integer codes; parent links are stored as one
+    CSR adjacency (indptr/indices arrays) per relation type, and the
+    transitive closure over closure_relations (is_a by default) is
+    precomputed in both directions. ancestors, descendants and is_a are
+    then array slices and binary searches instead of graph traversals.
+
+    Build it with from_graph, from_edges or from_obo; from_obo stores the
+    index in the parsed-result cache (Config.CACHE_DIR / "parsed") and
+    reloads it while the source file is unchanged.
+    """
+
+    FORMAT_VERSION = 1
+
+    def __init__(self, ids, names, relations: dict, closure_relations=("is_a",), ancestors=None):
+        self.ids = list(ids)
+        self.names = list(names)
+        self.relations = relations
+        self.closure_relations = tuple(closure_relations)
+        self._codes = {term: code for code, term in enumerate(self.ids)}
+        self._reverse = {}
+
+        if ancestors is None:
+            ancestors = self._compute_closure()
+        self._ancestors = ancestors
+        self._descendants = self._transpose(*ancestors)
+
+    def __len__(self):
+        return len(self.ids)
+
+    def __contains__(self, term):
+        return term in self._codes
+
+    def __repr__(self):
+        return f"OntologyIndex({len(self)} terms, relations={sorted(self.relations)})"
+
+    # ── Construction ─────────────────────────────────────────────────────────
+
+    @classmethod
+    def from_edges(cls, terms, edges, closure_relations=("is_a",)):
+        """
+        Build from terms = [(term_id, name), ...] and
+        edges = [(child_id, relation, parent_id), ...]. Edge endpoints that
+        are not listed in terms are interned without a name.
+        """
+        ids, names, codes = [], [], {}
+        for term_id, name in terms:
+            if term_id not in codes:
+                codes[term_id] = len(ids)
+                ids.append(term_id)
+                names.append(name)
+
+        by_relation = {}
+        for child, relation, parent in edges:
+            for term_id in (child, parent):
+                if term_id not in codes:
+                    codes[term_id] = len(ids)
+                    ids.append(term_id)
+                    names.append(None)
+            pairs = by_relation.setdefault(relation, ([], []))
+            pairs[0].append(codes[child])
+            pairs[1].append(codes[parent])
+
+        relations = {
+            relation: _csr(sources, targets, len(ids))
+            for relation, (sources, targets) in by_relation.items()
+        }
+        return cls(ids, names, relations, closure_relations)
+
+    @classmethod
+    def from_graph(cls, graph, closure_relations=("is_a",)):
+        """Build from the networkx MultiDiGraph returned by Parse.obo_to_graph."""
+        terms = ((node, data.get("name")) for node, data in graph.nodes(data=True))
+        edges = ((child, relation, parent) for child, parent, relation in graph.edges(keys=True))
+        return cls.from_edges(terms, edges, closure_relations)
+
+    @classmethod
+    def from_obo(cls, file_path: str | Path, closure_relations=("is_a",), use_cache: bool = True):
+        """
+        Parse an OBO file into an OntologyIndex, going through the parsed
+        result cache when use_cache is True. Terms are streamed with
+        Parse.iter_obo, so no networkx graph is built.
+        """
+        from FBD.client.parse import Parse
+
+        file_path = Path(file_path)
+        cache_path = cls.cache_path(file_path, closure_relations)
+        source = source_signature(file_path)
+
+        if use_cache and cache_path is not None and source is not None and cache_path.exists():
+            try:
+                index = cls.load(cache_path, expected_source=source)
+                if index is not None:
+                    return index
+            except (OSError, ValueError, KeyError):
+                pass
+
+        terms, edges = [], []
+        for _, term in Parse.iter_obo(
+            file_path,
+            stanza_types=["Term"],
+            tags=["name", "is_a", "relationship"],
+            ignore_obsolete=True,
+        ):
+            terms.append((term["id"], term.get("name")))
+            edges.extend((term["id"], "is_a", parent) for parent in term.get("is_a", []))
+            for relationship in term.get("relationship", []):
+                relation, _, parent = relationship.partition(" ")
+                edges.append((term["id"], relation, parent))
+
+        index = cls.from_edges(terms, edges, closure_relations)
+
+        if use_cache and cache_path is not None:
+            try:
+                index.save(cache_path, source=source or "")
+            except OSError:
+                pass
+        return index
+
+    def _compute_closure(self) -> tuple:
+        n = len(self.ids)
+        parents = [[] for _ in range(n)]
+        for relation in self.closure_relations:
+            if relation not in self.relations:
+                continue
+            indptr, indices = self.relations[relation]
+            for code in range(n):
+                parents[code].extend(indices[indptr[code]:indptr[code + 1]].tolist())
+
+        # Kahn order, parents before children; nodes left over sit on a cycle
+        # and are resolved by plain traversal.
+        children = [[] for _ in range(n)]
+        pending = [0] * n
+        for code, ps in enumerate(parents):
+            ps[:] = sorted(set(ps))
+            pending[code] = len(ps)
+            for p in ps:
+                children[p].append(code)
+
+        closure = [None] * n
+        ready = [code for code in range(n) if pending[code] == 0]
+        while ready:
+            code = ready.pop()
+            acc = set()
+            for p in parents[code]:
+                acc.add(p)
+                acc.update(closure[p])
+            closure[code] = acc
+            for child in children[code]:
+                pending[child] -= 1
+                if pending[child] == 0:
+                    ready.append(child)
+
+        for code in range(n):
+            if closure[code] is None:
+                acc, stack = set(), list(parents[code])
+                while stack:
+                    p = stack.pop()
+                    if p not in acc:
+                        acc.add(p)
+                        stack.extend(parents[p])
+                acc.discard(code)
+                closure[code] = acc
+
+        indptr = np.zeros(n + 1, dtype=np.int64)
+        np.cumsum([len(c) for c in closure], out=indptr[1:])
+        indices = np.fromiter(
+            (a for c in closure for a in sorted(c)), dtype=np.int32, count=int(indptr[-1])
+        )
+        return indptr, indices
+
+    @staticmethod
+    def _transpose(indptr, indices) -> tuple:
+        n = len(indptr) - 1
+        rows = np.repeat(np.arange(n, dtype=np.int32), np.diff(indptr))
+        return _csr(indices, rows, n)
+
+    # ── Queries ──────────────────────────────────────────────────────────────
+
+    def code(self, term: str) -> int:
+        try:
+            return self._codes[term]
+        except KeyError:
+            raise KeyError(f"Unknown term: {term}") from None
+
+    def codes(self, terms) -> "np.ndarray":
+        """Vectorized lookup; unknown terms map to -1."""
+        return np.fromiter((self._codes.get(t, -1) for t in terms), dtype=np.int64)
+
+    def name(self, term: str) -> str | None:
+        return self.names[self.code(term)]
+
+    def _row(self, csr, term) -> "np.ndarray":
+        indptr, indices = csr
+        code = self.code(term)
+        return indices[indptr[code]:indptr[code + 1]]
+
+    def _terms(self, codes, as_codes: bool):
+        return codes if as_codes else [self.ids[c] for c in codes]
+
+    def parents(self, term: str, relation: str = "is_a", as_codes: bool = False):
+        if relation not in self.relations:
+            return self._terms(np.empty(0, dtype=np.int32), as_codes)
+        return self._terms(self._row(self.relations[relation], term), as_codes)
+
+    def children(self, term: str, relation: str = "is_a", as_codes: bool = False):
+        if relation not in self.relations:
+            return self._terms(np.empty(0, dtype=np.int32), as_codes)
+        if relation not in self._reverse:
+            self._reverse[relation] = self._transpose(*self.relations[relation])
+        return self._terms(self._row(self._reverse[relation], term), as_codes)
+
+    def ancestors(self, term: str, as_codes: bool = False):
+        """All ancestors of term over closure_relations (term itself excluded)."""
+        return self._terms(self._row(self._ancestors, term), as_codes)
+
+    def descendants(self, term: str, as_codes: bool = False):
+        """All descendants of term over closure_relations (term itself excluded)."""
+        return self._terms(self._row(self._descendants, term), as_codes)
+
+    def is_a(self, term, ancestor: str):
+        """
+        True if term is ancestor or one of its descendants over
+        closure_relations. term may be a single ID, returning a bool, or a
+        sequence of IDs, returning a boolean array (unknown IDs are False).
+        """
+        anc = self.code(ancestor)
+
+        if isinstance(term, str):
+            code = self._codes.get(term)
+            if code is None:
+                return False
+            if code == anc:
+                return True
+            row = self._row(self._ancestors, term)
+            pos = np.searchsorted(row, anc)
+            return bool(pos < len(row) and row[pos] == anc)
+
+        codes = self.codes(term)
+        members = np.append(self._row(self._descendants, ancestor), anc)
+        return np.isin(codes, members)
+
+    # ── Persistence ──────────────────────────────────────────────────────────
+
+    @classmethod
+    def cache_path(cls, file_path: str | Path, closure_relations=("is_a",)) -> Path | None:
+        directory = cache_dir("parsed")
+        if directory is None:
+            return None
+        suffix = "+".join(sorted(closure_relations))
+        return directory / f"{Path(file_path).name}.{suffix}.ontology.npz"
+
+    def save(self, path: str | Path, source: str = "") -> Path:
+        path = Path(path)
+        ids_offsets, ids_blob = _encode_strings(self.ids)
+        names_offsets, names_blob = _encode_strings(self.names)
+        has_name = np.array([n is not None for n in self.names], dtype=bool)
+        meta_offsets, meta_blob = _encode_strings(
+            [str(self.FORMAT_VERSION), source, *self.closure_relations]
+        )
+        rel_offsets, rel_blob = _encode_strings(list(self.relations))
+
+        arrays = {
+            "ids_offsets": ids_offsets, "ids_blob": ids_blob,
+            "names_offsets": names_offsets, "names_blob": names_blob, "has_name": has_name,
+            "meta_offsets": meta_offsets, "meta_blob": meta_blob,
+            "rel_offsets": rel_offsets, "rel_blob": rel_blob,
+            "anc_indptr": self._ancestors[0], "anc_indices": self._ancestors[1],
+        }
+        for i, (indptr, indices) in enumerate(self.relations.values()):
+            arrays[f"rel{i}_indptr"] = indptr
+            arrays[f"rel{i}_indices"] = indices
+
+        return save_npz(path, **arrays)
+
+    @classmethod
+    def load(cls, path: str | Path, expected_source: str | None = None):
+        """
+        Load an index written by save. Returns None when expected_source is
+        given and does not match the stored source signature.
+        """
+        with np.load(Path(path), allow_pickle=False) as data:
+            version, source, *closure_relations = _decode_strings(data["meta_offsets"], data["meta_blob"])
+            if int(version) != cls.FORMAT_VERSION:
+                return None
+            if expected_source is not None and source != expected_source:
+                return None
+
+            ids = _decode_strings(data["ids_offsets"], data["ids_blob"])
+            names = [
+                name if present else None
+                for name, present in zip(_decode_strings(data["names_offsets"], data["names_blob"]), data["has_name"])
+            ]
+            relations = {
+                relation: (data[f"rel{i}_indptr"], data[f"rel{i}_indices"])
+                for i, relation in enumerate(_decode_strings(data["rel_offsets"], data["rel_blob"]))
+            }
+            ancestors = (data["anc_indptr"], data["anc_indices"])
+
+        return cls(ids, names, relations, closure_relations, ancestors=ancestors)
@@ -1,17 +1,154 @@
 from pathlib import Path
-import gzip
-import pandas as pd
+import io
 import json
-import obonet
 import csv
+import itertools
+import os
+import re
+import shutil
+from FBD.core.config import Config
+from FBD.core.events import Events
+from FBD.core.lazy import lazy_import, optional_import
+from FBD.client.formats import FileFormat
+from FBD.client.parser_registry import ParserRegistry
+
+pd = lazy_import("pandas")
+nx = lazy_import("networkx")
+
+# OBO tags holding a single value per stanza; any other tag is collected into
+# a list. Same tables as obonet, so obo_to_graph keeps its attribute layout.
+_OBO_SINGULAR_TAGS = {
+    "header": frozenset({
+        "format-version", "data-version", "version", "ontology", "date", "saved-by",
+        "auto-generated-by", "default-relationship-id-prefix",
+    }),
+    "Term": frozenset({
+        "id", "is_anonymous", "name", "namespace", "def", "comment", "is_obsolete",
+        "builtin", "created_by", "creation_date",
+    }),
+    "Typedef": frozenset({
+        "id", "is_anonymous", "name", "namespace", "def", "domain", "range", "is_cyclic",
+        "is_reflexive", "is_symmetric", "is_anti_symmetric", "is_transitive",
+        "is_metadata_tag", "is_class_level",
+    }),
+    "Instance": frozenset({
+        "id", "is_anonymous", "name", "namespace", "comment", "instance_of", "created_by",
+        "creation_date", "is_obsolete",
+    }),
+}
+
+# tag: value {trailing modifier} ! comment
+_OBO_TAG_LINE = re.compile(
+    r"^(?P<tag>.+?):\s*(?P<value>.*?)"
+    r"(?:\s(?P<trailing_modifier>(?<!\\)\{[^{}]*\}))?"
+    r"(?:\s(?P<comment>(?<!\\)![^\n]*))?\s*$"
+)
+_JSON_BLOCK_SIZE = 1 << 20
+_JSON_WHITESPACE = re.compile(r"[ \t\n\r]*")
+
+_OBO_COMMENT = re.compile(r"\s!")
+_OBO_MODIFIER = re.compile(r"\s\{[^{}]*\}")
+_OBO_MODIFIER_TAIL = re.compile(r"(?:\s![^\n]*)?\s*$")
+
+# Parser types Parse.parse_stream can read from a non-seekable stream.
+STREAMING_PARSERS = ("tsv", "fb", "json")
+
+
+class _TsvScanner:
+    """
+    Incremental form of Parse._tsv_is_regular: feed() the raw TSV bytes
+    block by block, in order, and read .regular. A block may split lines
+    anywhere; finish() must be called once after the last block.
+    """
+
+    def __init__(self, skiprows: int, sep: str = "\t"):
+        self.skiprows = skiprows
+        self.sep = sep.encode()
+        self.sep_byte = ord(sep)
+        self.regular = True
+        self.max_seps = None
+        self._seen = 0
+        self._pending = b""
+        self._carry = 0
+
+    def feed(self, block) -> bool:
+        if not self.regular:
+            return False
+
+        if self.max_seps is None:
+            data = self._pending + bytes(block)
+            start = 0
+            while True:
+                end = data.find(b"\n", start)
+                if end < 0:
+                    self._pending = data[start:]
+                    if b'"' in self._pending or b"\r" in self._pending:
+                        self.regular = False
+                    return self.regular
+
+                line = data[start:end + 1]
+                start = end + 1
+                if b'"' in line or b"\r" in line:
+                    self.regular = False
+                    return False
+                self._seen += 1
+                if self._seen > self.skiprows and line != b"\n":
+                    self.max_seps = line.count(self.sep)
+                    self._pending = b""
+                    block = data[start:]
+                    break
+
+        return self._scan(block)
+
+    def _scan(self, block) -> bool:
+        import numpy as np
+
+        arr = np.frombuffer(block, dtype=np.uint8)
+        if (arr == 0x22).any() or (arr == 0x0D).any():
+            self.regular = False
+            return False
+
+        seps = np.flatnonzero(arr == self.sep_byte)
+        newlines = np.flatnonzero(arr == 0x0A)
+        if newlines.size:
+            per_line = np.diff(np.searchsorted(seps, newlines), prepend=0)
+            per_line[0] += self._carry
+            if per_line.max() > self.max_seps:
+                self.regular = False
+                return False
+            self._carry = seps.size - np.searchsorted(seps, newlines[-1])
+        else:
+            self._carry += seps.size
+
+        if self._carry > self.max_seps:
+            self.regular = False
+        return self.regular
+
+    def finish(self) -> bool:
+        if self.regular and self.max_seps is None:
+            # A header on the last, unterminated line still counts; no header at all does not.
+            self.regular = bool(self._pending) and self._seen + 1 > self.skiprows
+        return self.regular
+
 
 class Parse:
 
     @staticmethod
-    def parse(file_path: str | Path, parser_type: str, config: dict | None = None, header: int | None = None):
+    def parse(
+        file_path: str | Path,
+        parser_type: str,
+        config: dict | None = None,
+        header: int | None = None,
+        usecols: list[str] | None = None,
+        chunksize: int | None = None,
+    ):
         """
         Unified parser entrypoint used by higher layers.
 
+        The implementation is looked up in ParserRegistry by parser_type; when
+        several are registered, the fastest one able to serve the request is
+        used.
+
         Parameters
         ----------
         file_path : str | Path
@@ -22,41 +159,103 @@ class Parse:
             Parser-specific configuration.
         header : int | None
             Optional TSV header line override.
+        usecols : list[str] | None
+            Only load these columns (projection).
+        chunksize : int | None
+            Return an iterator of DataFrames with this many rows each.
         """
+        if not ParserRegistry.candidates(parser_type):
+            raise ValueError(f"Unsupported parser_type: {parser_type}")
+
         config = config or {}
+        spec = ParserRegistry.select(
+            parser_type,
+            file_path=file_path,
+            config=config,
+            header=header,
+            chunking=chunksize is not None,
+            projection=usecols is not None,
+            compressed=Path(file_path).exists() and Parse.is_compressed(file_path),
+        )
+        return spec(file_path, config, header, **Parse.parse_options(usecols, chunksize))
 
-        if parser_type == "tsv":
-            return Parse.tsv_to_df(file_path, header)["data"]
+    @staticmethod
+    def parse_options(usecols: list[str] | None = None, chunksize: int | None = None) -> dict:
+        """Keyword options to forward to a registered parser."""
+        options = {}
+        if usecols is not None:
+            options["usecols"] = list(usecols)
+        if chunksize is not None:
+            options["chunksize"] = chunksize
+        return options
 
-        if parser_type == "affy":
-            return Parse.affy_to_df(file_path)["data"]
+    @staticmethod
+    def row_count(data) -> int | None:
+        """
+        Rows in a parser result (DataFrame, result dict, mapping or graph
+        nodes); None for iterators of chunks, which are not consumed.
+        """
+        if isinstance(data, dict) and "data" in data:
+            data = data["data"]
+        if hasattr(data, "shape"):
+            return int(data.shape[0])
+        if hasattr(data, "number_of_nodes"):
+            return data.number_of_nodes()
+        if isinstance(data, dict):
+            return len(data)
+        return None
 
-        if parser_type == "json":
-            return Parse.json_to_df(file_path)
+    # Registry entrypoints: target(file_path, config, header, **options)
 
-        if parser_type == "obo":
-            return Parse.obo_to_graph(file_path)
+    @staticmethod
+    def _run_tsv(file_path, config, header, **options):
+        return Parse.tsv_to_df(file_path, header, **options)["data"]
 
-        if parser_type == "txt":
-            sep = config.get("sep", "\t")
-            return Parse.txt_to_df(file_path, sep=sep)
+    @staticmethod
+    def _run_tsv_c(file_path, config, header, **options):
+        return Parse.tsv_to_df(file_path, header, engine="c", **options)["data"]
 
-        if parser_type == "fb":
-            return Parse.fb_to_df(
-                file_path,
-                start_line=config["start_line"],
-                columns=config["columns"],
-            )
+    @staticmethod
+    def _run_tsv_parallel(file_path, config, header, **options):
+        return Parse.tsv_to_df(file_path, header, workers=Parse.parse_workers(), **options)["data"]
+
+    @staticmethod
+    def _run_affy(file_path, config, header, **options):
+        return Parse.affy_to_df(file_path)["data"]
+
+    @staticmethod
+    def _run_json(file_path, config, header, **options):
+        return Parse.json_to_df(file_path, **options)
+
+    @staticmethod
+    def _run_obo(file_path, config, header, **options):
+        return Parse.obo_to_graph(file_path)
+
+    @staticmethod
+    def _run_txt(file_path, config, header, **options):
+        return Parse.txt_to_df(file_path, sep=config.get("sep", "\t"), **options)
+
+    @staticmethod
+    def _run_fb(file_path, config, header, **options):
+        return Parse.fb_to_df(
+            file_path,
+            start_line=config["start_line"],
+            columns=config["columns"],
+            **options,
+        )
 
-        raise ValueError(f"Unsupported parser_type: {parser_type}")
-    
     @staticmethod    
     def is_gzip(path):
         """
-        Return True if the file is gzip-compressed, based on magic bytes.
+        Return True if the file is gzip-compressed (including bgzip), based
+        on magic bytes.
         """
-        with open(path, "rb") as f:
-            return f.read(2) == b"\x1f\x8b"
+        return FileFormat.compression(path) in ("gzip", "bgzip")
+
+    @staticmethod
+    def is_compressed(path):
+        """Return True if the file is compressed with any codec FileFormat knows."""
+        return FileFormat.compression(path) is not None
         
     @staticmethod
     def clean_columns_name(df):
@@ -66,13 +265,206 @@ class Parse:
         
     @staticmethod
     def clean_df(df):
-        df = Parse.clean_columns_name(df)
-        df = df.dropna(how="all")
-        if df.columns[0].strip() == "":
-            df = df.iloc[:, 1:]
-        df = df[~df.iloc[:, 0].astype(str).str.startswith("## Finished")]
-        return df   
+        with Events.span("parse.clean", rows_in=len(df)) as event:
+            df = Parse.clean_columns_name(df)
+            df = df.dropna(how="all")
+            if df.columns[0].strip() == "":
+                df = df.iloc[:, 1:]
+            df = df[~df.iloc[:, 0].astype(str).str.startswith("## Finished")]
+            event["rows"] = len(df)
+        return df
+
+    @staticmethod
+    def _usecols_filter(usecols):
+        """
+        pandas ``usecols`` callable matching raw header names against the
+        requested names as they look after clean_columns_name.
+        """
+        wanted = set(usecols)
+        return lambda name: re.sub(r"^[#\s]+", "", str(name)) in wanted
+
+    @staticmethod
+    def _project(df, usecols):
+        """Clean df and, if usecols is given, check and order the projected columns."""
+        if usecols is None:
+            return Parse.clean_df(df)
+
+        found = {re.sub(r"^[#\s]+", "", str(c)) for c in df.columns}
+        missing = [c for c in usecols if c not in found]
+        if missing:
+            raise ValueError(f"Unknown columns: {missing}")
+        return Parse.clean_df(df)[list(usecols)]
+
+    @staticmethod
+    def _read_table(file_path: Path, label: str, usecols=None, chunksize=None, **read_kwargs):
+        """
+        Run pd.read_csv over a plain or compressed file and clean the
+        result. With chunksize, return a generator of cleaned DataFrames that
+        keeps the file open until it is exhausted.
+        """
+        if usecols is not None:
+            read_kwargs["usecols"] = Parse._usecols_filter(usecols)
+
+        if chunksize is not None:
+            return Parse._iter_table(file_path, label, usecols, chunksize, read_kwargs)
+
+        try:
+            with Events.span("parse.read", path=str(file_path), format=label) as event:
+                with FileFormat.open(file_path, "rt") as f:
+                    df = pd.read_csv(f, **read_kwargs)
+                event["rows"] = len(df)
+        except Exception as e:
+            raise RuntimeError(f"Error reading {label} '{file_path}': {e}")
+
+        return Parse._project(df, usecols)
+
+    @staticmethod
+    def _iter_table(file_path: Path, label: str, usecols, chunksize, read_kwargs):
+        with FileFormat.open(file_path, "rt") as f:
+            try:
+                reader = pd.read_csv(f, chunksize=chunksize, **read_kwargs)
+                with reader:
+                    for chunk in reader:
+                        yield Parse._project(chunk, usecols)
+            except (OSError, EOFError) as e:
+                raise RuntimeError(f"Error reading {label} '{file_path}': {e}")
+
+    @staticmethod
+    def _tsv_is_regular(file_path, config=None, header=None, sep="\t", block_size=1 << 22) -> bool:
+        """
+        Return True when the pandas C engine parses this TSV exactly like the
+        python engine used by tsv_to_df: no quote or carriage-return bytes
+        and no line after the header with more fields than the header. Those
+        are the cases where the two engines disagree (quoting, implicit index
+        columns, bad-line skipping). The scan is vectorized with numpy and
+        does not build any DataFrame.
+        """
+        file_path = Path(file_path)
+        if header is None:
+            header = Parse.detect_header_line(file_path, sep)
+        scanner = _TsvScanner(max(header - 1, 0), sep)
+
+        with FileFormat.open(file_path, "rb") as f:
+            while True:
+                block = f.read(block_size)
+                if not block:
+                    return scanner.finish()
+                if not scanner.feed(block):
+                    return False
           
+    @staticmethod
+    def parse_workers() -> int:
+        """Worker processes for parallel TSV parsing, from Config.PARSE_WORKERS."""
+        workers = Config.PARSE_WORKERS
+        if workers is None:
+            return os.cpu_count() or 1
+        return max(int(workers), 1)
+
+    @staticmethod
+    def _tsv_parallel_ok(file_path, config=None, header=None) -> bool:
+        """
+        Registry probe for the parallel TSV parser: more than one worker is
+        configured and the file is plain and at least
+        Config.PARSE_PARALLEL_MIN_BYTES, so splitting it pays for the pool.
+        """
+        file_path = Path(file_path)
+        return (
+            Parse.parse_workers() > 1
+            and file_path.stat().st_size >= Config.PARSE_PARALLEL_MIN_BYTES
+            and not Parse.is_compressed(file_path)
+        )
+
+    @staticmethod
+    def _tsv_split(file_path: Path, header: int, parts: int):
+        """
+        Locate the header line of a plain TSV and cut the rows after it into
+        up to parts byte ranges that start and end on line boundaries.
+
+        Returns (header_line, ranges), or None when a line up to the header
+        has a quote or carriage return (see _tsv_is_regular) or there is no
+        header line at all.
+        """
+        skiprows = max(header - 1, 0)
+        with open(file_path, "rb") as f:
+            seen = 0
+            while True:
+                line = f.readline()
+                if not line or b'"' in line or b"\r" in line:
+                    return None
+                seen += 1
+                if seen > skiprows and line != b"\n":
+                    break
+            header_line = line if line.endswith(b"\n") else line + b"\n"
+
+            start = f.tell()
+            size = f.seek(0, os.SEEK_END)
+            bounds = [start]
+            for i in range(1, parts):
+                f.seek(max(start + (size - start) * i // parts - 1, bounds[-1]))
+                f.readline()
+                if f.tell() > bounds[-1] and f.tell() < size:
+                    bounds.append(f.tell())
+            bounds.append(size)
+
+        return header_line, list(zip(bounds[:-1], bounds[1:]))
+
+    @staticmethod
+    def _tsv_read_range(file_path, header_line: bytes, start: int, end: int, usecols=None):
+        """
+        Worker side of the parallel TSV parse: read bytes [start, end) under
+        header_line with the C engine, uncleaned. Returns None when the
+        range is not regular, since the python engine may read it differently.
+        """
+        with open(file_path, "rb") as f:
+            f.seek(start)
+            data = header_line + f.read(end - start)
+
+        scanner = _TsvScanner(0)
+        if not (scanner.feed(data) and scanner.finish()):
+            return None
+
+        read_kwargs = Parse._tsv_read_kwargs(1, "c")
+        if usecols is not None:
+            read_kwargs["usecols"] = Parse._usecols_filter(usecols)
+        return pd.read_csv(io.BytesIO(data), **read_kwargs)
+
+    @staticmethod
+    def _read_tsv_parallel(file_path: Path, header: int, usecols, workers: int):
+        """
+        Parse a plain TSV in a process pool, one newline-aligned byte range
+        per worker, and concatenate the parts in file order before
+        cleaning. Each part is the rows pd.read_csv would have produced for
+        that stretch of the file, so the concatenation (and clean_df on it)
+        equals the sequential read. If any range is irregular, the whole file
+        is read sequentially with the python engine instead.
+        """
+        from concurrent.futures import ProcessPoolExecutor
+
+        with Events.span("parse.read", path=str(file_path), format="TSV", workers=workers) as event:
+            split = Parse._tsv_split(file_path, header, workers)
+            parts = None
+            if split is not None:
+                header_line, ranges = split
+                try:
+                    with ProcessPoolExecutor(min(workers, len(ranges))) as pool:
+                        parts = list(pool.map(
+                            Parse._tsv_read_range,
+                            *zip(*[(file_path, header_line, start, end, usecols) for start, end in ranges]),
+                        ))
+                except Exception as e:
+                    raise RuntimeError(f"Error reading TSV '{file_path}': {e}")
+
+            if parts is None or any(part is None for part in parts):
+                event["fallback"] = True
+                df = None
+            else:
+                df = pd.concat(parts, ignore_index=True) if len(parts) > 1 else parts[0]
+                event["rows"] = len(df)
+
+        if df is None:
+            return Parse._read_table(file_path, "TSV", usecols=usecols, **Parse._tsv_read_kwargs(header, "python"))
+        return Parse._project(df, usecols)
+
     @staticmethod
     def detect_header_line(path: Path, sep="\t") -> int:
         """
@@ -87,24 +479,20 @@ class Parse:
         -------
         int
             Index of the detected header line.
+
+        Lines are read lazily, so only the file prefix up to the header is
+        decompressed.
         """
-        opener = gzip.open if Parse.is_gzip(path) else open
-    
-        with opener(path, "rt", encoding="utf-8", errors="replace") as f:
-            lines = f.readlines()
-    
-        for i, line in enumerate(lines):
-            cols = line.rstrip("\n").split(sep)
-    
-            if len(cols) < 2:
-                continue
-    
-            if i + 1 < len(lines):
-                next_cols = lines[i + 1].rstrip("\n").split(sep)
-    
-                if len(next_cols) == len(cols):
-                    return i
-    
+        with Events.span("parse.detect_header", path=str(path)) as event:
+            with FileFormat.open(path, "rt", errors="replace") as f:
+                previous = None
+                for i, line in enumerate(f):
+                    width = len(line.rstrip("\n").split(sep))
+                    if previous is not None and previous >= 2 and width == previous:
+                        event["header"] = i - 1
+                        return i - 1
+                    previous = width
+
         raise RuntimeError("Unable to detect a valid header line in the TSV file.")
     
     @staticmethod
@@ -134,9 +522,12 @@ class Parse:
 
         output_path = src_path.with_suffix("")
 
-        with gzip.open(src_path, "rb") as f_in:
-            with open(output_path, "wb") as f_out:
-                f_out.write(f_in.read())
+        with Events.span("decompress", path=str(src_path), codec="gzip") as event:
+            event["compressed_bytes"] = src_path.stat().st_size
+            with FileFormat.open(src_path, "rb", compression="gzip") as f_in:
+                with open(output_path, "wb") as f_out:
+                    shutil.copyfileobj(f_in, f_out, FileFormat.BUFFER_SIZE)
+                    event["bytes"] = f_out.tell()
 
         if delete_compressed:
             try:
@@ -147,7 +538,14 @@ class Parse:
         return output_path
     
     @staticmethod
-    def tsv_to_df(file_path: str | Path, header: int | None = 0):
+    def tsv_to_df(
+        file_path: str | Path,
+        header: int | None = 0,
+        usecols: list[str] | None = None,
+        chunksize: int | None = None,
+        engine: str = "python",
+        workers: int | None = None,
+    ):
         """
         Load a TSV file into a pandas DataFrame, handling both normal and gzip-compressed files.
 
@@ -157,6 +555,17 @@ class Parse:
             Path to the TSV file.
             header : int | None
                 Row index of the header. If None, header is auto-detected using detect_header_line().
+            usecols : list[str] | None
+                Only load these columns (names as returned after cleaning).
+            chunksize : int | None
+                If given, "data" is an iterator of DataFrames of this many rows.
+            engine : str
+                pandas parser engine. "c" is much faster but only equivalent
+                for files accepted by _tsv_is_regular().
+            workers : int | None
+                With more than one worker, a plain file read without chunksize
+                is split at line boundaries and parsed in a process pool. The
+                result is identical to the sequential python-engine read.
 
         Returns
         -------
@@ -169,40 +578,15 @@ class Parse:
             header = Parse.detect_header_line(file_path)
             
         
-        skiprows = header - 1
-        
         if not file_path.exists():
             raise FileNotFoundError(f"File not found: {file_path}")
 
-        try:
-            if Parse.is_gzip(file_path):
-                with gzip.open(file_path, "rt", encoding="utf-8") as f:
-                    df = pd.read_csv(
-                        f,
-                        sep="\t",
-                        skiprows=skiprows,
-                        header=0,
-                        dtype=str,
-                        engine="python",
-                        on_bad_lines="skip",
-                    )
-            else:
-                df = pd.read_csv(
-                    file_path,
-                    sep="\t",
-                    skiprows=skiprows,
-                    header=0,
-                    dtype=str,
-                    engine="python",
-                    on_bad_lines="skip",
-                )
-        
-        except Exception as e:
-            raise RuntimeError(
-                f"Error reading TSV '{file_path}': {e}"
+        if workers and workers > 1 and chunksize is None and not Parse.is_compressed(file_path):
+            data = Parse._read_tsv_parallel(file_path, header, usecols, workers)
+        else:
+            data = Parse._read_table(
+                file_path, "TSV", usecols=usecols, chunksize=chunksize, **Parse._tsv_read_kwargs(header, engine)
             )
-            
-        data = Parse.clean_df(df)  
         
         return {
             "filename": file_path.name, 
@@ -210,6 +594,115 @@ class Parse:
             "data": data
         }
     
+    @staticmethod
+    def _tsv_read_kwargs(header: int, engine: str) -> dict:
+        return {
+            "sep": "\t",
+            "skiprows": header - 1,
+            "header": 0,
+            "dtype": str,
+            "engine": engine,
+            "on_bad_lines": "skip",
+        }
+
+    @staticmethod
+    def stream_scanner(parser_type: str, header: int | None):
+        """
+        Regularity scanner to feed with the raw bytes of a streamed TSV, so
+        the C engine used by parse_stream can be checked against tsv_to_df's
+        python engine; None for other parser types.
+        """
+        if parser_type != "tsv" or header is None:
+            return None
+        return _TsvScanner(max(header - 1, 0))
+
+    @staticmethod
+    def parse_stream(
+        stream,
+        parser_type: str,
+        config: dict | None = None,
+        header: int | None = None,
+        usecols: list[str] | None = None,
+        chunksize: int | None = None,
+    ):
+        """
+        Parse an open, uncompressed binary stream that can only be read
+        once (e.g. a download still in progress), for the parser types in
+        STREAMING_PARSERS. Output matches Parse.parse on the same bytes,
+        except that TSV is always read with the C engine: check the
+        stream_scanner result before trusting it.
+        """
+        config = config or {}
+        if parser_type == "tsv":
+            if header is None:
+                raise ValueError("Streaming a TSV requires a known header line")
+            return Parse._read_table(
+                stream, "TSV", usecols=usecols, chunksize=chunksize, **Parse._tsv_read_kwargs(header, "c")
+            )
+
+        if parser_type == "fb":
+            columns = config["columns"]
+            if usecols is not None:
+                missing = [c for c in usecols if c not in columns]
+                if missing:
+                    raise ValueError(f"Unknown columns: {missing}")
+            chunks = Parse._iter_fb(stream, config["start_line"], columns, usecols, chunksize)
+            if chunksize is not None:
+                return chunks
+            df, = chunks
+            return df
+
+        if parser_type == "json":
+            if usecols is not None or chunksize is not None:
+                chunks = Parse._iter_json(stream, usecols, chunksize)
+                if chunksize is not None:
+                    return chunks
+                df, = chunks
+                return df
+            return Parse._json_from_file(stream, "stream")
+
+        raise ValueError(f"parser_type '{parser_type}' cannot be parsed from a stream")
+
+    @staticmethod
+    def parse_prefix(
+        data: bytes,
+        parser_type: str,
+        config: dict | None = None,
+        header: int | None = None,
+        eof: bool = False,
+    ):
+        """
+        Parse the first bytes of a dataset file, already decompressed, into
+        a DataFrame of its complete rows, as Parse.parse would return them.
+        Unless eof is True, a trailing partial line (or JSON record) is
+        dropped. Only for the parser types in STREAMING_PARSERS.
+        """
+        config = config or {}
+        if parser_type == "json":
+            text = io.TextIOWrapper(io.BytesIO(data), encoding="utf-8", errors="replace")
+            rows = []
+            try:
+                for record in Parse._iter_json_records(text):
+                    rows.append(record)
+            except ValueError:
+                if eof:
+                    raise
+            return Parse._json_frame(rows, None, 0, set())
+
+        if not eof:
+            data = data[:data.rfind(b"\n") + 1]
+
+        if parser_type == "tsv":
+            if header is None:
+                header = Parse.detect_header_line(io.BytesIO(data))
+            return Parse._read_table(io.BytesIO(data), "TSV", **Parse._tsv_read_kwargs(header, "python"))
+
+        if parser_type == "fb":
+            df, = Parse._iter_fb(io.BytesIO(data), config["start_line"], config["columns"], None, None)
+            return df
+
+        raise ValueError(f"parser_type '{parser_type}' has no prefix parser")
+
     @staticmethod
     def affy_to_df(file_path: str | Path, to_dict: bool = False):
         """
@@ -234,19 +727,9 @@ class Parse:
             raise FileNotFoundError(f"File not found: {file_path}")
 
         try:
-            if Parse.is_gzip(file_path):
-                with gzip.open(file_path, "rt", encoding="utf-8") as f:
-                    df = pd.read_csv(
-                        f,
-                        sep="\t",
-                        header=None,
-                        dtype=str,
-                        engine="python",
-                        on_bad_lines="skip",
-                    )
-            else:
+            with FileFormat.open(file_path, "rt") as f:
                 df = pd.read_csv(
-                    file_path,
+                    f,
                     sep="\t",
                     header=None,
                     dtype=str,
@@ -270,84 +753,363 @@ class Parse:
         }
     
     @staticmethod
-    def json_to_df(file_path: str | Path):
+    def json_to_df(file_path: str | Path, usecols: list[str] | None = None, chunksize: int | None = None):
         """
         Load a JSON file and return either:
         - A raw Python dict, or
         - A DataFrame if the JSON contains a top-level 'data' key.
 
-        Handles both plain JSON and gzip-compressed JSON files.
+        With chunksize or usecols the top-level 'data' array is streamed
+        record by record instead: chunksize returns a generator of
+        DataFrames, usecols keeps only those keys of each record. Streaming
+        uses ijson when it is installed and json.JSONDecoder.raw_decode over
+        buffered blocks otherwise; full loads use orjson when installed.
+
+        Handles plain and compressed (gzip, bgzip, zstd) JSON files.
         """
         file_path = Path(file_path)
 
         if not file_path.exists():
             raise FileNotFoundError(f"JSON file not found: {file_path}")
 
-        try:
-            with gzip.open(file_path, "rt", encoding="utf-8") as f:
-                data = json.load(f)
+        if usecols is not None or chunksize is not None:
+            chunks = Parse._iter_json(file_path, usecols, chunksize)
+            if chunksize is not None:
+                return chunks
+            df, = chunks
+            return df
 
-        except gzip.BadGzipFile:
-            try:
-                with open(file_path, "r", encoding="utf-8") as f:
-                    data = json.load(f)
-            except Exception as e:
-                raise RuntimeError(f"Error reading JSON '{file_path}': {e}")
+        return Parse._json_from_file(file_path, file_path)
 
+    @staticmethod
+    def _json_from_file(source, label):
+        """Full JSON load of a path or open binary stream, as json_to_df returns it."""
+        orjson = optional_import("orjson")
+        try:
+            with Events.span("parse.read", path=str(label), format="JSON"):
+                with FileFormat.open(source, "rb") as f:
+                    data = orjson.loads(f.read()) if orjson is not None else json.load(f)
         except Exception as e:
-            raise RuntimeError(f"Error opening gzip JSON '{file_path}': {e}")
+            raise RuntimeError(f"Error reading JSON '{label}': {e}")
 
         if isinstance(data, dict) and "data" in data:
             try:
-                return pd.DataFrame(data["data"])
+                with Events.span("parse.convert", rows=len(data["data"]), format="JSON"):
+                    return pd.DataFrame(data["data"])
             except Exception:
                 return data
 
         return data
-    
+
     @staticmethod
-    def obo_to_graph(file_path: str | Path):
+    def _iter_json(file_path: Path, usecols, chunksize):
         """
-        Load an OBO ontology file into a networkx graph object using obonet.
+        Yield DataFrames of chunksize records from the top-level 'data'
+        array (a single DataFrame when chunksize is None), with a RangeIndex
+        continuing across chunks.
+        """
+        ijson = optional_import("ijson")
+        with FileFormat.open(file_path, "rb") as f:
+            if ijson is not None:
+                records = ijson.items(f, "data.item", use_float=True)
+            else:
+                records = Parse._iter_json_records(io.TextIOWrapper(f, encoding="utf-8"))
+
+            # Malformed documents raise ValueError (or ijson's JSONError, wrapped below).
+            errors = (OSError, EOFError) if ijson is None else (OSError, EOFError, ijson.JSONError)
+            rows, offset, seen = [], 0, set()
+            try:
+                for record in records:
+                    if usecols is not None:
+                        if offset == 0:
+                            seen.update(record)
+                        record = {c: record[c] for c in usecols if c in record}
+                    rows.append(record)
 
-        Supports both gzip-compressed and plain OBO files.
+                    if chunksize is not None and len(rows) >= chunksize:
+                        yield Parse._json_frame(rows, usecols, offset, seen)
+                        rows, offset = [], offset + len(rows)
+            except errors as e:
+                raise RuntimeError(f"Error reading JSON '{file_path}': {e}")
+
+            if rows or chunksize is None:
+                yield Parse._json_frame(rows, usecols, offset, seen)
+
+    @staticmethod
+    def _json_frame(rows, usecols, offset, seen):
+        if usecols is not None and offset == 0:
+            missing = [c for c in usecols if c not in seen]
+            if missing:
+                raise ValueError(f"Unknown columns: {missing}")
+        with Events.span("parse.convert", rows=len(rows), format="JSON"):
+            return pd.DataFrame(rows, columns=usecols, index=pd.RangeIndex(offset, offset + len(rows)))
+
+    @staticmethod
+    def _iter_json_records(f, key: str = "data"):
+        """
+        Yield the items of the top-level f[key] array one at a time, holding
+        only the current block of text and one decoded item in memory.
+        Values of other top-level keys are decoded and discarded.
+        """
+        decoder = json.JSONDecoder()
+        buf, pos, eof = "", 0, False
+
+        def fill():
+            nonlocal buf, pos, eof
+            # Grow geometrically so a value spanning many blocks is
+            # re-decoded O(log n) times, not once per block.
+            block = f.read(max(_JSON_BLOCK_SIZE, len(buf) - pos))
+            if not block:
+                eof = True
+                return False
+            buf, pos = buf[pos:] + block, 0
+            return True
+
+        def peek():
+            nonlocal pos
+            while True:
+                pos = _JSON_WHITESPACE.match(buf, pos).end()
+                if pos < len(buf):
+                    return buf[pos]
+                if not fill():
+                    return ""
+
+        def expect(char):
+            nonlocal pos
+            found = peek()
+            if found != char:
+                raise ValueError(f"Malformed JSON: expected '{char}', found '{found or 'EOF'}'")
+            pos += 1
+
+        def decode():
+            nonlocal pos
+            peek()
+            while True:
+                try:
+                    value, end = decoder.raw_decode(buf, pos)
+                except json.JSONDecodeError:
+                    if not fill():
+                        raise
+                    continue
+                # A number running into the buffer edge may be cut short
+                # ("1" of "1.5e3"); read on and decode it again.
+                if (
+                    not eof
+                    and isinstance(value, (int, float))
+                    and (end == len(buf) or buf[end] in "0123456789.eE+-")
+                    and fill()
+                ):
+                    continue
+                pos = end
+                return value
+
+        expect("{")
+        while peek() != "}":
+            name = decode()
+            expect(":")
+            if name != key:
+                decode()
+                if peek() == ",":
+                    pos += 1
+                continue
+
+            expect("[")
+            if peek() == "]":
+                return
+            while True:
+                yield decode()
+                if peek() == "]":
+                    return
+                expect(",")
+
+        raise ValueError(f"JSON has no top-level '{key}' array")
+
+    @staticmethod
+    def iter_obo(
+        file_path: str | Path,
+        stanza_types: list[str] | None = None,
+        relationships: list[str] | None = None,
+        tags: list[str] | None = None,
+        ignore_obsolete: bool = False,
+    ):
+        """
+        Lazily yield (stanza_type, stanza) pairs from a plain or compressed OBO file.
+
+        stanza_type is "header" for the leading header block, otherwise the
+        bracketed name ("Term", "Typedef", "Instance", ...). stanza is a dict
+        of tag -> value (single-valued tags) or tag -> list of values, with
+        trailing modifiers and comments stripped as obonet does.
+
+        Parameters
+        ----------
+        stanza_types : list[str] | None
+            Only yield these stanza types; other stanzas are skipped without
+            parsing their tag lines.
+        relationships : list[str] | None
+            Only keep ``is_a`` and ``relationship`` values of these relation
+            types (use "is_a" for is_a lines).
+        tags : list[str] | None
+            Only keep these tags, e.g. ["id", "name"].
+        ignore_obsolete : bool
+            Skip stanzas marked ``is_obsolete: true``.
         """
         file_path = Path(file_path)
 
         if not file_path.exists():
             raise FileNotFoundError(f"OBO file not found: {file_path}")
 
-        for open_fn, mode in [(gzip.open, "rt"), (open, "r")]:
-            try:
-                with open_fn(file_path, mode) as f:
-                    graph = obonet.read_obo(f)
-                    return graph
-            except gzip.BadGzipFile:
+        stanza_types = None if stanza_types is None else set(stanza_types)
+        relationships = None if relationships is None else set(relationships)
+        tags = None if tags is None else set(tags) | {"id"} | ({"is_obsolete"} if ignore_obsolete else set())
+
+        with FileFormat.open(file_path, "rt") as f:
+            stanza_type, lines = "header", []
+            for line in itertools.chain(f, ("",)):
+                stripped = line.strip()
+                if stripped and not stripped.startswith("["):
+                    lines.append(line)
+                    continue
+
+                if lines and (stanza_types is None or stanza_type in stanza_types):
+                    stanza = Parse._parse_obo_stanza(lines, stanza_type, relationships, tags)
+                    if not (ignore_obsolete and stanza.get("is_obsolete") == "true"):
+                        yield stanza_type, stanza
+                lines = []
+
+                if stripped:
+                    stanza_type = stripped[1:stripped.find("]")]
+
+    @staticmethod
+    def _parse_obo_stanza(lines: list[str], stanza_type: str, relationships=None, tags=None) -> dict:
+        singular = _OBO_SINGULAR_TAGS.get(stanza_type, frozenset())
+        stanza = {}
+        for line in lines:
+            if line.startswith("!"):
                 continue
-            except Exception as e:
-                raise RuntimeError(f"Error reading '{file_path}': {e}")
 
-        raise RuntimeError(f"Unable to process OBO file: {file_path}")
+            sep = line.find(":")
+            tag = line[:sep]
+            if tags is not None and tag not in tags:
+                continue
+
+            value = line[sep + 1:]
+            if sep <= 0:
+                match = _OBO_TAG_LINE.match(line)
+                if match is None:
+                    raise ValueError(f"Tag-value pair parsing failed for:\n{line}")
+                tag, value = match.group("tag"), match.group("value")
+            elif "{" in value or "!" in value:
+                value = Parse._obo_value(value)
+            else:
+                value = value.strip()
+
+            if relationships is not None:
+                if tag == "is_a" and "is_a" not in relationships:
+                    continue
+                if tag == "relationship" and value.partition(" ")[0] not in relationships:
+                    continue
+
+            if tag in singular:
+                stanza[tag] = value
+            else:
+                stanza.setdefault(tag, []).append(value)
+        return stanza
+
+    @staticmethod
+    def _obo_value(raw: str) -> str:
+        """
+        Value part of a tag line (text after the first colon) without its
+        trailing {modifier} and ! comment. Equivalent to the value group of
+        _OBO_TAG_LINE, but avoids its per-character backtracking.
+        """
+        raw = raw.strip()
+        end = len(raw)
+
+        comment = _OBO_COMMENT.search(raw)
+        if comment is not None:
+            end = comment.start()
+
+        if "{" not in raw:
+            return raw[:end]
+
+        for modifier in _OBO_MODIFIER.finditer(raw):
+            if modifier.start() >= end:
+                break
+            if _OBO_MODIFIER_TAIL.match(raw, modifier.end()):
+                end = modifier.start()
+                break
+
+        return raw[:end]
+
+    @staticmethod
+    def obo_to_graph(file_path: str | Path, relationships: list[str] | None = None):
+        """
+        Load an OBO ontology file into a networkx MultiDiGraph.
+
+        Built from Parse.iter_obo with the same layout as obonet.read_obo:
+        one node per non-obsolete term carrying its tags as attributes, and
+        child -> parent edges keyed by relation type (``is_a`` or the
+        relationship name). relationships restricts which edges are added.
+        Supports plain and compressed (gzip, bgzip, zstd) OBO files.
+        """
+        header, typedefs, instances, terms = {}, [], [], []
+        try:
+            for stanza_type, stanza in Parse.iter_obo(file_path, relationships=relationships):
+                if stanza_type == "Term":
+                    terms.append(stanza)
+                elif stanza_type == "Typedef":
+                    typedefs.append(stanza)
+                elif stanza_type == "Instance":
+                    instances.append(stanza)
+                elif stanza_type == "header":
+                    header = stanza
+        except FileNotFoundError:
+            raise
+        except Exception as e:
+            raise RuntimeError(f"Error reading '{file_path}': {e}")
+
+        if "ontology" in header:
+            header["name"] = header["ontology"]
+        graph = nx.MultiDiGraph(typedefs=typedefs, instances=instances, **header)
+
+        edges = []
+        for term in terms:
+            if term.get("is_obsolete", "false") == "true":
+                continue
+            term_id = term.pop("id")
+            graph.add_node(term_id, **term)
+
+            for target in term.pop("is_a", []):
+                edges.append((term_id, target, "is_a"))
+            for relationship in term.pop("relationship", []):
+                typedef, _, target = relationship.partition(" ")
+                edges.append((term_id, target, typedef))
+
+        for source, target, key in edges:
+            graph.add_edge(source, target, key=key)
+        return graph
 
     @staticmethod
-    def txt_to_df(file_path: str | Path, sep: str = "\t"):
+    def txt_to_df(
+        file_path: str | Path,
+        sep: str = "\t",
+        usecols: list[str] | None = None,
+        chunksize: int | None = None,
+    ):
         """
-        Load a plain text file into a pandas DataFrame.
-        Default separator is a tab, but can be customized.
+        Load a plain text file into a pandas DataFrame, handling both
+        normal and compressed files. Default separator is a tab, but can be
+        customized. With chunksize, return an iterator of DataFrames instead.
         """
         file_path = Path(file_path)
 
         if not file_path.exists():
             raise FileNotFoundError(f"TXT file not found: {file_path}")
 
-        try:
-            df = pd.read_csv(file_path, sep=sep, encoding="utf-8", engine="python")
-            return Parse.clean_df(df)  
-        except Exception as e:
-            raise RuntimeError(f"Error reading TXT '{file_path}': {e}")
+        return Parse._read_table(file_path, "TXT", usecols=usecols, chunksize=chunksize, sep=sep, engine="python")
     
     @staticmethod    
-    def fb_to_df(file_path, start_line, columns):
+    def fb_to_df(file_path, start_line, columns, usecols=None, chunksize=None):
         """
         Parse a FlyBase-style tab-delimited file (.fb), compressed or uncompressed.
 
@@ -358,39 +1120,74 @@ class Parse:
             Line index where the actual table starts.
         columns : list[str]
             Column names for the resulting DataFrame.
+        usecols : list[str] | None
+            Only keep these columns.
+        chunksize : int | None
+            If given, return an iterator of DataFrames of this many rows.
 
         Returns
         -------
         DataFrame
             Parsed and column-aligned DataFrame.
         """
-        data = None
         file_path = Path(file_path)
 
-        try:
-            with gzip.open(file_path, "rt", encoding="utf-8") as f:
-                reader = csv.reader(f, delimiter="\t")
-                data = list(reader)
+        if usecols is not None:
+            missing = [c for c in usecols if c not in columns]
+            if missing:
+                raise ValueError(f"Unknown columns: {missing}")
 
-        except gzip.BadGzipFile:
-            try:
-                with open(file_path, "r", encoding="utf-8") as f:
-                    reader = csv.reader(f, delimiter="\t")
-                    data = list(reader)
-            except Exception as e:
-                raise RuntimeError(f"Error reading plain-text file '{file_path}': {e}")
+        chunks = Parse._iter_fb(file_path, start_line, columns, usecols, chunksize)
+        if chunksize is not None:
+            return chunks
+
+        df, = chunks
+        return df
 
+    @staticmethod
+    def _iter_fb(file_path: Path, start_line: int, columns: list, usecols, chunksize):
+        """
+        Stream .fb records with csv.reader, pad or truncate them to the
+        declared columns and yield cleaned DataFrames of chunksize rows
+        (a single DataFrame when chunksize is None). The "## Finished"
+        footer is dropped while reading, before usecols can project away
+        the column that identifies it.
+        """
+        width = len(columns)
+        # The column clean_df checks for the footer (it drops a blank-named first column).
+        lead = 1 if width > 1 and columns[0].strip() == "" else 0
+        if usecols is not None:
+            keep = [columns.index(c) for c in usecols]
+            out_columns = list(usecols)
+        else:
+            keep = None
+            out_columns = columns
+
+        try:
+            f = FileFormat.open(file_path, "rt")
         except Exception as e:
-            raise RuntimeError(f"Error opening gzip file '{file_path}': {e}")
+            raise RuntimeError(f"Error reading file '{file_path}': {e}")
 
-        if data is None:
-            raise RuntimeError("Failed to read the file as gzip or plain text.")
+        with f:
+            rows, offset = [], 0
+            try:
+                for row in itertools.islice(csv.reader(f, delimiter="\t"), start_line, None):
+                    row = row[:width] if len(row) > width else row + [""] * (width - len(row))
+                    if row[lead].startswith("## Finished"):
+                        continue
+                    rows.append(row if keep is None else [row[i] for i in keep])
+
+                    if chunksize is not None and len(rows) >= chunksize:
+                        yield Parse._fb_frame(rows, out_columns, offset)
+                        rows, offset = [], offset + len(rows)
+            except (OSError, UnicodeDecodeError, csv.Error) as e:
+                raise RuntimeError(f"Error reading file '{file_path}': {e}")
 
-        cleaned_data = [
-            row[:len(columns)] if len(row) > len(columns)
-            else row + [""] * (len(columns) - len(row))
-            for row in data[start_line:]
-        ]
+            if rows or chunksize is None:
+                yield Parse._fb_frame(rows, out_columns, offset)
 
-        df = pd.DataFrame(cleaned_data, columns=columns)
-        return Parse.clean_df(df)  
+    @staticmethod
+    def _fb_frame(rows, columns, offset):
+        with Events.span("parse.convert", rows=len(rows), format="FB"):
+            df = pd.DataFrame(rows, columns=columns, index=pd.RangeIndex(offset, offset + len(rows)))
+        return Parse.clean_df(df)
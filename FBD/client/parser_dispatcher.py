@@ -1,33 +1,141 @@
 # -*- coding: utf-8 -*-
+import itertools
 from pathlib import Path
 
+from FBD.core.events import Events
 from FBD.client.data_manager import DataManager
-from FBD.client.parse import Parse
+from FBD.client.formats import FileFormat
+from FBD.client.parse import Parse, STREAMING_PARSERS
+from FBD.client.parser_registry import ParserRegistry
 
 
 class ParserDispatcher:
     """
     Resolve the appropriate parser from dataset metadata and transform
     the downloaded local file into the expected Python object.
+
+    Parsers are looked up in ParserRegistry by parser_type; the fastest
+    registered implementation that supports the request (chunking, column
+    projection, compressed input) and accepts the file is used.
+
+    The file's compression is taken from metadata["local_format"] when the
+    downloader recorded it, so parsers open it without sniffing it again.
+    Probes that scan the file (the tsv-c regularity check) keep their answer
+    in metadata["local_probes"] until the file changes, saved with the
+    metadata cache for datasets the downloader described.
+
+    Emits "parse.header_lookup" when the TSV header has to be fetched from
+    the edge function and "parse.dispatch" around the parser call, with the
+    parser_type, the selected parser and the row count when it is known.
     """
 
     @staticmethod
-    def parse(dataset: str, local_path: str | Path, metadata: dict) -> object:
+    def parse(
+        dataset: str,
+        local_path: str | Path,
+        metadata: dict,
+        columns: list[str] | None = None,
+        chunksize: int | None = None,
+    ) -> object:
         local_path = Path(local_path)
         parser_type = metadata.get("parser_type") or local_path.suffix.lstrip(".")
         parse_config = metadata.get("parse_config") or {}
         header = metadata.get("header")
 
+        if not ParserRegistry.candidates(parser_type):
+            raise ValueError(f"Unsupported extension or parser for '{dataset}': {parser_type}")
+
         if parser_type == "tsv":
             if header is None:
-                header = DataManager.get_header_line(dataset)
-
-        try:
-            return Parse.parse(
-                file_path=local_path,
-                parser_type=parser_type,
-                config=parse_config,
-                header=header,
-            )
-        except ValueError as exc:
-            raise ValueError(f"Unsupported extension or parser for '{dataset}': {parser_type}") from exc
+                with Events.span("parse.header_lookup", dataset=dataset) as event:
+                    header = DataManager.get_header_line(dataset)
+                    event["header"] = header
+
+        probes = FileFormat.probe_results(local_path, metadata)
+        known = dict(probes)
+        spec = ParserRegistry.select(
+            parser_type,
+            file_path=local_path,
+            config=parse_config,
+            header=header,
+            chunking=chunksize is not None,
+            projection=columns is not None,
+            compressed=local_path.exists() and FileFormat.compression(local_path, metadata) is not None,
+            probes=probes,
+        )
+        if probes != known and FileFormat.METADATA_KEY in metadata:
+            from FBD.client.downloader import Downloader
+
+            Downloader._save_metadata_cache(dataset, metadata)
+        with Events.span("parse.dispatch", dataset=dataset, parser_type=parser_type, parser=spec.name) as event:
+            data = spec(local_path, parse_config, header, **Parse.parse_options(columns, chunksize))
+            event["rows"] = Parse.row_count(data)
+        return data
+
+    @staticmethod
+    def streamable(metadata: dict) -> bool:
+        """True when parse_stream can parse this dataset while it downloads."""
+        parser_type = metadata.get("parser_type")
+        if parser_type == "tsv":
+            return metadata.get("header") is not None
+        return parser_type in STREAMING_PARSERS
+
+    @staticmethod
+    def parse_stream(
+        dataset: str,
+        stream,
+        metadata: dict,
+        columns: list[str] | None = None,
+        chunksize: int | None = None,
+    ) -> object:
+        """
+        Parse a DownloadStream as it arrives. The result matches parse() on
+        the finished file: a TSV is read with the C engine while the stream's
+        scanner checks that it is regular, and if it is not the rows are
+        taken from parse() on the completed cache file instead (with
+        chunksize, only the chunks not yielded yet).
+        """
+        parser_type = metadata["parser_type"]
+        args = (parser_type, metadata.get("parse_config") or {}, metadata.get("header"), columns, chunksize)
+
+        def sequential():
+            stream.wait()
+            return ParserDispatcher.parse(dataset, stream.destination, metadata, columns, chunksize)
+
+        if chunksize is None:
+            try:
+                with Events.span("parse.dispatch", dataset=dataset, parser_type=parser_type,
+                                 parser="stream") as event:
+                    data = Parse.parse_stream(stream, *args)
+                    event["rows"] = Parse.row_count(data)
+            except Exception:
+                stream.close()
+                stream.wait()
+                if stream.irregular:
+                    return sequential()
+                raise
+            stream.close()
+            stream.wait()
+            return sequential() if stream.irregular else data
+
+        def chunks():
+            yielded = 0
+            try:
+                for chunk in Parse.parse_stream(stream, *args):
+                    if stream.irregular:
+                        break
+                    yield chunk
+                    yielded += 1
+            except Exception:
+                stream.close()
+                stream.wait()
+                if not stream.irregular:
+                    raise
+            finally:
+                stream.close()
+
+            stream.wait()
+            if stream.irregular:
+                yield from itertools.islice(sequential(), yielded, None)
+
+        return chunks()
@@ -0,0 +1,230 @@
+# -*- coding: utf-8 -*-
+import importlib
+import warnings
+from importlib import metadata as importlib_metadata
+
+
+class ParserSpec:
+    """
+    Declarative description of one parser implementation.
+
+    target is the parser callable, or a "module:qualname" string resolved on
+    first use so that registering a parser never imports its dependencies.
+    The callable is invoked as target(file_path, config, header, **options),
+    where options may contain ``usecols`` (projection) and ``chunksize``
+    (chunked iteration) when the spec declares support for them.
+
+    probe, also a callable or "module:qualname", is an optional cheap check
+    probe(file_path, config, header) -> bool telling whether this
+    implementation handles the given file exactly; when it returns False the
+    dispatcher falls back to the next candidate. cache_probe declares that
+    the answer depends only on the file's bytes and the header, so callers
+    may keep it for as long as the file is unchanged (see
+    ParserRegistry.select).
+    """
+
+    def __init__(
+        self,
+        parser_type: str,
+        target,
+        name: str | None = None,
+        speed: int = 0,
+        chunking: bool = False,
+        projection: bool = False,
+        compressed: bool = False,
+        probe=None,
+        cache_probe: bool = False,
+    ):
+        self.parser_type = parser_type
+        self.target = target
+        self.name = name or parser_type
+        self.speed = speed
+        self.chunking = chunking
+        self.projection = projection
+        self.compressed = compressed
+        self.probe = probe
+        self.cache_probe = cache_probe
+
+    def __repr__(self):
+        return f"ParserSpec({self.parser_type!r}, name={self.name!r}, speed={self.speed})"
+
+    @staticmethod
+    def _resolve(target):
+        if not isinstance(target, str):
+            return target
+
+        module_name, _, qualname = target.partition(":")
+        obj = importlib.import_module(module_name)
+        for attr in qualname.split("."):
+            obj = getattr(obj, attr)
+        return obj
+
+    def supports(self, chunking: bool = False, projection: bool = False, compressed: bool = False) -> bool:
+        return (
+            (self.chunking or not chunking)
+            and (self.projection or not projection)
+            and (self.compressed or not compressed)
+        )
+
+    def accepts(self, file_path, config: dict, header: int | None, probes: dict | None = None) -> bool:
+        if self.probe is None:
+            return True
+        key = f"{self.name}:{header}"
+        if self.cache_probe and probes is not None and key in probes:
+            return probes[key]
+        try:
+            accepted = bool(self._resolve(self.probe)(file_path, config, header))
+        except (OSError, RuntimeError, ValueError):
+            return False
+        if self.cache_probe and probes is not None:
+            probes[key] = accepted
+        return accepted
+
+    def __call__(self, file_path, config: dict | None = None, header: int | None = None, **options):
+        return self._resolve(self.target)(file_path, config or {}, header, **options)
+
+
+# parser_type, target, name, speed, chunking, projection, compressed, probe, cache_probe
+_BUILTIN_PARSERS = (
+    ("tsv",  "FBD.client.parse:Parse._run_tsv_parallel", "tsv-parallel", 30, False, True, False,
+     "FBD.client.parse:Parse._tsv_parallel_ok", False),
+    ("tsv",  "FBD.client.parse:Parse._run_tsv_c", "tsv-c", 20, True,  True,  True,
+     "FBD.client.parse:Parse._tsv_is_regular", True),
+    ("tsv",  "FBD.client.parse:Parse._run_tsv",   "tsv",   10, True,  True,  True,  None, False),
+    ("affy", "FBD.client.parse:Parse._run_affy",  "affy",  10, False, False, True,  None, False),
+    ("json", "FBD.client.parse:Parse._run_json",  "json",  10, True,  True,  True,  None, False),
+    ("obo",  "FBD.client.parse:Parse._run_obo",   "obo",   10, False, False, True,  None, False),
+    ("txt",  "FBD.client.parse:Parse._run_txt",   "txt",   10, True,  True,  True,  None, False),
+    ("fb",   "FBD.client.parse:Parse._run_fb",    "fb",    10, True,  True,  True,  None, False),
+)
+
+
+class ParserRegistry:
+    """
+    Registry of parser implementations keyed by parser_type.
+
+    Built-in parsers are registered lazily on first lookup. Third-party
+    packages can add parsers through the "flybasedownloads.parsers" entry
+    point group; each entry point must load to a ParserSpec, an iterable of
+    ParserSpec, or a callable that receives this class and registers its own
+    parsers. All state and methods are class-level; the class is not
+    instantiated.
+    """
+
+    ENTRY_POINT_GROUP = "flybasedownloads.parsers"
+
+    _parsers: dict[str, list[ParserSpec]] = {}
+    _builtins_loaded = False
+    _entry_points_loaded = False
+
+    @classmethod
+    def register(cls, spec: ParserSpec, replace: bool = False) -> ParserSpec:
+        """
+        Add a parser implementation. With replace=True an existing spec with
+        the same parser_type and name is replaced; otherwise that is an error.
+        """
+        specs = cls._parsers.setdefault(spec.parser_type, [])
+        existing = [s for s in specs if s.name == spec.name]
+        if existing and not replace:
+            raise ValueError(f"Parser '{spec.name}' is already registered for '{spec.parser_type}'.")
+
+        specs[:] = [s for s in specs if s.name != spec.name] + [spec]
+        return spec
+
+    @classmethod
+    def unregister(cls, parser_type: str, name: str | None = None) -> None:
+        """Remove one implementation (by name) or every implementation of a parser_type."""
+        cls._ensure_loaded()
+        if name is None:
+            cls._parsers.pop(parser_type, None)
+            return
+        specs = cls._parsers.get(parser_type, [])
+        specs[:] = [s for s in specs if s.name != name]
+
+    @classmethod
+    def _register_builtins(cls) -> None:
+        for parser_type, target, name, speed, chunking, projection, compressed, probe, cache_probe in _BUILTIN_PARSERS:
+            if any(s.name == name for s in cls._parsers.get(parser_type, [])):
+                continue
+            cls.register(ParserSpec(
+                parser_type, target, name=name, speed=speed, chunking=chunking,
+                projection=projection, compressed=compressed, probe=probe, cache_probe=cache_probe,
+            ))
+
+    @classmethod
+    def _load_entry_points(cls) -> None:
+        try:
+            entry_points = importlib_metadata.entry_points(group=cls.ENTRY_POINT_GROUP)
+        except Exception:
+            return
+
+        for entry_point in entry_points:
+            try:
+                loaded = entry_point.load()
+                if isinstance(loaded, ParserSpec):
+                    cls.register(loaded, replace=True)
+                elif callable(loaded):
+                    loaded(cls)
+                else:
+                    for spec in loaded:
+                        cls.register(spec, replace=True)
+            except Exception as exc:
+                warnings.warn(f"Could not load parser plugin '{entry_point.name}': {exc}")
+
+    @classmethod
+    def _ensure_loaded(cls) -> None:
+        if not cls._builtins_loaded:
+            cls._builtins_loaded = True
+            cls._register_builtins()
+        if not cls._entry_points_loaded:
+            cls._entry_points_loaded = True
+            cls._load_entry_points()
+
+    @classmethod
+    def parser_types(cls) -> list[str]:
+        cls._ensure_loaded()
+        return sorted(t for t, specs in cls._parsers.items() if specs)
+
+    @classmethod
+    def candidates(cls, parser_type: str) -> list[ParserSpec]:
+        """All implementations for parser_type, fastest first."""
+        cls._ensure_loaded()
+        return sorted(cls._parsers.get(parser_type, []), key=lambda s: s.speed, reverse=True)
+
+    @classmethod
+    def select(
+        cls,
+        parser_type: str,
+        file_path=None,
+        config: dict | None = None,
+        header: int | None = None,
+        chunking: bool = False,
+        projection: bool = False,
+        compressed: bool = False,
+        probes: dict | None = None,
+    ) -> ParserSpec:
+        """
+        Pick the fastest implementation of parser_type that supports the
+        requested features and, when file_path is given, accepts the file.
+        probes, a dict kept by the caller for this file, holds the answers
+        of cache_probe probes: they are read from it and added to it, so
+        each such probe scans a given file once.
+
+        Raises ValueError if the parser_type is unknown or no implementation
+        is capable of serving the request.
+        """
+        specs = cls.candidates(parser_type)
+        if not specs:
+            raise ValueError(f"Unsupported parser_type: {parser_type}")
+
+        capable = [s for s in specs if s.supports(chunking, projection, compressed)]
+        if not capable:
+            needs = [name for name, flag in (
+                ("chunking", chunking), ("projection", projection), ("compressed input", compressed)
+            ) if flag]
+            raise ValueError(f"No '{parser_type}' parser supports {', '.join(needs)}.")
+
+        for spec in capable[:-1]:
+            if file_path is None or spec.accepts(file_path, config or {}, header, probes):
+                return spec
+        return capable[-1]
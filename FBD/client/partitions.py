@@ -0,0 +1,296 @@
+# -*- coding: utf-8 -*-
+import inspect
+import json
+from pathlib import Path
+
+from FBD.client.columnar import _FrameWriter, _read_frame
+from FBD.core.cache import source_signature, staged_dir
+from FBD.core.config import Config
+from FBD.core.events import Events
+from FBD.core.lazy import lazy_import
+
+np = lazy_import("numpy")
+pd = lazy_import("pandas")
+
+
+def _scalar(value):
+    """JSON-friendly partition key: numpy scalars as Python ones, missing values as None."""
+    if value is None or (not isinstance(value, str) and pd.isna(value)):
+        return None
+    return value.item() if hasattr(value, "item") else value
+
+
+def _where_values(where: dict) -> dict:
+    """{column: list of accepted values}; a scalar accepts itself, a list/tuple/set any of its items."""
+    if not isinstance(where, dict):
+        raise ValueError("where must be a dict of column -> value or list of values")
+    return {
+        column: list(values) if isinstance(values, (list, tuple, set, frozenset)) else [values]
+        for column, values in where.items()
+    }
+
+
+def _as_parsed(df, dtypes: dict):
+    """df with its categorical columns (text read back from the columnar files) cast to their parsed dtypes."""
+    categorical = {
+        name: pd.api.types.pandas_dtype(dtypes.get(name, "object"))
+        for name, dtype in df.dtypes.items() if isinstance(dtype, pd.CategoricalDtype)
+    }
+    return df.astype(categorical) if categorical else df
+
+
+def _in_range(value, stats: dict) -> bool:
+    """False only when value certainly lies outside the [min, max] of a column's stats."""
+    low, high = stats.get("min"), stats.get("max")
+    if low is None or high is None or value is None:
+        return True
+    if isinstance(low, str) != isinstance(value, str) or isinstance(value, (dict, list)):
+        return True
+    try:
+        return bool(low <= value <= high)
+    except TypeError:
+        return True
+
+
+class PartitionedCache:
+    """
+    Parsed datasets persisted under Config.CACHE_DIR / "partitions" /
+    <dataset>, split by the values of one column: one directory per
+    distinct value, each holding that partition's rows in the columnar
+    format of FBD.client.columnar (memory-mapped on read), plus rows.npy
+    with each row's position in the file.
+
+    partitions.json records, for every partition, its key, row count and
+    per-column statistics (min and max for numeric and text columns,
+    distinct count). Reads with a where filter open only the partitions
+    whose key and statistics can match it. All attributes and methods are
+    class-level; the class is not instantiated. A layout records the
+    signature of the file it was parsed from and is ignored once that file
+    changes.
+    """
+
+    FORMAT_VERSION = 2
+    CHUNKSIZE = 100_000
+    # More distinct values than this would mean tiny partitions and too many files.
+    MAX_PARTITIONS = 1024
+
+    @classmethod
+    def path(cls, dataset: str) -> Path:
+        return Path(Config.CACHE_DIR) / "partitions" / dataset.replace("/", "_")
+
+    @classmethod
+    def meta(cls, dataset: str, local_path=None) -> dict | None:
+        """The layout's partitions.json, or None when there is none (or, with local_path, it is stale)."""
+        try:
+            with open(cls.path(dataset) / "partitions.json", "r", encoding="utf-8") as fh:
+                meta = json.load(fh)
+        except (OSError, json.JSONDecodeError):
+            return None
+        if meta.get("version") != cls.FORMAT_VERSION:
+            return None
+        if local_path is not None and meta.get("source") != source_signature(local_path):
+            return None
+        return meta
+
+    @classmethod
+    def write(cls, dataset: str, chunks, column: str, local_path=None) -> dict:
+        """
+        Persist a DataFrame or an iterable of DataFrame chunks partitioned by
+        column, replacing any previous layout of dataset, and return its
+        metadata. local_path is the source file whose signature makes the
+        layout fresh. Each partition stores its rows' positions in the
+        parse, and the metadata each column's parsed dtype, so reads return
+        the rows in file order with the parse's index and dtypes.
+
+        The files are written to a private directory and moved into place
+        with a rename (FBD.core.cache.staged_dir). Raises ValueError when
+        column is missing or has more than MAX_PARTITIONS distinct values.
+        Emits a "partitions.write" event with the rows and partitions written.
+        """
+        if isinstance(chunks, pd.DataFrame):
+            chunks = [chunks]
+
+        with Events.span("partitions.write", dataset=dataset, column=column) as event:
+            with staged_dir(cls.path(dataset)) as staging:
+                writers, keys, positions, dtypes, rows = {}, {}, {}, {}, 0
+                for chunk in chunks:
+                    if column not in chunk.columns:
+                        raise ValueError(f"Unknown column: {column!r}")
+                    for name, dtype in chunk.dtypes.items():
+                        # A column whose dtype changes between chunks is read back as object.
+                        dtypes[name] = str(dtype) if dtypes.get(name, str(dtype)) == str(dtype) else "object"
+                    codes, uniques = pd.factorize(chunk[column], use_na_sentinel=False)
+                    order = np.argsort(codes, kind="stable")
+                    bounds = np.zeros(len(uniques) + 1, dtype=np.int64)
+                    np.cumsum(np.bincount(codes, minlength=len(uniques)), out=bounds[1:])
+                    grouped = chunk.take(order)
+                    grouped_rows = np.arange(rows, rows + len(chunk), dtype=np.int64)[order]
+                    for code, value in enumerate(uniques):
+                        key = _scalar(value)
+                        token = json.dumps(key, default=str)
+                        if token not in writers:
+                            if len(writers) == cls.MAX_PARTITIONS:
+                                raise ValueError(
+                                    f"Column {column!r} has more than {cls.MAX_PARTITIONS} distinct values"
+                                )
+                            writers[token], keys[token], positions[token] = _FrameWriter(), key, []
+                        writers[token].update(grouped.iloc[bounds[code]:bounds[code + 1]])
+                        positions[token].append(grouped_rows[bounds[code]:bounds[code + 1]])
+                    rows += len(chunk)
+
+                partitions = []
+                for i, (token, writer) in enumerate(writers.items()):
+                    directory = staging / f"p{i:05d}"
+                    directory.mkdir()
+                    np.save(directory / "rows.npy", np.concatenate(positions[token]))
+                    partitions.append({"key": keys[token], "dir": directory.name, **writer.finish(directory)})
+
+                meta = {
+                    "version": cls.FORMAT_VERSION,
+                    "dataset": dataset,
+                    "source": None if local_path is None else source_signature(local_path),
+                    "column": column,
+                    "columns": list(dtypes),
+                    "dtypes": dtypes,
+                    "rows": rows,
+                    "partitions": partitions,
+                }
+                with open(staging / "partitions.json", "w", encoding="utf-8") as fh:
+                    json.dump(meta, fh, ensure_ascii=False, default=str)
+            event.update(rows=rows, partitions=len(partitions))
+        return meta
+
+    @classmethod
+    def stats(cls, dataset: str) -> "pd.DataFrame":
+        """One row per partition and column: key, rows, column, min, max and distinct."""
+        meta = cls.meta(dataset)
+        if meta is None:
+            raise ValueError(f"Dataset '{dataset}' is not partitioned")
+        return pd.DataFrame([
+            {
+                "key": partition["key"], "rows": partition["rows"], "column": column["name"],
+                "min": column.get("min"), "max": column.get("max"), "distinct": column.get("distinct"),
+            }
+            for partition in meta["partitions"]
+            for column in partition["columns"]
+        ])
+
+    @staticmethod
+    def can_match(partition: dict, column: str, where: dict) -> bool:
+        """
+        Whether partition (of a layout split by column) may hold rows
+        matching where; see read. Partitions are ruled out by their key for
+        the partition column and by min/max for the others.
+        """
+        stats = {c["name"]: c for c in partition["columns"]}
+        for name, values in _where_values(where).items():
+            if name == column:
+                if not any(_scalar(v) == partition["key"] for v in values):
+                    return False
+            elif name in stats and not any(_in_range(_scalar(v), stats[name]) for v in values):
+                return False
+        return True
+
+    @staticmethod
+    def filter(data, where: dict | None, columns: list[str] | None = None):
+        """
+        Keep the rows of a DataFrame, or of every chunk of a generator, whose
+        where columns hold one of the accepted values; then keep only
+        columns, if given. Other results pass through untouched.
+        """
+        if not where:
+            return data
+        accepted = _where_values(where)
+
+        def apply(df):
+            missing = [c for c in accepted if c not in df.columns]
+            if missing:
+                raise ValueError(f"Unknown columns: {missing}")
+            mask = np.ones(len(df), dtype=bool)
+            for name, values in accepted.items():
+                mask &= df[name].isin(values).to_numpy(dtype=bool)
+            df = df[mask] if not mask.all() else df
+            return df[columns] if columns is not None else df
+
+        if isinstance(data, pd.DataFrame):
+            return apply(data)
+        if inspect.isgenerator(data):
+            return (apply(chunk) for chunk in data)
+        return data
+
+    @classmethod
+    def read(cls, dataset: str, where: dict | None = None, columns: list[str] | None = None,
+             chunksize: int | None = None, local_path=None):
+        """
+        The rows of dataset matching where (see filter), read only from the
+        partitions that can match them, or None when there is no layout (or,
+        with local_path, it is stale). Returns a DataFrame, or with
+        chunksize a generator of DataFrames of at most chunksize rows. Rows
+        come in file order, indexed by their position in the parse and with
+        its dtypes: the same frame filtering the parse returns.
+
+        Emits a "partitions.read" event with the partitions read and total.
+        """
+        meta = cls.meta(dataset, local_path)
+        if meta is None:
+            return None
+        missing = [c for c in list(columns or ()) + list(where or ()) if c not in meta["columns"]]
+        if missing:
+            raise ValueError(f"Unknown columns: {missing}")
+
+        selected = [p for p in meta["partitions"] if cls.can_match(p, meta["column"], where or {})]
+        needed = None if columns is None else list(dict.fromkeys(list(columns) + list(where or ())))
+        Events.emit("partitions.read", dataset=dataset, partitions=len(selected), total=len(meta["partitions"]))
+
+        def frame(partition):
+            directory = cls.path(dataset) / partition["dir"]
+            df = _read_frame(directory, partition, needed)
+            df.index = pd.Index(np.load(directory / "rows.npy"))
+            return _as_parsed(cls.filter(df, where, columns), meta["dtypes"])
+
+        parts = [df for df in map(frame, selected) if len(df)]
+        if chunksize is None:
+            if not parts:
+                if not meta["partitions"]:
+                    return pd.DataFrame(columns=columns if columns is not None else meta["columns"])
+                parts = [frame(meta["partitions"][0]).iloc[:0]]
+            df = pd.concat(parts) if len(parts) > 1 else parts[0]
+            return df.take(np.argsort(df.index.to_numpy(), kind="stable"))
+
+        def chunks():
+            if not parts:
+                return
+            # Merge the partitions back into file order, chunksize rows at a time.
+            owner = np.repeat(np.arange(len(parts)), [len(df) for df in parts])
+            local = np.concatenate([np.arange(len(df)) for df in parts])
+            order = np.argsort(np.concatenate([df.index.to_numpy() for df in parts]), kind="stable")
+            for start in range(0, len(order), chunksize):
+                taken = order[start:start + chunksize]
+                pieces = [parts[i].iloc[local[taken[owner[taken] == i]]] for i in np.unique(owner[taken])]
+                yield pd.concat(pieces).sort_index(kind="stable")
+
+        return chunks()
+
+    @classmethod
+    def get(cls, dataset: str, column: str, refresh: bool = False, **download_options) -> dict:
+        """
+        Partition dataset by column unless a fresh layout by that column
+        exists: download it (or read the download cache; refresh forces a
+        new download), parse it in chunks and write the layout. Returns the
+        layout's metadata. download_options go to Downloader.download_asset.
+        """
+        from FBD.client.downloader import Downloader
+        from FBD.client.parser_dispatcher import ParserDispatcher
+
+        asset = Downloader.download_asset(dataset, refresh=refresh, **download_options)
+        if asset.get("status") != "ok":
+            raise ValueError(asset.get("message", f"Download of '{dataset}' failed"))
+
+        meta = cls.meta(dataset, asset["local_path"])
+        if meta is not None and meta["column"] == column:
+            return meta
+
+        chunks = ParserDispatcher.parse(dataset, asset["local_path"], asset["metadata"], chunksize=cls.CHUNKSIZE)
+        if not isinstance(chunks, pd.DataFrame) and not inspect.isgenerator(chunks):
+            raise ValueError(f"Dataset '{dataset}' is not tabular")
+        return cls.write(dataset, chunks, column, asset["local_path"])
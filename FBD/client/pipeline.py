@@ -0,0 +1,200 @@
+# -*- coding: utf-8 -*-
+import io
+import os
+import queue
+import threading
+import zlib
+from pathlib import Path
+
+from FBD.core.events import Events
+from FBD.client.transfer import Transfer
+
+_EOF = object()
+
+
+def inflate(blocks):
+    """
+    Decompress an iterable of gzip blocks (multi-member/bgzip included),
+    yielding plain bytes as they become available. Raises EOFError when
+    the blocks run out before the end-of-stream marker; a consumer that
+    stops early never sees that check.
+    """
+    decompressor = zlib.decompressobj(zlib.MAX_WBITS | 16)
+    for block in blocks:
+        data = decompressor.decompress(block)
+        while decompressor.eof and decompressor.unused_data:
+            rest = decompressor.unused_data
+            yield data
+            decompressor = zlib.decompressobj(zlib.MAX_WBITS | 16)
+            data = decompressor.decompress(rest)
+        yield data
+
+    yield decompressor.flush()
+    if not decompressor.eof:
+        raise EOFError("Compressed file ended before the end-of-stream marker was reached")
+
+
+class DownloadStream(io.RawIOBase):
+    """
+    Readable, non-seekable binary stream over a download still in progress.
+
+    start() launches a background thread that reads the HTTP response into
+    Transfer's reusable buffer, decompresses it on the fly (compression
+    "gzip", multi-member/bgzip included, or None) and tees the plain bytes
+    both to destination and into a bounded queue that readinto() drains. So
+    transfer, decompression and whatever parses this stream run at the same
+    time, and the queue caps how far the download can run ahead of the
+    parser.
+
+    destination is written under a temporary name and renamed only once
+    the whole body has arrived, so an interrupted download never looks like
+    a cached file. If the reader stops early (close()), the thread keeps
+    going without queueing, to finish the cache file.
+
+    scanner, if given, is fed every plain block before it is queued (see
+    Parse.stream_scanner); on_complete(destination) runs in the thread
+    after the rename. wait() joins the thread and re-raises its error.
+    """
+
+    QUEUE_SIZE = 8
+
+    def __init__(
+        self,
+        response,
+        destination: str | Path,
+        compression: str | None = None,
+        scanner=None,
+        progress=None,
+        on_complete=None,
+        dataset: str | None = None,
+        queue_size: int | None = None,
+    ):
+        super().__init__()
+        if compression not in (None, "gzip"):
+            raise ValueError(f"Unsupported streaming compression: {compression}")
+        self.response = response
+        self.destination = Path(destination)
+        self.compression = compression
+        self.scanner = scanner
+        self.progress = progress
+        self.on_complete = on_complete
+        self.dataset = dataset
+        self.bytes = 0
+        self._queue = queue.Queue(queue_size or self.QUEUE_SIZE)
+        self._cancelled = threading.Event()
+        self._error = None
+        self._thread = None
+        self._chunk = memoryview(b"")
+        self._eof = False
+
+    def __repr__(self):
+        return f"<DownloadStream {self.destination}>"
+
+    __str__ = __repr__
+
+    @property
+    def irregular(self) -> bool:
+        """True when the scanner rejected the bytes seen so far."""
+        return self.scanner is not None and not self.scanner.regular
+
+    def start(self) -> "DownloadStream":
+        self._thread = threading.Thread(target=self._run, name=f"fbd-download-{self.destination.name}", daemon=True)
+        self._thread.start()
+        return self
+
+    def wait(self) -> None:
+        if self._thread is not None:
+            self._thread.join()
+        if self._error is not None:
+            raise self._error
+
+    # Producer
+
+    def _put(self, item) -> None:
+        while not self._cancelled.is_set():
+            try:
+                self._queue.put(item, timeout=0.1)
+                return
+            except queue.Full:
+                continue
+
+    def _emit(self, data: bytes, out) -> None:
+        if not data:
+            return
+        out.write(data)
+        self.bytes += len(data)
+        if self.scanner is not None:
+            self.scanner.feed(data)
+        self._put(data)
+
+    def _run(self) -> None:
+        partial = self.destination.with_name(f".{self.destination.name}.{os.getpid()}.{threading.get_ident()}.part")
+        try:
+            with Events.span("download.transfer", dataset=self.dataset, url=getattr(self.response, "url", None),
+                             pipelined=True) as event:
+                try:
+                    with open(partial, "wb") as out:
+                        received = self._copy(out)
+                finally:
+                    self.response.close()
+                event["bytes"] = received
+
+            if self.scanner is not None:
+                self.scanner.finish()
+            os.replace(partial, self.destination)
+            if self.compression is not None:
+                Events.emit("decompress", dataset=self.dataset, bytes=self.bytes,
+                            compressed_bytes=received, codec=self.compression, pipelined=True)
+            if self.on_complete is not None:
+                self.on_complete(self.destination)
+        except BaseException as exc:
+            self._error = exc
+            try:
+                partial.unlink()
+            except OSError:
+                pass
+            self._put(exc)
+            return
+        self._put(_EOF)
+
+    def _copy(self, out) -> int:
+        received = 0
+
+        def blocks():
+            nonlocal received
+            for block in Transfer.iter_into(self.response, self.progress):
+                received += len(block)
+                yield block if self.compression else bytes(block)
+
+        for data in inflate(blocks()) if self.compression else blocks():
+            self._emit(data, out)
+        return received
+
+    # Consumer
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, b) -> int:
+        if self.closed:
+            raise ValueError("I/O operation on closed stream")
+        while not self._chunk:
+            if self._eof:
+                return 0
+            item = self._queue.get()
+            if item is _EOF:
+                self._eof = True
+                return 0
+            if isinstance(item, BaseException):
+                self._eof = True
+                raise item
+            self._chunk = memoryview(item)
+
+        n = min(len(b), len(self._chunk))
+        b[:n] = self._chunk[:n]
+        self._chunk = self._chunk[n:]
+        return n
+
+    def close(self) -> None:
+        self._cancelled.set()
+        super().close()
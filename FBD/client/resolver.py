@@ -0,0 +1,319 @@
+# -*- coding: utf-8 -*-
+import json
+from pathlib import Path
+
+from FBD.core.cache import dataset_path, save_npz, source_signature
+from FBD.core.events import Events
+from FBD.core.lazy import lazy_import
+from FBD.client.id_index import decode_ids, encode_ids
+
+np = lazy_import("numpy")
+pd = lazy_import("pandas")
+
+# Kinds of name, in resolution priority: a name matching several kinds
+# resolves through the first one only.
+PRIMARY_ID, SYMBOL, SECONDARY_ID, ANNOTATION_ID, SECONDARY_ANNOTATION_ID, FULLNAME, SYNONYM = range(7)
+KINDS = ("primary_id", "symbol", "secondary_id", "annotation_id", "secondary_annotation_id", "fullname", "synonym")
+
+
+def hash_names(names, case_sensitive: bool = True) -> "np.ndarray":
+    """
+    64-bit hashes of names (pandas' SipHash, vectorized; repeated names are
+    hashed once). Missing values hash alike.
+    """
+    names = np.asarray(names, dtype=object)
+    if not case_sensitive:
+        names = pd.Series(names, dtype=object).str.lower().to_numpy(dtype=object)
+    return pd.util.hash_array(names, categorize=True)
+
+
+class _Part:
+    """
+    (hash, gene key, kind) entries with JSON metadata: those of one source
+    dataset, or a merged index.
+    """
+
+    def __init__(self, hashes, genes, kinds, meta=None):
+        self.hashes = np.asarray(hashes, dtype=np.uint64)
+        self.genes = np.asarray(genes, dtype=np.int64)
+        self.kinds = np.asarray(kinds, dtype=np.int8)
+        self.meta = {} if meta is None else meta
+
+    def save(self, path: Path) -> Path:
+        return save_npz(path, meta=np.array(json.dumps(self.meta)), hashes=self.hashes, genes=self.genes, kinds=self.kinds)
+
+    @classmethod
+    def load(cls, path: Path):
+        with np.load(path, allow_pickle=False) as data:
+            return cls(data["hashes"], data["genes"], data["kinds"], json.loads(str(data["meta"])))
+
+
+class _PartBuilder:
+    def __init__(self, case_sensitive: bool):
+        self.case_sensitive = case_sensitive
+        self._parts = []
+
+    def add(self, names, genes, kind: int, sep: str | None = None) -> None:
+        """Add names (a Series aligned with the FBgn Series genes), splitting cells on sep."""
+        frame = pd.DataFrame({"name": names.to_numpy(dtype=object), "gene": genes.to_numpy(dtype=object)})
+        if sep is not None:
+            frame["name"] = frame["name"].str.split(sep, regex=False)
+            frame = frame.explode("name")
+        frame = frame[frame["name"].notna()]
+        frame["name"] = frame["name"].str.strip()
+        frame = frame[frame["name"] != ""]
+        if frame.empty:
+            return
+        self._parts.append((
+            hash_names(frame["name"], self.case_sensitive),
+            encode_ids(frame["gene"]),
+            np.full(len(frame), kind, dtype=np.int8),
+        ))
+
+    def build(self, meta: dict) -> _Part:
+        if not self._parts:
+            return _Part([], [], [], meta)
+        hashes, genes, kinds = (np.concatenate(arrays) for arrays in zip(*self._parts))
+        keep = genes >= 0
+        return _Part(hashes[keep], genes[keep], kinds[keep], meta)
+
+
+class SymbolResolver:
+    """
+    Resolves gene names (current symbols, synonyms, full names, annotation
+    IDs like CG1234, secondary and current FBgn IDs) to current FBgn IDs in
+    bulk.
+
+    The index is a sorted array of 64-bit name hashes with parallel arrays
+    of gene keys (FBgn IDs packed as in FBD.client.id_index) and name
+    kinds, so a lookup of n names is one vectorized hash and searchsorted.
+    When a name is known under several kinds only the highest-priority one
+    counts (see KINDS: an FBgn's own ID first, then the current symbol,
+    secondary IDs, annotation IDs, full names and synonyms); if it still
+    points to more than one gene the name is ambiguous and candidates()
+    lists them. Two distinct names share a 64-bit hash with negligible
+    probability, which the index accepts in exchange for not storing names.
+
+    build() reads the synonym and FBgn/annotation ID datasets. The index
+    and each source's part are kept in Config.CACHE_DIR / "resolver",
+    tagged with the signature of the file they came from, so when one
+    dataset is re-downloaded only its part is rebuilt.
+    """
+
+    FORMAT_VERSION = 1
+    SYNONYM_DATASET = "fb_synonym"
+    ID_DATASET = "fbgn_annotation_ID"
+    CHUNKSIZE = 200_000
+
+    def __init__(self, hashes, genes, kinds, sources: list | None = None, case_sensitive: bool = True):
+        self.hashes = np.asarray(hashes, dtype=np.uint64)
+        self.genes = np.asarray(genes, dtype=np.int64)
+        self.kinds = np.asarray(kinds, dtype=np.int8)
+        self.sources = list(sources or [])
+        self.case_sensitive = case_sensitive
+
+    def __len__(self):
+        return len(self.hashes)
+
+    def __repr__(self):
+        return f"SymbolResolver({len(self)} names, sources={[s.get('dataset') for s in self.sources]})"
+
+    @classmethod
+    def merge(cls, parts: list, case_sensitive: bool = True):
+        """Resolver over the entries of parts, keeping each name's best kind and its distinct genes."""
+        hashes = np.concatenate([np.empty(0, np.uint64)] + [p.hashes for p in parts])
+        genes = np.concatenate([np.empty(0, np.int64)] + [p.genes for p in parts])
+        kinds = np.concatenate([np.empty(0, np.int8)] + [p.kinds for p in parts])
+
+        order = np.lexsort((genes, kinds, hashes))
+        hashes, genes, kinds = hashes[order], genes[order], kinds[order]
+        if len(hashes):
+            first = np.r_[True, hashes[1:] != hashes[:-1]]
+            best = np.repeat(kinds[first], np.diff(np.r_[np.flatnonzero(first), len(hashes)]))
+            keep = kinds == best
+            keep[1:] &= (hashes[1:] != hashes[:-1]) | (genes[1:] != genes[:-1])
+            hashes, genes, kinds = hashes[keep], genes[keep], kinds[keep]
+
+        return cls(hashes, genes, kinds, [p.meta for p in parts], case_sensitive)
+
+    # ── Queries ──────────────────────────────────────────────────────────────
+
+    def _locate(self, names) -> tuple:
+        """[left, right) ranges of each name's entries; distinct names are searched once, missing ones match nothing."""
+        codes, uniques = pd.factorize(np.asarray(names, dtype=object))
+        hashes = hash_names(uniques, self.case_sensitive)
+        left = np.append(np.searchsorted(self.hashes, hashes, "left"), 0)
+        right = np.append(np.searchsorted(self.hashes, hashes, "right"), 0)
+        return left[codes], right[codes]
+
+    def resolve_keys(self, names) -> tuple:
+        """
+        (gene keys, kind codes, candidate counts) arrays for names. The key
+        is -1 unless exactly one gene matches; the kind is -1 when nothing
+        matches.
+        """
+        left, right = self._locate(names)
+        counts = right - left
+        keys = np.full(len(counts), -1, dtype=np.int64)
+        kinds = np.full(len(counts), -1, dtype=np.int8)
+        found = counts > 0
+        kinds[found] = self.kinds[left[found]]
+        unique = counts == 1
+        keys[unique] = self.genes[left[unique]]
+        return keys, kinds, counts
+
+    def resolve(self, names):
+        """
+        DataFrame with one row per name: input, FBgn (None unless exactly
+        one gene matches), match (the kind of name it matched, or None) and
+        candidates (number of genes the name points to).
+        """
+        names = np.asarray(names, dtype=object)
+        keys, kinds, counts = self.resolve_keys(names)
+
+        fbgn = np.full(len(names), None, dtype=object)
+        unique = keys >= 0
+        if unique.any():
+            distinct, inverse = np.unique(keys[unique], return_inverse=True)
+            fbgn[unique] = np.asarray(decode_ids(distinct), dtype=object)[inverse]
+
+        match = np.asarray((None,) + KINDS, dtype=object)[kinds.astype(np.int64) + 1]
+        return pd.DataFrame({
+            "input": pd.Series(names, dtype=object),
+            "FBgn": pd.Series(fbgn, dtype=object),
+            "match": pd.Series(match, dtype=object),
+            "candidates": counts,
+        })
+
+    def candidates(self, name: str) -> list[str]:
+        """All FBgn IDs name points to (through its highest-priority kind)."""
+        left, right = self._locate([name])
+        return decode_ids(self.genes[left[0]:right[0]])
+
+    # ── Construction ─────────────────────────────────────────────────────────
+
+    @classmethod
+    def part_from_synonyms(cls, chunks, organism: str | None = "Dmel", case_sensitive: bool = True) -> _Part:
+        """Entries from fb_synonym chunks: FBgn rows' IDs, symbols, full names and synonyms."""
+        builder = _PartBuilder(case_sensitive)
+        for chunk in chunks:
+            chunk = chunk[chunk["primary_FBid"].str.startswith("FBgn", na=False)]
+            if organism is not None:
+                chunk = chunk[chunk["organism_abbreviation"] == organism]
+            genes = chunk["primary_FBid"]
+            builder.add(genes, genes, PRIMARY_ID)
+            builder.add(chunk["current_symbol"], genes, SYMBOL)
+            builder.add(chunk["current_fullname"], genes, FULLNAME)
+            builder.add(chunk["symbol_synonym(s)"], genes, SYNONYM, sep="|")
+            builder.add(chunk["fullname_synonym(s)"], genes, SYNONYM, sep="|")
+        return builder.build({})
+
+    @classmethod
+    def part_from_id_map(cls, chunks, organism: str | None = "Dmel", case_sensitive: bool = True) -> _Part:
+        """Entries from fbgn_annotation_ID chunks: secondary FBgns and annotation IDs."""
+        builder = _PartBuilder(case_sensitive)
+        for chunk in chunks:
+            if organism is not None:
+                chunk = chunk[chunk["organism_abbreviation"] == organism]
+            genes = chunk["primary_FBgn#"]
+            builder.add(genes, genes, PRIMARY_ID)
+            builder.add(chunk["gene_symbol"], genes, SYMBOL)
+            builder.add(chunk["secondary_FBgn#(s)"], genes, SECONDARY_ID, sep=",")
+            builder.add(chunk["annotation_ID"], genes, ANNOTATION_ID)
+            builder.add(chunk["secondary_annotation_ID(s)"], genes, SECONDARY_ANNOTATION_ID, sep=",")
+        return builder.build({})
+
+    @classmethod
+    def build(
+        cls,
+        synonym_dataset: str | None = None,
+        id_dataset: str | None = None,
+        organism: str | None = "Dmel",
+        case_sensitive: bool = True,
+        refresh: bool = False,
+        **download_options,
+    ):
+        """
+        Resolver over the synonym and ID-mapping datasets (downloaded, or
+        reused from the download cache), SYNONYM_DATASET and ID_DATASET
+        unless given. organism keeps the genes of one species (None keeps
+        all); refresh re-downloads both datasets. download_options go to
+        Downloader.download_asset.
+
+        The merged index is reloaded from the cache while both source files
+        are unchanged. Otherwise the part of each unchanged source is
+        reused, the others are parsed again in chunks, and the parts are
+        merged and saved. Emits a "resolver.build" event per rebuilt part.
+        """
+        from FBD.client.downloader import Downloader
+
+        sources = []
+        for dataset, role in ((synonym_dataset or cls.SYNONYM_DATASET, "synonyms"),
+                              (id_dataset or cls.ID_DATASET, "id_map")):
+            asset = Downloader.download_asset(dataset, refresh=refresh, **download_options)
+            if asset.get("status") != "ok":
+                raise ValueError(asset.get("message", f"Download of '{dataset}' failed"))
+            meta = {
+                "version": cls.FORMAT_VERSION,
+                "dataset": dataset,
+                "role": role,
+                "organism": organism,
+                "case_sensitive": case_sensitive,
+                "source": source_signature(asset["local_path"]),
+            }
+            sources.append((asset, meta))
+
+        metas = [meta for _, meta in sources]
+        path = cls._path("+".join(meta["dataset"] for meta in metas), "resolver")
+        if path is not None and path.exists():
+            try:
+                with np.load(path, allow_pickle=False) as data:
+                    if json.loads(str(data["meta"])) == metas:
+                        return cls(data["hashes"], data["genes"], data["kinds"], metas, case_sensitive)
+            except (OSError, ValueError, KeyError):
+                pass
+
+        resolver = cls.merge([cls._part(asset, meta) for asset, meta in sources], case_sensitive)
+        if path is not None:
+            try:
+                _Part(resolver.hashes, resolver.genes, resolver.kinds, metas).save(path)
+            except OSError:
+                pass
+        return resolver
+
+    @classmethod
+    def _path(cls, name: str, role: str) -> Path | None:
+        return dataset_path("resolver", name, f".{role}.npz")
+
+    @classmethod
+    def _part(cls, asset: dict, meta: dict) -> _Part:
+        from FBD.client.parser_dispatcher import ParserDispatcher
+
+        dataset, role = meta["dataset"], meta["role"]
+        path = cls._path(dataset, role)
+        if path is not None and path.exists():
+            try:
+                part = _Part.load(path)
+                if part.meta == meta:
+                    return part
+            except (OSError, ValueError, KeyError):
+                pass
+
+        build_part = cls.part_from_synonyms if role == "synonyms" else cls.part_from_id_map
+        with Events.span("resolver.build", dataset=dataset, role=role) as event:
+            chunks = ParserDispatcher.parse(dataset, asset["local_path"], asset["metadata"], chunksize=cls.CHUNKSIZE)
+            if isinstance(chunks, pd.DataFrame):
+                chunks = [chunks]
+            try:
+                part = build_part(chunks, meta["organism"], meta["case_sensitive"])
+            except KeyError as exc:
+                raise ValueError(f"Dataset '{dataset}' lacks the column {exc}") from None
+            part.meta = meta
+            event["names"] = len(part.hashes)
+
+        if path is not None:
+            try:
+                part.save(path)
+            except OSError:
+                pass
+        return part
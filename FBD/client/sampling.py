@@ -0,0 +1,216 @@
+# -*- coding: utf-8 -*-
+from FBD.core.events import Events
+from FBD.core.lazy import lazy_import
+from FBD.client.downloader import Downloader
+
+np = lazy_import("numpy")
+pd = lazy_import("pandas")
+
+
+class Reservoir:
+    """
+    Uniform random sample of n rows from a stream of DataFrame chunks
+    (Algorithm R), holding at most n rows plus the current chunk.
+
+    Each chunk is processed with numpy: one random draw per row decides
+    which reservoir slot it would replace, and only the last row landing on
+    each slot is kept. Draws are taken in row order from a single
+    generator, so for a given seed the sample does not depend on how the
+    rows were chunked. seed may also be a numpy Generator to share.
+    """
+
+    def __init__(self, n: int, seed=None):
+        if n < 0:
+            raise ValueError("n must be non-negative")
+        self.n = n
+        self.rng = np.random.default_rng(seed)
+        self.seen = 0
+        self._rows = None
+        self._slots = None  # reservoir slot held by each row of _rows
+
+    def update(self, chunk) -> None:
+        m = len(chunk)
+        if m == 0:
+            return
+        if self._rows is None:
+            self._rows = chunk.iloc[:0]
+            self._slots = np.empty(0, dtype=np.int64)
+
+        start = self.seen
+        self.seen += m
+        fill = min(max(self.n - start, 0), m)
+        if fill:
+            self._rows = pd.concat([self._rows, chunk.iloc[:fill]])
+            self._slots = np.concatenate([self._slots, np.arange(start, start + fill)])
+        if fill == m:
+            return
+
+        # Row at 1-based stream position t replaces slot floor(u * t) when that is < n.
+        positions = np.arange(start + fill + 1, start + m + 1)
+        slots = (self.rng.random(m - fill) * positions).astype(np.int64)
+        hits = np.flatnonzero(slots < self.n)
+        if not hits.size:
+            return
+
+        # Within the chunk, a later row evicts an earlier one from the same slot.
+        slots, last = np.unique(slots[hits][::-1], return_index=True)
+        rows = hits[::-1][last] + fill
+
+        where = np.empty(self.n, dtype=np.int64)
+        where[self._slots] = np.arange(len(self._slots))
+        keep = np.ones(len(self._rows), dtype=bool)
+        keep[where[slots]] = False
+        self._rows = pd.concat([self._rows.iloc[keep], chunk.iloc[rows]])
+        self._slots = np.concatenate([self._slots[keep], slots])
+
+    def __len__(self) -> int:
+        return 0 if self._rows is None else len(self._rows)
+
+    def shrink(self, n: int) -> None:
+        """
+        Keep a uniform subset of n of the held rows and sample n rows from
+        now on. The result stays a uniform sample of everything seen.
+        """
+        if n >= self.n:
+            return
+        self.n = n
+        if len(self) > n:
+            keep = np.sort(self.rng.choice(len(self._rows), n, replace=False))
+            self._rows = self._rows.iloc[keep]
+        self._slots = np.arange(len(self), dtype=np.int64)
+
+    def result(self):
+        """The sample in stream order (sorted by the original index)."""
+        if self._rows is None:
+            return pd.DataFrame()
+        return self._rows.sort_index(kind="stable")
+
+
+class StratifiedReservoir:
+    """
+    Proportionally stratified sample of n rows by the values of column.
+
+    One Reservoir is kept per stratum. After every chunk each reservoir is
+    shrunk to SLACK times its stratum's running share of n (rounded up), so
+    at most SLACK * n rows plus one per stratum are held; columns with more
+    than MAX_STRATA distinct values raise ValueError. At the end each
+    stratum gets a share of n proportional to its row count (largest
+    remainder), drawn uniformly from its reservoir; that is a uniform
+    sample within every stratum. A stratum whose share grew past its
+    reservoir after being shrunk gives its missing rows to the others.
+    """
+
+    SLACK = 2
+    MAX_STRATA = 10_000
+
+    def __init__(self, n: int, column: str, seed=None):
+        self.n = n
+        self.column = column
+        self.rng = np.random.default_rng(seed)
+        self.reservoirs = {}
+
+    @property
+    def seen(self) -> int:
+        return sum(r.seen for r in self.reservoirs.values())
+
+    def update(self, chunk) -> None:
+        if self.column not in chunk.columns:
+            raise ValueError(f"Unknown stratify column: {self.column!r}")
+        for key, group in chunk.groupby(self.column, sort=False, dropna=False):
+            reservoir = self.reservoirs.get(key)
+            if reservoir is None:
+                if len(self.reservoirs) == self.MAX_STRATA:
+                    raise ValueError(
+                        f"Stratify column {self.column!r} has more than {self.MAX_STRATA} distinct values"
+                    )
+                reservoir = self.reservoirs[key] = Reservoir(self.n, self.rng)
+            reservoir.update(group)
+
+        seen = self.seen
+        for reservoir in self.reservoirs.values():
+            reservoir.shrink(-(-self.SLACK * self.n * reservoir.seen // seen))
+
+    def allocation(self) -> dict:
+        """Rows drawn from each stratum."""
+        keys = list(self.reservoirs)
+        counts = np.array([self.reservoirs[k].seen for k in keys], dtype=np.float64)
+        total = counts.sum()
+        if not total:
+            return {}
+
+        quotas = np.minimum(self.n, total) * counts / total
+        sizes = np.floor(quotas).astype(np.int64)
+        held = np.array([len(self.reservoirs[k]) for k in keys], dtype=np.int64)
+        sizes = np.minimum(sizes, held)
+        short = int(min(self.n, total) - sizes.sum())
+        while short > 0:
+            spare = np.flatnonzero(sizes < held)
+            if not spare.size:
+                break
+            spare = spare[np.argsort(-(quotas[spare] - sizes[spare]), kind="stable")[:short]]
+            sizes[spare] += 1
+            short -= len(spare)
+        return dict(zip(keys, sizes.tolist()))
+
+    def result(self):
+        parts = []
+        for key, size in self.allocation().items():
+            rows = self.reservoirs[key].result()
+            if size < len(rows):
+                rows = rows.iloc[np.sort(self.rng.choice(len(rows), size, replace=False))]
+            parts.append(rows)
+        if not parts:
+            return pd.DataFrame()
+        return pd.concat(parts).sort_index(kind="stable")
+
+
+class Sampler:
+    """
+    Random row samples of a dataset in a single pass over its chunked
+    parse, without materializing the full DataFrame. All methods are
+    class-level; the class is not instantiated.
+    """
+
+    CHUNKSIZE = 100_000
+
+    @classmethod
+    def sample(
+        cls,
+        dataset: str,
+        n: int,
+        seed=None,
+        stratify: str | None = None,
+        columns: list[str] | None = None,
+        chunksize: int | None = None,
+        **download_options,
+    ) -> dict:
+        """
+        Download (or reuse the cached copy of) dataset and return
+        {"status": "ok", "file", "data": sample DataFrame, "rows": rows seen}.
+
+        The sample is uniform over all rows, or proportionally stratified by
+        the stratify column; see Reservoir and StratifiedReservoir. Rows keep
+        their file order and index. columns restricts the parsed columns (the
+        stratify column is always read). Other keyword arguments go to
+        Downloader.download_file; failed downloads return its error dict.
+
+        Emits a "sample" event with n, rows seen and the sample size.
+        """
+        if columns is not None and stratify is not None and stratify not in columns:
+            columns = list(columns) + [stratify]
+
+        with Events.span("sample", dataset=dataset, n=n, stratify=stratify) as event:
+            result = Downloader.download_file(
+                dataset, columns=columns, chunksize=chunksize or cls.CHUNKSIZE, **download_options
+            )
+            if result.get("status") != "ok":
+                return result
+
+            reservoir = Reservoir(n, seed) if stratify is None else StratifiedReservoir(n, stratify, seed)
+            for chunk in result["data"]:
+                reservoir.update(chunk)
+            data = reservoir.result()
+            event["rows"] = reservoir.seen
+            event["sampled"] = len(data)
+
+        return {"status": "ok", "file": dataset, "data": data, "rows": reservoir.seen}
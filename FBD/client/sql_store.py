@@ -0,0 +1,237 @@
+# -*- coding: utf-8 -*-
+import inspect
+import os
+import re
+import sqlite3
+import time
+import uuid
+from contextlib import closing
+from pathlib import Path
+
+from FBD.core.cache import source_signature
+from FBD.core.config import Config
+from FBD.core.events import Events
+from FBD.core.lazy import lazy_import
+
+pd = lazy_import("pandas")
+
+_META_TABLE = "_fbd_tables"
+_ID_VALUE = r"^FB[a-z]{2}\d{7,10}$"
+_ID_NAME = re.compile(r"FB[a-z]{2}|FBid|(^|[\W_])(ID|id)($|[\W_])")
+
+
+def _quote(name: str) -> str:
+    return '"' + name.replace('"', '""') + '"'
+
+
+class SQLStore:
+    """
+    Local SQLite database (Config.CACHE_DIR / "fbd.sqlite") holding parsed
+    datasets as tables, so filters and joins run in SQL and only the result
+    rows reach pandas. All attributes and methods are class-level; the
+    class is not instantiated.
+
+    load() parses a dataset in chunks into a table named after it (see
+    table_name), indexing its ID columns: columns named like an ID or
+    whose values are mostly FlyBase identifiers. The table records the
+    signature of the file it was loaded from. Downloader.download_asset
+    reloads a dataset's table after each new transfer of its file (see
+    observe_download), so tables(), query() and other SQLite readers see
+    the new rows; refresh_stale() catches files replaced by other means.
+    """
+
+    CHUNKSIZE = 100_000
+
+    @classmethod
+    def path(cls) -> Path:
+        return Path(Config.CACHE_DIR) / "fbd.sqlite"
+
+    @classmethod
+    def connect(cls) -> sqlite3.Connection:
+        path = cls.path()
+        path.parent.mkdir(parents=True, exist_ok=True)
+        con = sqlite3.connect(path, timeout=60)
+        con.execute("PRAGMA journal_mode=WAL")
+        con.execute(
+            f"CREATE TABLE IF NOT EXISTS {_META_TABLE} ("
+            "dataset TEXT PRIMARY KEY, table_name TEXT NOT NULL, local_path TEXT, "
+            "source TEXT, rows INTEGER, id_columns TEXT, loaded_at REAL)"
+        )
+        return con
+
+    @staticmethod
+    def table_name(dataset: str) -> str:
+        """SQL table name of dataset: its name with non-word characters replaced by "_"."""
+        name = re.sub(r"\W", "_", dataset)
+        return name if not name[:1].isdigit() else f"_{name}"
+
+    @classmethod
+    def tables(cls) -> "pd.DataFrame":
+        """Loaded datasets with their table, source file, row count, ID columns and load time."""
+        with closing(cls.connect()) as con:
+            return pd.read_sql_query(f"SELECT * FROM {_META_TABLE} ORDER BY dataset", con)
+
+    @classmethod
+    def _id_columns(cls, chunk) -> list[str]:
+        columns = []
+        for column in chunk.columns:
+            if _ID_NAME.search(str(column)):
+                columns.append(column)
+                continue
+            values = chunk[column]
+            if not pd.api.types.is_string_dtype(values.dtype):
+                continue
+            present = values.dropna()
+            if len(present) and present.astype(str).str.match(_ID_VALUE).mean() >= 0.5:
+                columns.append(column)
+        return columns
+
+    @classmethod
+    def load(cls, dataset: str, refresh: bool = False, **download_options) -> dict:
+        """
+        Parse dataset (downloading it unless cached; refresh forces a new
+        download) into its table, replacing the previous contents in one
+        transaction. Returns the table's entry as in tables(). download_options
+        go to Downloader.download_asset.
+
+        Emits a "sql.load" event with the table, rows and ID columns.
+        """
+        from FBD.client.downloader import Downloader
+
+        started = time.time()
+        asset = Downloader.download_asset(dataset, refresh=refresh, **download_options)
+        if asset.get("status") != "ok":
+            raise ValueError(asset.get("message", f"Download of '{dataset}' failed"))
+        entry = cls._entry(dataset)
+        if entry is not None and entry["loaded_at"] >= started and entry["source"] == source_signature(asset["local_path"]):
+            # The transfer already reloaded the table (observe_download).
+            return entry
+        return cls._load_asset(dataset, asset["local_path"], asset["metadata"])
+
+    @classmethod
+    def _entry(cls, dataset: str) -> dict | None:
+        with closing(cls.connect()) as con:
+            con.row_factory = sqlite3.Row
+            row = con.execute(f"SELECT * FROM {_META_TABLE} WHERE dataset = ?", (dataset,)).fetchone()
+        return dict(row) if row is not None else None
+
+    @classmethod
+    def observe_download(cls, dataset: str, local_path, metadata: dict) -> None:
+        """
+        Called by Downloader.download_asset after a new transfer of dataset's
+        file: reloads its table if the store has one. Does nothing (and
+        creates no database) otherwise. When the reload fails the table is
+        dropped rather than left with the old rows.
+        """
+        if not cls.path().exists() or cls._entry(dataset) is None:
+            return
+        try:
+            cls._load_asset(dataset, local_path, metadata)
+        except (ValueError, sqlite3.Error):
+            cls.drop(dataset)
+
+    @classmethod
+    def _load_asset(cls, dataset: str, local_path, metadata: dict) -> dict:
+        from FBD.client.parser_dispatcher import ParserDispatcher
+
+        table = cls.table_name(dataset)
+        # Private to this load, so concurrent loads never write into each other's rows.
+        staging = f"{table}__loading_{os.getpid()}_{uuid.uuid4().hex[:8]}"
+        with Events.span("sql.load", dataset=dataset, table=table) as event, closing(cls.connect()) as con:
+            chunks = ParserDispatcher.parse(dataset, local_path, metadata, chunksize=cls.CHUNKSIZE)
+            if isinstance(chunks, pd.DataFrame):
+                chunks = [chunks]
+            elif not inspect.isgenerator(chunks):
+                raise ValueError(f"Dataset '{dataset}' is not tabular")
+
+            rows, id_columns = 0, None
+            try:
+                for chunk in chunks:
+                    if id_columns is None:
+                        id_columns = cls._id_columns(chunk)
+                    chunk.to_sql(staging, con, if_exists="append", index=False)
+                    rows += len(chunk)
+                if id_columns is None:
+                    raise ValueError(f"Dataset '{dataset}' has no rows")
+
+                entry = {
+                    "dataset": dataset,
+                    "table_name": table,
+                    "local_path": str(local_path),
+                    "source": source_signature(local_path),
+                    "rows": rows,
+                    "id_columns": ",".join(id_columns),
+                    "loaded_at": time.time(),
+                }
+                with con:
+                    # sqlite3 opens no transaction for DDL on its own; without one a
+                    # concurrent load could rename its table in between the drop and ours.
+                    con.execute("BEGIN IMMEDIATE")
+                    con.execute(f"DROP TABLE IF EXISTS {_quote(table)}")
+                    con.execute(f"ALTER TABLE {_quote(staging)} RENAME TO {_quote(table)}")
+                    for i, column in enumerate(id_columns):
+                        con.execute(
+                            f"CREATE INDEX {_quote(f'{table}__id{i}')} ON {_quote(table)} ({_quote(column)})"
+                        )
+                    con.execute(
+                        f"INSERT OR REPLACE INTO {_META_TABLE} VALUES "
+                        "(:dataset, :table_name, :local_path, :source, :rows, :id_columns, :loaded_at)",
+                        entry,
+                    )
+            except BaseException:
+                with con:
+                    con.execute(f"DROP TABLE IF EXISTS {_quote(staging)}")
+                raise
+            event.update(rows=rows, id_columns=id_columns)
+        return entry
+
+    @classmethod
+    def drop(cls, dataset: str) -> None:
+        with closing(cls.connect()) as con, con:
+            con.execute("BEGIN IMMEDIATE")
+            con.execute(f"DROP TABLE IF EXISTS {_quote(cls.table_name(dataset))}")
+            con.execute(f"DELETE FROM {_META_TABLE} WHERE dataset = ?", (dataset,))
+
+    @classmethod
+    def refresh_stale(cls) -> list[str]:
+        """
+        Reload the tables whose source file changed since they were loaded
+        (replaced other than through download_asset); returns their datasets.
+        """
+        from FBD.client.downloader import Downloader
+
+        with closing(cls.connect()) as con:
+            entries = con.execute(f"SELECT dataset, local_path, source FROM {_META_TABLE}").fetchall()
+
+        stale = []
+        for dataset, local_path, source in entries:
+            if source_signature(local_path) == source:
+                continue
+            metadata = Downloader.dataset_metadata(dataset)
+            current = Downloader.local_path(metadata) if metadata.get("status") == "ok" else None
+            if current is None:
+                continue
+            cls._load_asset(dataset, current, metadata)
+            stale.append(dataset)
+        return stale
+
+    @classmethod
+    def query(cls, sql: str, params=None, datasets=None) -> "pd.DataFrame":
+        """
+        Run sql against the store and return the result rows. datasets
+        (a name or list) are loaded first if they are not in the store yet.
+        Tables are not checked against their files here; see refresh_stale.
+        Table names follow table_name; quote column names with special
+        characters.
+
+        Emits a "sql.query" event with the number of result rows.
+        """
+        loaded = set(cls.tables()["dataset"])
+        for dataset in [datasets] if isinstance(datasets, str) else datasets or ():
+            if dataset not in loaded:
+                cls.load(dataset)
+
+        with Events.span("sql.query") as event, closing(cls.connect()) as con:
+            result = pd.read_sql_query(sql, con, params=params)
+            event["rows"] = len(result)
+        return result
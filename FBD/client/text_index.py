@@ -0,0 +1,347 @@
+# -*- coding: utf-8 -*-
+import json
+import re
+from pathlib import Path
+
+from FBD.client.index_store import IndexStore
+from FBD.core.cache import save_npz
+from FBD.core.events import Events
+from FBD.core.lazy import lazy_import
+
+np = lazy_import("numpy")
+pd = lazy_import("pandas")
+
+# Terms are runs of word characters, compared lowercased: "wg[1]" gives "wg" and "1".
+TOKEN_PATTERN = r"\w+"
+
+# BM25 parameters.
+_K1 = 1.2
+_B = 0.75
+
+
+def hash_terms(terms) -> "np.ndarray":
+    """uint64 hashes of (already lowercased) terms; equal terms hash equally across runs."""
+    terms = np.asarray(terms, dtype=object)
+    if not terms.size:
+        return np.empty(0, dtype=np.uint64)
+    return pd.util.hash_array(terms, categorize=False)
+
+
+def tokenize(text) -> list[str]:
+    """Distinct lowercased terms of text, in order of first appearance."""
+    if not isinstance(text, str):
+        return []
+    return list(dict.fromkeys(re.findall(TOKEN_PATTERN, text.lower())))
+
+
+def _tokenize_all(texts: list[str]) -> tuple["np.ndarray", "np.ndarray"]:
+    """
+    (terms, index of the text each came from) over texts, with one regex
+    pass over the texts joined by a separator no term can contain.
+    """
+    joined = "\x1f".join(texts)
+    if joined.count("\x1f") != len(texts) - 1:
+        # Some text holds the separator itself: tokenize one by one.
+        found = [re.findall(TOKEN_PATTERN, text.lower()) for text in texts]
+        owner = np.repeat(np.arange(len(texts), dtype=np.int64), [len(terms) for terms in found])
+        return np.array([t for terms in found for t in terms], dtype=object), owner
+
+    tokens = np.array(re.findall(TOKEN_PATTERN + "|\x1f", joined.lower()), dtype=object)
+    separators = tokens == "\x1f"
+    owner = np.cumsum(separators)[~separators]
+    return tokens[~separators], owner
+
+
+def _column_postings(values, positions):
+    """
+    (rows, term hashes) of every term occurrence in a Series of text cells.
+    Distinct cells are tokenized once and their terms repeated over the
+    rows holding them, which keeps low-cardinality columns cheap.
+    """
+    try:
+        codes, uniques = pd.factorize(values)
+    except TypeError:
+        # Nested values (dicts, lists) are not text; only the string cells are indexed.
+        values = values.to_numpy(dtype=object)
+        strings = np.fromiter((isinstance(v, str) for v in values), dtype=bool, count=len(values))
+        codes, uniques = pd.factorize(np.where(strings, values, None))
+    if not len(uniques):
+        return None
+
+    uniques = np.asarray(uniques, dtype=object).tolist()
+    if values.dtype == object:
+        uniques = [u if isinstance(u, str) else "" for u in uniques]
+    terms, owner = _tokenize_all(uniques)
+    if not terms.size:
+        return None
+    hashes = hash_terms(terms)
+
+    per_unique = np.bincount(owner, minlength=len(uniques))
+    starts = np.zeros(len(uniques) + 1, dtype=np.int64)
+    np.cumsum(per_unique, out=starts[1:])
+
+    present = codes >= 0
+    codes, positions = codes[present], positions[present]
+    counts = per_unique[codes]
+    total = int(counts.sum())
+    if not total:
+        return None
+    rows = np.repeat(positions, counts)
+    first = np.repeat(starts[codes], counts)
+    within = np.arange(total, dtype=np.int64) - np.repeat(np.cumsum(counts) - counts, counts)
+    return rows, hashes[first + within]
+
+
+class ContentIndex:
+    """
+    On-disk inverted index of the terms in the text columns of one parsed
+    dataset.
+
+    terms holds the sorted distinct term hashes (see hash_terms);
+    rows[indptr[i]:indptr[i + 1]] are the row positions of the parsed
+    dataset (0-based, in file order) containing terms[i], and freqs the
+    number of occurrences in each of those rows. lengths is the number of
+    terms in every row, for BM25 length normalisation. load() reads only the
+    metadata, the rest on first use.
+
+    Build one with ContentIndex.builder(); ContentStore keeps one per
+    downloaded dataset.
+    """
+
+    FORMAT_VERSION = 1
+
+    def __init__(self, dataset: str, terms, indptr, rows, freqs, lengths, meta: dict | None = None):
+        self.dataset = dataset
+        self.meta = dict(meta or {})
+        self._path = None
+        self._arrays = None
+        if terms is not None:
+            self._arrays = {
+                "terms": np.asarray(terms, dtype=np.uint64),
+                "indptr": np.asarray(indptr, dtype=np.int64),
+                "rows": np.asarray(rows, dtype=np.int64),
+                "freqs": np.asarray(freqs, dtype=np.int32),
+                "lengths": np.asarray(lengths, dtype=np.int32),
+            }
+
+    def __repr__(self):
+        terms = self.meta["terms"] if "terms" in self.meta else len(self.terms)
+        return f"ContentIndex({self.dataset!r}, {terms} terms)"
+
+    @classmethod
+    def builder(cls, dataset: str):
+        return _ContentIndexBuilder(cls, dataset)
+
+    # ── Queries ──────────────────────────────────────────────────────────────
+
+    def _array(self, name: str) -> "np.ndarray":
+        if self._arrays is None:
+            with np.load(self._path, allow_pickle=False) as data:
+                self._arrays = {key: data[key] for key in ("terms", "indptr", "rows", "freqs", "lengths")}
+        return self._arrays[name]
+
+    @property
+    def terms(self) -> "np.ndarray":
+        return self._array("terms")
+
+    @property
+    def rows(self) -> int:
+        if "rows" in self.meta:
+            return self.meta["rows"]
+        return len(self._array("lengths"))
+
+    def _positions(self, hashes) -> "np.ndarray":
+        """Position of each hash in terms, or -1."""
+        terms = self.terms
+        hashes = np.asarray(hashes, dtype=np.uint64)
+        if not terms.size:
+            return np.full(len(hashes), -1, dtype=np.int64)
+        pos = np.searchsorted(terms, hashes)
+        found = (pos < len(terms)) & (terms[np.minimum(pos, len(terms) - 1)] == hashes)
+        return np.where(found, pos, -1)
+
+    def document_frequencies(self, hashes) -> "np.ndarray":
+        """Number of rows containing each term."""
+        pos = self._positions(hashes)
+        indptr = self._array("indptr")
+        safe = np.maximum(pos, 0)
+        return np.where(pos >= 0, indptr[safe + 1] - indptr[safe], 0)
+
+    def score(self, hashes, idf) -> tuple["np.ndarray", "np.ndarray", "np.ndarray"]:
+        """
+        (rows, BM25 scores, number of terms matched) of the rows containing
+        any of the term hashes, weighted by their idf.
+        """
+        pos = self._positions(hashes)
+        keep = pos >= 0
+        pos, idf = pos[keep], np.asarray(idf, dtype=np.float64)[keep]
+        if not pos.size:
+            empty = np.empty(0, dtype=np.int64)
+            return empty, np.empty(0, dtype=np.float64), empty
+
+        indptr, lengths = self._array("indptr"), self._array("lengths")
+        rows = np.concatenate([self._array("rows")[indptr[p]:indptr[p + 1]] for p in pos])
+        freqs = np.concatenate([self._array("freqs")[indptr[p]:indptr[p + 1]] for p in pos]).astype(np.float64)
+        weights = np.repeat(idf, indptr[pos + 1] - indptr[pos])
+
+        average = max(float(lengths.mean()), 1.0)
+        norm = _K1 * (1 - _B + _B * lengths[rows] / average)
+        partial = weights * freqs * (_K1 + 1) / (freqs + norm)
+
+        hit_rows, inverse = np.unique(rows, return_inverse=True)
+        scores = np.bincount(inverse, weights=partial, minlength=len(hit_rows))
+        matched = np.bincount(inverse, minlength=len(hit_rows))
+        return hit_rows, scores, matched
+
+    # ── Persistence ──────────────────────────────────────────────────────────
+
+    def save(self, path: str | Path) -> Path:
+        path = Path(path)
+        meta = dict(self.meta, version=self.FORMAT_VERSION, dataset=self.dataset, terms=len(self.terms))
+        return save_npz(path, meta=np.array(json.dumps(meta)), **{key: self._array(key) for key in (
+            "terms", "indptr", "rows", "freqs", "lengths",
+        )})
+
+    @classmethod
+    def load(cls, path: str | Path):
+        """Open an index written by save, reading only its metadata. Returns None for another format version."""
+        with np.load(Path(path), allow_pickle=False) as data:
+            meta = json.loads(str(data["meta"]))
+        if meta.get("version") != cls.FORMAT_VERSION:
+            return None
+
+        index = cls(meta["dataset"], None, None, None, None, None, meta=meta)
+        index._path = Path(path)
+        return index
+
+
+class _ContentIndexBuilder:
+    """Accumulates (term, row, count) postings over the chunks of a parse."""
+
+    def __init__(self, index_cls, dataset: str):
+        self.index_cls = index_cls
+        self.dataset = dataset
+        self.rows_seen = 0
+        self._terms = []
+        self._rows = []
+        self._freqs = []
+        self._lengths = []
+
+    def update(self, chunk) -> None:
+        offset = self.rows_seen
+        self.rows_seen += len(chunk)
+        positions = np.arange(offset, self.rows_seen, dtype=np.int64)
+
+        rows, hashes = [], []
+        for column in chunk.columns:
+            values = chunk[column]
+            if not pd.api.types.is_string_dtype(values.dtype):
+                continue
+            postings = _column_postings(values, positions)
+            if postings is not None:
+                rows.append(postings[0])
+                hashes.append(postings[1])
+
+        if not rows:
+            self._lengths.append(np.zeros(len(chunk), dtype=np.int32))
+            return
+        rows, hashes = np.concatenate(rows), np.concatenate(hashes)
+        self._lengths.append(np.bincount(rows - offset, minlength=len(chunk)).astype(np.int32))
+
+        # Rows never span chunks, so each chunk's (term, row) counts are final.
+        order = np.lexsort((rows, hashes))
+        rows, hashes = rows[order], hashes[order]
+        boundary = np.ones(len(rows), dtype=bool)
+        boundary[1:] = (rows[1:] != rows[:-1]) | (hashes[1:] != hashes[:-1])
+        starts = np.flatnonzero(boundary)
+        self._terms.append(hashes[starts])
+        self._rows.append(rows[starts])
+        self._freqs.append(np.diff(np.append(starts, len(rows))).astype(np.int32))
+
+    def build(self, meta: dict | None = None) -> ContentIndex:
+        terms = np.concatenate(self._terms) if self._terms else np.empty(0, dtype=np.uint64)
+        rows = np.concatenate(self._rows) if self._rows else np.empty(0, dtype=np.int64)
+        freqs = np.concatenate(self._freqs) if self._freqs else np.empty(0, dtype=np.int32)
+        lengths = np.concatenate(self._lengths) if self._lengths else np.empty(0, dtype=np.int32)
+
+        # Chunks hold ascending rows, each sorted by (term, row): a stable sort by term suffices.
+        order = np.argsort(terms, kind="stable")
+        terms, rows, freqs = terms[order], rows[order], freqs[order]
+        distinct, counts = np.unique(terms, return_counts=True)
+        indptr = np.zeros(len(distinct) + 1, dtype=np.int64)
+        np.cumsum(counts, out=indptr[1:])
+
+        meta = dict(meta or {}, rows=self.rows_seen)
+        return self.index_cls(self.dataset, distinct, indptr, rows, freqs, lengths, meta=meta)
+
+
+class ContentStore(IndexStore):
+    """
+    Persistent full-text indexes of the downloaded datasets, kept in
+    Config.CACHE_DIR / "content_index" (one ContentIndex file per dataset);
+    see IndexStore for how they are stored, built and kept fresh.
+
+    With Config.INDEX_CONTENT = True (off by default),
+    Downloader.download_file calls observe() on every full parse (no column
+    projection), so a dataset is indexed the first time it is parsed after
+    its file was downloaded, and re-indexed on its own when that file
+    changes; the other datasets' indexes are left as they are. Otherwise
+    datasets are indexed only when named in search() or build().
+    """
+
+    INDEX_CLASS = ContentIndex
+    DIRECTORY = "content_index"
+    SUFFIX = ".terms.npz"
+    CONFIG_FLAG = "INDEX_CONTENT"
+    EVENT = "index.content"
+
+    @classmethod
+    def summary(cls, index) -> dict:
+        return {"terms": len(index.terms)}
+
+    @classmethod
+    def search(cls, query: str, datasets=None, limit: int | None = 20) -> "pd.DataFrame":
+        """
+        Rows of the indexed datasets containing any term of query, ranked by
+        BM25 (terms rare across all searched datasets weigh more, as do
+        short rows). Returns a DataFrame with dataset, row (position in the
+        parsed dataset, see IdentifierStore.fetch), score and matched (the
+        number of distinct query terms in the row), best first, at most
+        limit rows (None for all).
+
+        datasets restricts the search and indexes missing ones (see build);
+        by default every fresh index on disk is searched. Emits a
+        "index.search" event with the terms, datasets searched and hits.
+        """
+        terms = tokenize(query)
+        hashes = hash_terms(terms)
+
+        if datasets is None:
+            indexes = cls.indexes()
+        else:
+            indexes = [cls.build(dataset) for dataset in ([datasets] if isinstance(datasets, str) else datasets)]
+        indexes = [index for index in indexes if index is not None]
+
+        with Events.span("index.search", terms=len(terms)) as event:
+            total = sum(index.rows for index in indexes)
+            frequencies = sum((index.document_frequencies(hashes) for index in indexes), np.zeros(len(hashes)))
+            idf = np.log(1 + (total - frequencies + 0.5) / (frequencies + 0.5))
+
+            parts = []
+            for index in indexes:
+                rows, scores, matched = index.score(hashes, idf)
+                if rows.size:
+                    parts.append(pd.DataFrame({
+                        "dataset": index.dataset, "row": rows, "score": scores, "matched": matched,
+                    }))
+            if parts:
+                hits = pd.concat(parts, ignore_index=True)
+                hits = hits.sort_values(["score", "dataset", "row"], ascending=[False, True, True], kind="stable")
+                hits = hits.head(limit if limit is not None else len(hits)).reset_index(drop=True)
+            else:
+                hits = pd.DataFrame({
+                    "dataset": pd.Series(dtype=object), "row": pd.Series(dtype=np.int64),
+                    "score": pd.Series(dtype=np.float64), "matched": pd.Series(dtype=np.int64),
+                })
+            event.update(searched=len(indexes), hits=len(hits))
+        return hits
@@ -0,0 +1,116 @@
+# -*- coding: utf-8 -*-
+import time
+from pathlib import Path
+
+from FBD.core.lazy import lazy_import
+
+requests = lazy_import("requests")
+
+
+class Transfer:
+    """
+    Stream an HTTP response body to disk through a single preallocated
+    buffer: each iteration is one raw.readinto() call into a memoryview
+    and one write of the filled slice, so a multi-GB file costs a few
+    thousand Python-level iterations instead of hundreds of thousands of
+    8 KiB chunks.
+
+    Content-Encoding (gzip/deflate on the wire) is undone exactly as
+    requests' iter_content does; what is written is the file as served.
+    All methods are class-level; the class is not instantiated.
+    """
+
+    BUFFER_SIZE = 1 << 20
+    PROGRESS_INTERVAL = 0.25  # seconds between progress callbacks
+
+    @staticmethod
+    def content_length(response) -> int | None:
+        """Expected body size in bytes, or None when unknown or content-encoded."""
+        headers = getattr(response, "headers", None) or {}
+        if headers.get("Content-Encoding", "identity") != "identity":
+            return None
+        try:
+            return int(headers["Content-Length"])
+        except (KeyError, TypeError, ValueError):
+            return None
+
+    @classmethod
+    def iter_into(cls, response, progress=None, buffer_size: int | None = None):
+        """
+        Yield the body of a stream=True response as memoryview slices of
+        one reused buffer; each slice is only valid until the next one is
+        requested.
+
+        progress, if given, is called at most every PROGRESS_INTERVAL seconds
+        and once at the end with a dict: bytes, total (None if unknown),
+        seconds, bytes_per_second and done.
+        """
+        raw = response.raw
+        if hasattr(raw, "decode_content"):
+            raw.decode_content = True
+        total = cls.content_length(response)
+
+        buffer = memoryview(bytearray(buffer_size or cls.BUFFER_SIZE))
+        received = 0
+        start = time.perf_counter()
+        next_report = start + cls.PROGRESS_INTERVAL
+
+        def report(done):
+            elapsed = time.perf_counter() - start
+            progress({
+                "bytes": received,
+                "total": total,
+                "seconds": elapsed,
+                "bytes_per_second": received / elapsed if elapsed > 0 else None,
+                "done": done,
+            })
+
+        readinto = raw.readinto
+        while True:
+            try:
+                n = readinto(buffer)
+            except Exception as exc:
+                raise cls._requests_error(exc) from exc
+            if not n:
+                break
+            received += n
+            yield buffer[:n]
+
+            if progress is not None and time.perf_counter() >= next_report:
+                report(False)
+                next_report = time.perf_counter() + cls.PROGRESS_INTERVAL
+
+        if progress is not None:
+            report(True)
+
+    @classmethod
+    def to_file(cls, response, destination: str | Path, progress=None, buffer_size: int | None = None) -> int:
+        """
+        Write the body of a stream=True response to destination and return
+        the number of bytes written. progress is as in iter_into.
+        """
+        written = 0
+        with open(destination, "wb") as f:
+            for block in cls.iter_into(response, progress, buffer_size):
+                f.write(block)
+                written += len(block)
+        return written
+
+    @staticmethod
+    def _requests_error(exc: Exception) -> Exception:
+        """
+        Map urllib3 read errors to the requests exceptions iter_content would
+        have raised, so callers keep catching requests.RequestException.
+        """
+        if isinstance(exc, requests.RequestException) or not type(exc).__module__.startswith("urllib3"):
+            return exc
+
+        from urllib3 import exceptions as urllib3_errors
+
+        if isinstance(exc, urllib3_errors.ProtocolError):
+            return requests.exceptions.ChunkedEncodingError(exc)
+        if isinstance(exc, urllib3_errors.DecodeError):
+            return requests.exceptions.ContentDecodingError(exc)
+        if isinstance(exc, urllib3_errors.SSLError):
+            return requests.exceptions.SSLError(exc)
+        return requests.exceptions.ConnectionError(exc)
@@ -0,0 +1,83 @@
+import os
+import shutil
+from contextlib import contextmanager
+from pathlib import Path
+
+from FBD.core.config import Config
+from FBD.core.lazy import lazy_import
+
+np = lazy_import("numpy")
+
+
+def source_signature(file_path) -> str | None:
+    """
+    Firma (nombre, tamaño y mtime) del archivo del que se construyó un
+    caché. Un caché que guarda otra firma quedó viejo. None si el archivo
+    no existe.
+    """
+    try:
+        stat = Path(file_path).stat()
+    except OSError:
+        return None
+    return f"{Path(file_path).name}:{stat.st_size}:{stat.st_mtime_ns}"
+
+
+def cache_dir(name: str) -> Path | None:
+    """Config.CACHE_DIR / name, creado si hace falta; None si no se puede crear."""
+    directory = Path(Config.CACHE_DIR) / name
+    try:
+        directory.mkdir(parents=True, exist_ok=True)
+    except OSError:
+        return None
+    return directory
+
+
+def dataset_path(name: str, dataset: str, suffix: str) -> Path | None:
+    """Archivo de dataset en cache_dir(name), con las "/" del nombre reemplazadas."""
+    directory = cache_dir(name)
+    if directory is None:
+        return None
+    return directory / f"{dataset.replace('/', '_')}{suffix}"
+
+
+def save_npz(path, **arrays) -> Path:
+    """
+    Guarda arrays en path con np.savez. Escribe a un temporal y lo
+    reemplaza, así los lectores nunca ven un archivo a medias.
+    """
+    path = Path(path)
+    tmp_path = path.with_name(path.name + ".tmp")
+    with open(tmp_path, "wb") as fh:
+        np.savez(fh, **arrays)
+    tmp_path.replace(path)
+    return path
+
+
+@contextmanager
+def staged_dir(target: Path):
+    """
+    Entrega un directorio privado junto a target para escribir un caché
+    completo. Al salir sin errores lo mueve a target con un rename,
+    reemplazando el anterior, así lectores y otros escritores nunca ven un
+    caché a medias. Ante un error lo borra.
+    """
+    target = Path(target)
+    target.parent.mkdir(parents=True, exist_ok=True)
+    staging = target.with_name(f"{target.name}.{os.getpid()}.tmp")
+    shutil.rmtree(staging, ignore_errors=True)
+    staging.mkdir()
+
+    try:
+        yield staging
+        old = target.with_name(f"{target.name}.{os.getpid()}.old")
+        try:
+            if target.exists():
+                target.replace(old)
+            staging.replace(target)
+        except OSError:
+            # Otro proceso movió primero su propia copia.
+            shutil.rmtree(staging, ignore_errors=True)
+        shutil.rmtree(old, ignore_errors=True)
+    except BaseException:
+        shutil.rmtree(staging, ignore_errors=True)
+        raise
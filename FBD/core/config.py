@@ -1,32 +1,78 @@
 # -*- coding: utf-8 -*-
 import json
 from pathlib import Path
-from platformdirs import user_cache_dir, user_config_dir
 
 
-class Config:
+class _ConfigMeta(type):
+    """
+    Resuelve los directorios por defecto en el primer acceso, para no importar
+    platformdirs ni consultar el sistema al importar FBD.
+    """
+
+    _DIR_ATTRS = ("DEFAULT_CACHE_DIR", "DEFAULT_DOWNLOAD_DIR", "CONFIG_FILE", "DOWNLOAD_DIR", "CACHE_DIR")
+
+    def __getattr__(cls, name):
+        if name not in cls._DIR_ATTRS:
+            raise AttributeError(f"type object {cls.__name__!r} has no attribute {name!r}")
+
+        from platformdirs import user_cache_dir, user_config_dir
+
+        default_cache_dir = Path(user_cache_dir(cls.APP_NAME))
+        defaults = {
+            "DEFAULT_CACHE_DIR":    default_cache_dir,
+            "DEFAULT_DOWNLOAD_DIR": default_cache_dir / "downloads",
+            "CONFIG_FILE":          Path(user_config_dir(cls.APP_NAME)) / "config.json",
+            "DOWNLOAD_DIR":         default_cache_dir / "downloads",
+            "CACHE_DIR":            default_cache_dir,
+        }
+        for attr, value in defaults.items():
+            if attr not in vars(cls):
+                setattr(cls, attr, value)
+
+        return vars(cls)[name]
+
+
+class Config(metaclass=_ConfigMeta):
     """
     Configuración global de la aplicación.
     Gestiona directorios, URL de la edge function y parámetros de rate limiting.
     Todos los atributos y métodos son de clase; no se instancia.
+
+    DEFAULT_CACHE_DIR, DEFAULT_DOWNLOAD_DIR, CONFIG_FILE, DOWNLOAD_DIR y
+    CACHE_DIR se calculan con platformdirs en el primer acceso.
     """
 
     APP_NAME = "flybasedownloads"
 
-    DEFAULT_CACHE_DIR    = Path(user_cache_dir(APP_NAME))
-    DEFAULT_DOWNLOAD_DIR = DEFAULT_CACHE_DIR / "downloads"
-    CONFIG_FILE          = Path(user_config_dir(APP_NAME)) / "config.json"
-
     # URL pública de la edge function. No es un secreto.
     EDGE_FUNCTION_URL = "https://ipoleoimulkvsyhelkgx.supabase.co/functions/v1/fbd"
 
-    DOWNLOAD_DIR = DEFAULT_DOWNLOAD_DIR
-    CACHE_DIR    = DEFAULT_CACHE_DIR
     LOG_LEVEL    = "INFO"
 
+    # Con True, FBD.download_file mide tiempo y memoria por etapa (FBD.core.profiling)
+    # y guarda el reporte en FBD.last_profile, sin cambiar lo que devuelve.
+    PROFILE_DOWNLOADS = False
+
+    # Procesos para parsear TSV grandes sin comprimir (1 = secuencial, None = os.cpu_count()).
+    # Solo se paraleliza a partir de PARSE_PARALLEL_MIN_BYTES.
+    PARSE_WORKERS            = 1
+    PARSE_PARALLEL_MIN_BYTES = 64 << 20
+
+    # Con True, cada parseo completo indexa los IDs de FlyBase del dataset (FBD.client.id_index).
+    # Apagado por defecto: indexar encarece la primera descarga; lookup_id con datasets indexa igual.
+    INDEX_IDENTIFIERS = False
+
+    # Con True, cada parseo completo indexa los términos de sus columnas de texto (FBD.client.text_index).
+    # Apagado por defecto, como INDEX_IDENTIFIERS; search_content con datasets indexa igual.
+    INDEX_CONTENT = False
+
     DOWNLOAD_RATE_LIMIT_ENABLED = True
     DOWNLOAD_MAX_CALLS          = 15
     DOWNLOAD_WINDOW_SECONDS     = 3600
+    DOWNLOAD_RATE_LIMIT_MODE    = "fail"   # "fail" | "wait"
+    DOWNLOAD_MAX_WAIT_SECONDS   = None     # tope de espera en modo "wait"; None = sin tope
+
+    RATE_LIMIT_MODES = ("fail", "wait")
 
     @classmethod
     def load_user_config(cls):
@@ -48,9 +94,15 @@ class Config:
             cls.DOWNLOAD_DIR                = Path(cfg.get("download_dir", cls.DEFAULT_DOWNLOAD_DIR))
             cls.CACHE_DIR                   = Path(cfg.get("cache_dir", cls.DEFAULT_CACHE_DIR))
             cls.LOG_LEVEL                   = cfg.get("log_level", "INFO")
+            cls.PROFILE_DOWNLOADS           = cfg.get("profile_downloads", False)
+            cls.PARSE_WORKERS               = cfg.get("parse_workers", 1)
+            cls.INDEX_IDENTIFIERS           = cfg.get("index_identifiers", False)
+            cls.INDEX_CONTENT               = cfg.get("index_content", False)
             cls.DOWNLOAD_RATE_LIMIT_ENABLED = cfg.get("download_rate_limit_enabled", True)
             cls.DOWNLOAD_MAX_CALLS          = cfg.get("download_max_calls", 15)
             cls.DOWNLOAD_WINDOW_SECONDS     = cfg.get("download_window_seconds", 3600)
+            cls.DOWNLOAD_RATE_LIMIT_MODE    = cfg.get("download_rate_limit_mode", "fail")
+            cls.DOWNLOAD_MAX_WAIT_SECONDS   = cfg.get("download_max_wait_seconds")
             cls.EDGE_FUNCTION_URL           = cfg.get("edge_function_url", cls.EDGE_FUNCTION_URL)
 
         except Exception:
@@ -66,9 +118,15 @@ class Config:
             "download_dir":                str(cls.DOWNLOAD_DIR),
             "cache_dir":                   str(cls.CACHE_DIR),
             "log_level":                   cls.LOG_LEVEL,
+            "profile_downloads":           cls.PROFILE_DOWNLOADS,
+            "parse_workers":               cls.PARSE_WORKERS,
+            "index_identifiers":           cls.INDEX_IDENTIFIERS,
+            "index_content":               cls.INDEX_CONTENT,
             "download_rate_limit_enabled": cls.DOWNLOAD_RATE_LIMIT_ENABLED,
             "download_max_calls":          cls.DOWNLOAD_MAX_CALLS,
             "download_window_seconds":     cls.DOWNLOAD_WINDOW_SECONDS,
+            "download_rate_limit_mode":    cls.DOWNLOAD_RATE_LIMIT_MODE,
+            "download_max_wait_seconds":   cls.DOWNLOAD_MAX_WAIT_SECONDS,
             "edge_function_url":           cls.EDGE_FUNCTION_URL,
         }
 
@@ -83,18 +141,32 @@ class Config:
         enabled: bool | None = None,
         max_calls: int | None = None,
         window_seconds: int | None = None,
+        mode: str | None = None,
+        max_wait_seconds: float | None = None,
         persist: bool = True,
     ):
         """
         Modifica los parámetros de rate limiting en tiempo de ejecución.
         Con persist=True (default) los cambios sobreviven entre sesiones.
+
+        mode="fail" rechaza la descarga al agotarse el cupo; mode="wait" la
+        encola hasta el siguiente cupo libre, con max_wait_seconds como tope.
         """
+        if mode is not None and mode not in cls.RATE_LIMIT_MODES:
+            raise ValueError(f"mode debe ser uno de {cls.RATE_LIMIT_MODES}; se recibió {mode!r}.")
+        if max_calls is not None and max_calls < 0:
+            raise ValueError(f"max_calls no puede ser negativo; se recibió {max_calls!r}.")
+
         if enabled is not None:
             cls.DOWNLOAD_RATE_LIMIT_ENABLED = enabled
         if max_calls is not None:
             cls.DOWNLOAD_MAX_CALLS = max_calls
         if window_seconds is not None:
             cls.DOWNLOAD_WINDOW_SECONDS = window_seconds
+        if mode is not None:
+            cls.DOWNLOAD_RATE_LIMIT_MODE = mode
+        if max_wait_seconds is not None:
+            cls.DOWNLOAD_MAX_WAIT_SECONDS = max_wait_seconds
 
         if persist:
             cls.save_user_config()
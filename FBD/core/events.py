@@ -0,0 +1,181 @@
+import logging
+import threading
+import time
+from contextlib import contextmanager
+
+from FBD.core.config import Config
+
+logger = logging.getLogger("FBD.events")
+
+
+class Event:
+    """
+    Evento estructurado emitido por una etapa del pipeline de descarga/parseo.
+
+    name identifica la etapa ("download.transfer", "parse.read", ...).
+    duration (segundos), bytes, cache_hit y dataset son opcionales; el resto
+    de los campos queda en fields.
+    """
+
+    __slots__ = ("name", "timestamp", "duration", "bytes", "cache_hit", "dataset", "fields")
+
+    def __init__(self, name, duration=None, bytes=None, cache_hit=None, dataset=None, **fields):
+        self.name = name
+        self.timestamp = time.time()
+        self.duration = duration
+        self.bytes = bytes
+        self.cache_hit = cache_hit
+        self.dataset = dataset
+        self.fields = fields
+
+    def to_dict(self):
+        data = {
+            "name": self.name,
+            "timestamp": self.timestamp,
+            "duration": self.duration,
+            "bytes": self.bytes,
+            "cache_hit": self.cache_hit,
+            "dataset": self.dataset,
+        }
+        data.update(self.fields)
+        return data
+
+    def __repr__(self):
+        return f"Event({self.name!r}, {self._describe()})"
+
+    def _describe(self):
+        parts = []
+        if self.dataset is not None:
+            parts.append(f"dataset={self.dataset}")
+        if self.duration is not None:
+            parts.append(f"duration={self.duration:.4f}s")
+        if self.bytes is not None:
+            parts.append(f"bytes={self.bytes}")
+        if self.cache_hit is not None:
+            parts.append(f"cache_hit={self.cache_hit}")
+        parts.extend(f"{k}={v}" for k, v in self.fields.items())
+        return " ".join(parts)
+
+
+class Events:
+    """
+    Bus de eventos de instrumentación. Todos los atributos y métodos son de
+    clase; no se instancia.
+
+    Hay dos formas de recibir eventos:
+    - Events.subscribe(callback): callback(event) se llama de forma síncrona
+      en el hilo que emite. Los errores del callback se registran y se ignoran.
+    - logging: cada evento se registra en el logger "FBD.events" con nivel
+      DEBUG y el diccionario del evento en record.fbd_event, solo si
+      Config.LOG_LEVEL es "DEBUG" y el logger tiene DEBUG habilitado. El
+      nivel de los loggers no se modifica; lo configura la aplicación.
+
+    Si no hay suscriptores ni handlers de logging, emitir cuesta una
+    comprobación.
+
+    add_span_hook(hook) registra hook(name) que se llama al entrar en cada
+    span (el evento se emite recién al salir); lo usa FBD.core.profiling para
+    medir memoria por etapa.
+    """
+
+    _subscribers: tuple = ()
+    _span_hooks: tuple = ()
+    _lock = threading.Lock()
+    _log_level = None
+    _log_threshold = logging.INFO
+
+    @classmethod
+    def subscribe(cls, callback):
+        """Registra callback(event). Devuelve el callback para usarlo como decorador."""
+        with cls._lock:
+            if callback not in cls._subscribers:
+                cls._subscribers = cls._subscribers + (callback,)
+        return callback
+
+    @classmethod
+    def unsubscribe(cls, callback):
+        with cls._lock:
+            cls._subscribers = tuple(s for s in cls._subscribers if s != callback)
+
+    @classmethod
+    @contextmanager
+    def subscribed(cls, callback):
+        """Suscribe callback solo dentro del bloque with."""
+        cls.subscribe(callback)
+        try:
+            yield callback
+        finally:
+            cls.unsubscribe(callback)
+
+    @classmethod
+    def add_span_hook(cls, hook):
+        with cls._lock:
+            if hook not in cls._span_hooks:
+                cls._span_hooks = cls._span_hooks + (hook,)
+
+    @classmethod
+    def remove_span_hook(cls, hook):
+        with cls._lock:
+            cls._span_hooks = tuple(h for h in cls._span_hooks if h != hook)
+
+    @classmethod
+    def _logging_enabled(cls):
+        # No se toca el nivel de los loggers: la configuración de logging es de la aplicación.
+        if cls._log_level != Config.LOG_LEVEL:
+            threshold = logging.getLevelName(str(Config.LOG_LEVEL).upper())
+            if not isinstance(threshold, int):
+                logger.warning("LOG_LEVEL inválido: %r", Config.LOG_LEVEL)
+                threshold = logging.INFO
+            cls._log_level, cls._log_threshold = Config.LOG_LEVEL, threshold
+        return (
+            cls._log_threshold <= logging.DEBUG
+            and logger.isEnabledFor(logging.DEBUG)
+            and logger.hasHandlers()
+        )
+
+    @classmethod
+    def enabled(cls):
+        """True si algún suscriptor o handler de logging recibiría eventos."""
+        return bool(cls._subscribers) or cls._logging_enabled()
+
+    @classmethod
+    def emit(cls, name, **fields):
+        subscribers = cls._subscribers
+        log = cls._logging_enabled()
+        if not subscribers and not log:
+            return None
+
+        event = Event(name, **fields)
+        for callback in subscribers:
+            try:
+                callback(event)
+            except Exception:
+                logger.exception("Event subscriber %r failed", callback)
+
+        if log:
+            logger.debug("%s %s", name, event._describe(), extra={"fbd_event": event.to_dict()})
+        return event
+
+    @classmethod
+    @contextmanager
+    def span(cls, name, **fields):
+        """
+        Mide la duración del bloque y emite el evento al salir. El bloque
+        recibe el diccionario de campos y puede completarlo (bytes, rows, ...).
+        Si el bloque lanza una excepción se agrega error=<tipo>.
+        """
+        if not cls.enabled():
+            yield fields
+            return
+
+        for hook in cls._span_hooks:
+            hook(name)
+
+        start = time.perf_counter()
+        try:
+            yield fields
+        except BaseException as exc:
+            fields["error"] = type(exc).__name__
+            raise
+        finally:
+            cls.emit(name, duration=time.perf_counter() - start, **fields)
@@ -0,0 +1,56 @@
+import importlib
+import threading
+
+
+class LazyModule:
+    """
+    Proxy de un módulo que se importa recién en el primer acceso a un atributo.
+
+    Permite declarar dependencias pesadas (pandas, requests, ...) a nivel de
+    módulo sin pagar su importación al hacer `import FBD`. La carga es segura
+    entre hilos. Asignar o borrar atributos se reenvía al módulo real, así que
+    unittest.mock.patch("FBD.client.downloader.requests.get") sigue funcionando.
+    """
+
+    def __init__(self, name):
+        object.__setattr__(self, "_name", name)
+        object.__setattr__(self, "_module", None)
+        object.__setattr__(self, "_lock", threading.Lock())
+
+    def _load(self):
+        if self._module is not None:
+            return self._module
+
+        with self._lock:
+            if self._module is None:
+                object.__setattr__(self, "_module", importlib.import_module(self._name))
+        return self._module
+
+    def __getattr__(self, attr):
+        return getattr(self._load(), attr)
+
+    def __setattr__(self, attr, value):
+        setattr(self._load(), attr, value)
+
+    def __delattr__(self, attr):
+        delattr(self._load(), attr)
+
+    def __dir__(self):
+        return dir(self._load())
+
+    def __repr__(self):
+        state = "cargado" if self._module is not None else "sin cargar"
+        return f"<LazyModule {self._name!r} ({state})>"
+
+
+def lazy_import(name):
+    """Devuelve un LazyModule para `name`; no importa nada todavía."""
+    return LazyModule(name)
+
+
+def optional_import(name):
+    """Importa `name` si está instalado; si no, devuelve None."""
+    try:
+        return importlib.import_module(name)
+    except ImportError:
+        return None
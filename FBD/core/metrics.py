@@ -0,0 +1,230 @@
+import bisect
+import json
+import os
+import threading
+import time
+from pathlib import Path
+
+from FBD.core.events import Events
+
+# Límites superiores (segundos) de los buckets del histograma de parseo.
+PARSE_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+
+_DESCRIPTIONS = {
+    "fbd_http_requests_total": ("counter", "HTTP requests to the edge function and file hosts, by endpoint."),
+    "fbd_http_errors_total": ("counter", "HTTP requests that raised, by endpoint."),
+    "fbd_cache_requests_total": ("counter", "Metadata and file cache lookups, by cache and result."),
+    "fbd_rate_limit_rejections_total": ("counter", "Downloads rejected by the local rate limiter."),
+    "fbd_downloaded_bytes_total": ("counter", "Bytes received from file downloads."),
+    "fbd_decompressed_bytes_total": ("counter", "Bytes written by decompression."),
+    "fbd_parse_duration_seconds": ("histogram", "Parser latency, by parser_type."),
+}
+
+
+def _endpoint(path: str) -> str:
+    """categories/Genes -> categories/*, datasets/x/header -> datasets/*/header."""
+    parts = path.strip("/").split("/")
+    if len(parts) == 1:
+        return parts[0]
+    return "/".join([parts[0], "*", *parts[2:]])
+
+
+def _format_labels(labels: tuple) -> str:
+    if not labels:
+        return ""
+    body = ",".join(
+        '{}="{}"'.format(k, str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n"))
+        for k, v in labels
+    )
+    return "{" + body + "}"
+
+
+class Metrics:
+    """
+    Registro de métricas opt-in alimentado por los eventos de FBD.core.events.
+    Todos los atributos y métodos son de clase; no se instancia.
+
+    Metrics.enable() suscribe el registro al bus de eventos; mientras está
+    apagado no hay suscriptor y la instrumentación no mide nada. Se exporta
+    con to_json()/write_json() o en formato de texto de Prometheus con
+    to_prometheus()/write_textfile() (para el textfile collector de
+    node_exporter). labels se agrega a todas las series, por ejemplo
+    {"worker": "node-3"}.
+    """
+
+    _lock = threading.Lock()
+    _enabled = False
+    _labels: tuple = ()
+    _counters: dict = {}
+    _histograms: dict = {}
+    _started = None
+
+    @classmethod
+    def enable(cls, labels: dict | None = None) -> None:
+        with cls._lock:
+            cls._labels = tuple(sorted((labels or {}).items()))
+            if cls._started is None:
+                cls._started = time.time()
+            if not cls._enabled:
+                cls._enabled = True
+                Events.subscribe(cls._on_event)
+
+    @classmethod
+    def disable(cls) -> None:
+        with cls._lock:
+            cls._enabled = False
+            Events.unsubscribe(cls._on_event)
+
+    @classmethod
+    def enabled(cls) -> bool:
+        return cls._enabled
+
+    @classmethod
+    def reset(cls) -> None:
+        """Pone a cero todas las series sin cambiar el estado enabled."""
+        with cls._lock:
+            cls._counters = {}
+            cls._histograms = {}
+            cls._started = time.time() if cls._enabled else None
+
+    # Actualización
+
+    @classmethod
+    def inc(cls, name: str, value: float = 1, **labels) -> None:
+        key = (name, cls._labels + tuple(sorted(labels.items())))
+        with cls._lock:
+            cls._counters[key] = cls._counters.get(key, 0) + value
+
+    @classmethod
+    def observe(cls, name: str, value: float, buckets=PARSE_BUCKETS, **labels) -> None:
+        key = (name, cls._labels + tuple(sorted(labels.items())))
+        with cls._lock:
+            hist = cls._histograms.get(key)
+            if hist is None:
+                hist = cls._histograms[key] = {
+                    "buckets": tuple(buckets),
+                    "counts": [0] * (len(buckets) + 1),
+                    "sum": 0.0,
+                    "count": 0,
+                }
+            hist["counts"][bisect.bisect_left(hist["buckets"], value)] += 1
+            hist["sum"] += value
+            hist["count"] += 1
+
+    @classmethod
+    def _on_event(cls, event) -> None:
+        name = event.name
+
+        if name == "http.request":
+            endpoint = _endpoint(event.fields.get("endpoint", "unknown"))
+            cls.inc("fbd_http_requests_total", endpoint=endpoint)
+            if "error" in event.fields:
+                cls.inc("fbd_http_errors_total", endpoint=endpoint)
+        elif name == "download.transfer":
+            cls.inc("fbd_http_requests_total", endpoint="file")
+            if "error" in event.fields:
+                cls.inc("fbd_http_errors_total", endpoint="file")
+            if event.bytes:
+                cls.inc("fbd_downloaded_bytes_total", event.bytes)
+        elif name == "metadata.cache":
+            cls.inc("fbd_cache_requests_total", cache="metadata", result="hit" if event.cache_hit else "miss")
+        elif name == "download.asset":
+            if event.cache_hit is not None:
+                cls.inc("fbd_cache_requests_total", cache="file", result="hit" if event.cache_hit else "miss")
+        elif name == "rate_limit.check":
+            if "error" in event.fields:
+                cls.inc("fbd_rate_limit_rejections_total")
+        elif name == "decompress":
+            if event.bytes:
+                cls.inc("fbd_decompressed_bytes_total", event.bytes)
+        elif name == "parse.dispatch":
+            if event.duration is not None:
+                cls.observe(
+                    "fbd_parse_duration_seconds", event.duration,
+                    parser_type=event.fields.get("parser_type", "unknown"),
+                )
+
+    # Exportación
+
+    @classmethod
+    def snapshot(cls) -> dict:
+        """
+        Estado actual como diccionario serializable:
+        {"started", "timestamp", "counters": {name: [{"labels", "value"}]},
+         "histograms": {name: [{"labels", "buckets", "counts", "sum", "count"}]}}.
+        Los counts de histogramas son por bucket (no acumulados); el último
+        corresponde a +Inf.
+        """
+        with cls._lock:
+            counters, histograms = dict(cls._counters), {
+                key: {**hist, "counts": list(hist["counts"])} for key, hist in cls._histograms.items()
+            }
+            started = cls._started
+
+        result = {"started": started, "timestamp": time.time(), "counters": {}, "histograms": {}}
+        for (name, labels), value in sorted(counters.items()):
+            result["counters"].setdefault(name, []).append({"labels": dict(labels), "value": value})
+        for (name, labels), hist in sorted(histograms.items()):
+            result["histograms"].setdefault(name, []).append({
+                "labels": dict(labels),
+                "buckets": list(hist["buckets"]),
+                "counts": hist["counts"],
+                "sum": hist["sum"],
+                "count": hist["count"],
+            })
+        return result
+
+    @classmethod
+    def to_json(cls) -> str:
+        return json.dumps(cls.snapshot(), indent=2)
+
+    @classmethod
+    def to_prometheus(cls) -> str:
+        """Texto en el formato de exposición de Prometheus (versión 0.0.4)."""
+        snap = cls.snapshot()
+        lines = []
+
+        def describe(name):
+            kind, help_text = _DESCRIPTIONS.get(name, ("untyped", name))
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+
+        for name, series in snap["counters"].items():
+            describe(name)
+            for s in series:
+                lines.append(f"{name}{_format_labels(tuple(s['labels'].items()))} {s['value']!r}")
+
+        for name, series in snap["histograms"].items():
+            describe(name)
+            for s in series:
+                labels = tuple(s["labels"].items())
+                cumulative = 0
+                for bound, count in zip([*s["buckets"], "+Inf"], s["counts"]):
+                    cumulative += count
+                    le = bound if bound == "+Inf" else f"{bound:g}"
+                    lines.append(f"{name}_bucket{_format_labels(labels + (('le', le),))} {cumulative}")
+                lines.append(f"{name}_sum{_format_labels(labels)} {s['sum']!r}")
+                lines.append(f"{name}_count{_format_labels(labels)} {s['count']}")
+
+        return "\n".join(lines) + "\n"
+
+    @classmethod
+    def _write_atomic(cls, path, text: str) -> Path:
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+        tmp.write_text(text, encoding="utf-8")
+        os.replace(tmp, path)
+        return path
+
+    @classmethod
+    def write_textfile(cls, path) -> Path:
+        """
+        Escribe to_prometheus() en path (p. ej. <textfile_dir>/fbd.prom) de
+        forma atómica, para que node_exporter nunca lea un archivo a medias.
+        """
+        return cls._write_atomic(path, cls.to_prometheus())
+
+    @classmethod
+    def write_json(cls, path) -> Path:
+        return cls._write_atomic(path, cls.to_json())
@@ -0,0 +1,171 @@
+import sys
+import threading
+import time
+import tracemalloc
+
+from FBD.core.events import Events
+from FBD.core.lazy import lazy_import
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+pd = lazy_import("pandas")
+
+
+def _max_rss_bytes():
+    """Pico de RSS del proceso (monótono), o None si la plataforma no lo expone."""
+    if resource is None:
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss if sys.platform == "darwin" else rss * 1024
+
+
+class _Frame:
+    __slots__ = ("name", "peak")
+
+    def __init__(self, name, current):
+        self.name = name
+        self.peak = current
+
+
+class Profile:
+    """
+    Mide tiempo y memoria de cada etapa instrumentada (los spans de
+    FBD.core.events: download.transfer, decompress, parse.read,
+    parse.convert, parse.clean, parse.dispatch, ...) dentro de un bloque with.
+
+    La memoria se mide con tracemalloc (asignaciones de Python y de numpy);
+    peak_bytes de cada etapa es el pico alcanzado durante la etapa respecto de
+    la memoria al entrar al bloque, o sea lo que hay que reservar para llegar
+    hasta ahí. Las etapas anidadas y repetidas (una por chunk) se agregan
+    por nombre. Solo se miden los spans del hilo que abrió el perfil.
+
+    tracemalloc vuelve varias veces más lento el código medido: usar para
+    dimensionar, no en producción.
+
+    Como tracemalloc.reset_peak afecta a todo el proceso, solo puede haber
+    un perfil activo a la vez: abrir otro (anidado o desde otro hilo) lanza
+    RuntimeError. Con strict=False, en cambio, el perfil no mide nada y
+    report() devuelve None.
+    """
+
+    _active = threading.Lock()
+
+    def __init__(self, dataset: str | None = None, strict: bool = True):
+        self.dataset = dataset
+        self.strict = strict
+        self.measured = False
+        self.stages = {}
+        self.elapsed = None
+        self.peak_bytes = None
+        self._frames = []
+        self._thread = None
+        self._baseline = 0
+        self._started_tracing = False
+        self._start = None
+
+    @classmethod
+    def active(cls) -> bool:
+        """True mientras haya un perfil midiendo en el proceso."""
+        return cls._active.locked()
+
+    def __enter__(self):
+        if not Profile._active.acquire(blocking=False):
+            if self.strict:
+                raise RuntimeError("Ya hay un Profile activo; no se pueden anidar ni usar en paralelo.")
+            return self
+        self.measured = True
+        self._thread = threading.get_ident()
+        self._started_tracing = not tracemalloc.is_tracing()
+        if self._started_tracing:
+            tracemalloc.start()
+        tracemalloc.reset_peak()
+        self._baseline = tracemalloc.get_traced_memory()[0]
+        self._frames = [_Frame(None, self._baseline)]
+
+        Events.add_span_hook(self._on_span_start)
+        Events.subscribe(self._on_event)
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        if not self.measured:
+            return False
+        try:
+            self.elapsed = time.perf_counter() - self._start
+            Events.unsubscribe(self._on_event)
+            Events.remove_span_hook(self._on_span_start)
+
+            root = self._frames[0]
+            root.peak = max(root.peak, tracemalloc.get_traced_memory()[1])
+            self.peak_bytes = root.peak - self._baseline
+            if self._started_tracing:
+                tracemalloc.stop()
+        finally:
+            Profile._active.release()
+        return False
+
+    def _on_span_start(self, name):
+        if threading.get_ident() != self._thread:
+            return
+        current, peak = tracemalloc.get_traced_memory()
+        parent = self._frames[-1]
+        parent.peak = max(parent.peak, peak)
+        tracemalloc.reset_peak()
+        self._frames.append(_Frame(name, current))
+
+    def _on_event(self, event):
+        if threading.get_ident() != self._thread or len(self._frames) < 2:
+            return
+        frame = self._frames[-1]
+        if frame.name != event.name:
+            return
+        self._frames.pop()
+
+        frame.peak = max(frame.peak, tracemalloc.get_traced_memory()[1])
+        parent = self._frames[-1]
+        parent.peak = max(parent.peak, frame.peak)
+
+        stage = self.stages.setdefault(event.name, {"seconds": 0.0, "peak_bytes": 0, "count": 0})
+        stage["seconds"] += event.duration or 0.0
+        stage["peak_bytes"] = max(stage["peak_bytes"], frame.peak - self._baseline)
+        stage["count"] += 1
+        if event.bytes is not None:
+            stage["bytes"] = stage.get("bytes", 0) + event.bytes
+        if event.fields.get("rows") is not None:
+            stage["rows"] = stage.get("rows", 0) + event.fields["rows"]
+
+    def report(self) -> dict | None:
+        if not self.measured:
+            return None
+        return {
+            "dataset": self.dataset,
+            "seconds": self.elapsed,
+            "peak_bytes": self.peak_bytes,
+            "max_rss_bytes": _max_rss_bytes(),
+            "stages": {name: dict(stage) for name, stage in self.stages.items()},
+        }
+
+
+def resource_table(reports):
+    """
+    DataFrame con una fila por reporte (dataset, seconds, peak_mb,
+    max_rss_mb) y, por cada etapa, las columnas "<etapa>.seconds" y
+    "<etapa>.peak_mb". Sirve para dimensionar workers a partir de una
+    corrida sobre todo el catálogo.
+    """
+    rows = []
+    for report in reports:
+        row = {
+            "dataset": report.get("dataset"),
+            "seconds": report.get("seconds"),
+            "peak_mb": (report.get("peak_bytes") or 0) / 1e6,
+            "max_rss_mb": (report["max_rss_bytes"] / 1e6) if report.get("max_rss_bytes") else None,
+        }
+        for name, stage in report.get("stages", {}).items():
+            row[f"{name}.seconds"] = stage["seconds"]
+            row[f"{name}.peak_mb"] = stage["peak_bytes"] / 1e6
+        rows.append(row)
+    return pd.DataFrame(rows)
@@ -1,49 +1,296 @@
+import os
+import math
 import time
 import json
+import heapq
+import itertools
+import threading
+from contextlib import contextmanager
+from pathlib import Path
 from FBD.core.config import Config
 
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+
+def _lock_file(fh):
+    """Bloquea el archivo de forma exclusiva (espera hasta obtener el lock)."""
+    if fcntl is not None:
+        fcntl.flock(fh.fileno(), fcntl.LOCK_EX)
+        return
+
+    fh.seek(0)
+    while True:
+        try:
+            msvcrt.locking(fh.fileno(), msvcrt.LK_LOCK, 1)
+            return
+        except OSError:
+            continue
+
+
+def _unlock_file(fh):
+    if fcntl is not None:
+        fcntl.flock(fh.fileno(), fcntl.LOCK_UN)
+        return
+
+    fh.seek(0)
+    msvcrt.locking(fh.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+class RateLimitExceeded(RuntimeError):
+    """
+    Se lanza cuando no hay cupo de descarga disponible. retry_after indica
+    los segundos estimados hasta que se libere el siguiente cupo.
+    """
+
+    def __init__(self, message, retry_after=0.0):
+        super().__init__(message)
+        self.retry_after = retry_after
+
 
 class RateLimiter:
     """
     Rate limiter local basado en ventana deslizante de timestamps persistidos en caché.
     Guarda el historial en un archivo JSON para que el límite sobreviva entre sesiones.
     El límite real sobre el servidor se aplica en la edge function por IP.
+
+    Es seguro entre hilos y procesos: cada lectura-modificación-escritura ocurre
+    bajo un lock de hilo y un lock de archivo del sistema operativo, y el JSON se
+    reemplaza de forma atómica. El historial se mantiene en memoria y solo se
+    vuelve a leer del disco cuando otro proceso lo modificó.
+
+    En modo de espera (Config.DOWNLOAD_RATE_LIMIT_MODE = "wait" o wait=True)
+    check() no falla al agotarse el cupo: encola la solicitud y la bloquea
+    hasta el siguiente cupo libre. Dentro del proceso se atiende primero la
+    mayor prioridad y, a igual prioridad, por orden de llegada.
     """
 
     def __init__(self, name="download"):
         self.name = name
-        self.path = Config.CACHE_DIR / f"{name}_rate.json"
+        self._thread_lock = threading.Lock()
+        self._calls = []
+        self._stamp = None
+        self._queue = threading.Condition()
+        self._waiters = []
+        self._arrivals = itertools.count()
+
+    @property
+    def path(self):
+        # Se resuelve en cada uso: construir el limiter no toca Config ni el disco.
+        return Path(Config.CACHE_DIR) / f"{self.name}_rate.json"
 
-    def _load(self):
-        if self.path.exists():
-            try:
-                return json.loads(self.path.read_text())
-            except Exception:
-                return []
-        return []
+    @property
+    def lock_path(self):
+        return self.path.with_name(f"{self.name}_rate.lock")
 
-    def _save(self, calls):
+    @contextmanager
+    def _locked(self):
+        """
+        Sección crítica entre hilos del proceso y entre procesos. El archivo de
+        lock guarda además un contador de generación que se incrementa en cada
+        escritura, para saber si el historial en memoria sigue vigente.
+        """
         self.path.parent.mkdir(parents=True, exist_ok=True)
-        self.path.write_text(json.dumps(calls))
+        with self._thread_lock:
+            with open(self.lock_path, "a+b") as fh:
+                _lock_file(fh)
+                try:
+                    yield fh
+                finally:
+                    _unlock_file(fh)
+
+    @staticmethod
+    def _read_generation(fh):
+        fh.seek(0)
+        raw = fh.read(32).strip()
+        return int(raw) if raw.isdigit() else 0
+
+    def _stamp_for(self, fh):
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            return None
+        return (self._read_generation(fh), stat.st_ino, stat.st_mtime_ns, stat.st_size)
+
+    def _load(self, fh):
+        """Debe llamarse con el lock tomado."""
+        stamp = self._stamp_for(fh)
+        if stamp is None:
+            self._calls, self._stamp = [], None
+            return []
+
+        if stamp == self._stamp:
+            return list(self._calls)
+
+        try:
+            calls = json.loads(self.path.read_text())
+        except Exception:
+            calls = []
+
+        self._calls, self._stamp = calls, stamp
+        return list(calls)
+
+    def _save(self, calls, fh):
+        """Debe llamarse con el lock tomado. Escribe a un temporal y lo reemplaza."""
+        tmp_path = self.path.with_name(f"{self.path.name}.tmp")
+        tmp_path.write_text(json.dumps(calls))
+        os.replace(tmp_path, self.path)
+
+        generation = self._read_generation(fh) + 1
+        fh.seek(0)
+        fh.truncate()
+        fh.write(str(generation).encode())
+        fh.flush()
+
+        self._calls, self._stamp = list(calls), self._stamp_for(fh)
+
+    @staticmethod
+    def _active(calls, now):
+        return [t for t in calls if now - t < Config.DOWNLOAD_WINDOW_SECONDS]
 
-    def check(self):
+    @staticmethod
+    def _seconds_until_free(calls, now, slots=1):
+        """Segundos hasta que haya `slots` cupos libres, dado el historial activo."""
+        max_calls = Config.DOWNLOAD_MAX_CALLS
+        if max_calls <= 0:
+            return math.inf
+
+        excess = len(calls) - max_calls + slots
+        if excess <= 0:
+            return 0.0
+
+        # Si se piden más cupos de los que caben en una ventana, se encadenan ventanas.
+        calls = sorted(calls)
+        cycles, index = divmod(excess - 1, len(calls))
+        return max(0.0, calls[index] + (cycles + 1) * Config.DOWNLOAD_WINDOW_SECONDS - now)
+
+    def _try_acquire(self):
+        """Toma un cupo si hay. Devuelve 0.0 si lo tomó, o la espera estimada si no."""
+        with self._locked() as fh:
+            now   = time.time()
+            calls = self._active(self._load(fh), now)
+
+            if len(calls) >= Config.DOWNLOAD_MAX_CALLS:
+                return self._seconds_until_free(calls, now) or 1e-3
+
+            calls.append(now)
+            self._save(calls, fh)
+            return 0.0
+
+    @staticmethod
+    def _exceeded(retry_after):
+        message = (
+            f"Límite de descargas alcanzado: "
+            f"{Config.DOWNLOAD_MAX_CALLS} por "
+            f"{Config.DOWNLOAD_WINDOW_SECONDS // 60} minutos."
+        )
+        if math.isfinite(retry_after):
+            message += f" Próximo cupo en {math.ceil(retry_after)} s."
+        return RateLimitExceeded(message, retry_after)
+
+    def estimate_wait(self, priority=0):
         """
-        Verifica si se puede realizar una descarga. Lanza RuntimeError si se
-        supera el límite configurado en Config.
+        Segundos estimados hasta que una solicitud con esta prioridad obtenga
+        cupo, considerando las solicitudes ya encoladas en este proceso.
+        """
+        if not Config.DOWNLOAD_RATE_LIMIT_ENABLED:
+            return 0.0
+
+        with self._queue:
+            ahead = sum(1 for neg_priority, _ in self._waiters if -neg_priority >= priority)
+
+        with self._locked() as fh:
+            now = time.time()
+            return self._seconds_until_free(self._active(self._load(fh), now), now, ahead + 1)
+
+    def usage(self):
+        """
+        Estado del presupuesto de descargas: cupos usados y disponibles en la
+        ventana actual y segundos hasta que se libere el próximo cupo.
+        """
+        with self._locked() as fh:
+            now   = time.time()
+            calls = self._active(self._load(fh), now)
+
+        return {
+            "enabled":        Config.DOWNLOAD_RATE_LIMIT_ENABLED,
+            "used":           len(calls),
+            "remaining":      max(0, Config.DOWNLOAD_MAX_CALLS - len(calls)),
+            "max_calls":      Config.DOWNLOAD_MAX_CALLS,
+            "window_seconds": Config.DOWNLOAD_WINDOW_SECONDS,
+            "reset_in":       max(0.0, max(calls) + Config.DOWNLOAD_WINDOW_SECONDS - now) if calls else 0.0,
+            "next_slot_in":   self._seconds_until_free(calls, now),
+        }
+
+    def _wait_turn(self, priority, deadline):
+        if Config.DOWNLOAD_MAX_WAIT_SECONDS is not None:
+            cap      = time.time() + Config.DOWNLOAD_MAX_WAIT_SECONDS
+            deadline = cap if deadline is None else min(deadline, cap)
+
+        entry = (-priority, next(self._arrivals))
+        with self._queue:
+            heapq.heappush(self._waiters, entry)
+            self._queue.notify_all()
+
+        try:
+            while True:
+                with self._queue:
+                    while self._waiters[0] != entry:
+                        timeout = None if deadline is None else deadline - time.time()
+                        if timeout is not None and timeout <= 0:
+                            break
+                        self._queue.wait(timeout)
+                    at_head = self._waiters[0] == entry
+
+                if not at_head:
+                    raise self._exceeded(self.estimate_wait(priority))
+
+                retry_after = self._try_acquire()
+                if not retry_after:
+                    return
+
+                # Sin cupos en la ventana (DOWNLOAD_MAX_CALLS <= 0) no hay espera posible.
+                if not math.isfinite(retry_after) or (
+                    deadline is not None and time.time() + retry_after > deadline
+                ):
+                    raise self._exceeded(retry_after)
+
+                # Se despierta antes si llega una solicitud de mayor prioridad.
+                with self._queue:
+                    self._queue.wait(retry_after)
+        finally:
+            with self._queue:
+                self._waiters.remove(entry)
+                heapq.heapify(self._waiters)
+                self._queue.notify_all()
+
+    def check(self, wait=None, priority=0, deadline=None):
+        """
+        Verifica si se puede realizar una descarga y consume un cupo.
+
+        Sin espera lanza RateLimitExceeded (subclase de RuntimeError) si se
+        supera el límite configurado en Config. Con espera bloquea hasta el
+        siguiente cupo libre; deadline (timestamp de time.time()) limita la
+        espera y, si no alcanza, se lanza RateLimitExceeded sin esperar.
+
+        Args:
+            wait: None usa Config.DOWNLOAD_RATE_LIMIT_MODE.
+            priority: mayor valor = se atiende antes.
+            deadline: instante límite para obtener el cupo.
         """
         if not Config.DOWNLOAD_RATE_LIMIT_ENABLED:
             return
 
-        now   = time.time()
-        calls = self._load()
-        calls = [t for t in calls if now - t < Config.DOWNLOAD_WINDOW_SECONDS]
+        if wait is None:
+            wait = Config.DOWNLOAD_RATE_LIMIT_MODE == "wait"
 
-        if len(calls) >= Config.DOWNLOAD_MAX_CALLS:
-            raise RuntimeError(
-                f"Límite de descargas alcanzado: "
-                f"{Config.DOWNLOAD_MAX_CALLS} por "
-                f"{Config.DOWNLOAD_WINDOW_SECONDS // 60} minutos."
-            )
+        if wait:
+            self._wait_turn(priority, deadline)
+            return
 
-        calls.append(now)
-        self._save(calls)
+        retry_after = self._try_acquire()
+        if retry_after:
+            raise self._exceeded(retry_after)
@@ -1,10 +1,23 @@
+from .client.columnar import ColumnarCache
 from .client.downloader import Downloader
 from .client.data_manager import DataManager
+from .client.dataset_handle import DatasetHandle
+from .client.graph import InteractionGraph
+from .client.id_index import IdentifierStore
+from .client.ontology import OntologyIndex
+from .client.partitions import PartitionedCache
+from .client.resolver import SymbolResolver
+from .client.sampling import Sampler
+from .client.sql_store import SQLStore
+from .client.text_index import ContentStore
+from .core.config import Config
+from .core.profiling import Profile
 
 
 class FBD:
     def __init__(self, dataset: str | None = None):
         self.dataset = dataset or None
+        self.last_profile = None
 
     def set_dataset(self, dataset: str):
         if dataset is not None:
@@ -35,22 +48,170 @@ class FBD:
         self.dataset = None
         raise ValueError(result.get("message", "Not found"))
 
-    def download_file(self, dataset: str | None = None):
+    def download_file(
+        self,
+        dataset: str | None = None,
+        wait: bool | None = None,
+        priority: int = 0,
+        deadline: float | None = None,
+        refresh: bool = False,
+        columns: list[str] | None = None,
+        chunksize: int | None = None,
+        profile: bool = False,
+        progress=None,
+        pipeline: bool = False,
+        where: dict | None = None,
+    ):
         dataset = dataset or self.dataset
         if dataset is None:
             raise ValueError("No dataset selected")
 
-        result = Downloader.download_file(dataset)
+        options = dict(
+            wait=wait,
+            priority=priority,
+            deadline=deadline,
+            refresh=refresh,
+            columns=columns,
+            chunksize=chunksize,
+            progress=progress,
+            pipeline=pipeline,
+            where=where,
+        )
+        if profile:
+            result = Downloader.download_file(dataset, profile=True, **options)
+            self.last_profile = result.get("profile")
+        elif Config.PROFILE_DOWNLOADS:
+            # Only collected into last_profile; skipped while another Profile is active.
+            with Profile(dataset, strict=False) as prof:
+                result = Downloader.download_file(dataset, **options)
+            self.last_profile = prof.report()
+        else:
+            result = Downloader.download_file(dataset, **options)
 
         if not isinstance(result, dict):
             raise ValueError("Invalid download response")
 
         if "data" in result:
-            return result["data"]
+            return (result["data"], result["profile"]) if profile else result["data"]
 
         if result.get("status") != "ok":
             raise ValueError(result.get("message", "Download failed"))
 
+    def open(self, dataset: str | None = None, refresh: bool = False) -> DatasetHandle:
+        dataset = dataset or self.dataset
+        if dataset is None:
+            raise ValueError("No dataset selected")
+
+        return DatasetHandle(dataset, refresh=refresh)
+
+    def load_mapped(self, dataset: str | None = None, columns: list[str] | None = None, refresh: bool = False):
+        dataset = dataset or self.dataset
+        if dataset is None:
+            raise ValueError("No dataset selected")
+
+        return ColumnarCache.get(dataset, columns=columns, refresh=refresh)
+
+    def partition(self, column: str, dataset: str | None = None, refresh: bool = False):
+        dataset = dataset or self.dataset
+        if dataset is None:
+            raise ValueError("No dataset selected")
+
+        PartitionedCache.get(dataset, column, refresh=refresh)
+        return PartitionedCache.stats(dataset)
+
+    def sample(
+        self,
+        dataset: str | None = None,
+        n: int = 10_000,
+        seed=None,
+        stratify: str | None = None,
+        columns: list[str] | None = None,
+        **download_options,
+    ):
+        dataset = dataset or self.dataset
+        if dataset is None:
+            raise ValueError("No dataset selected")
+
+        result = Sampler.sample(dataset, n, seed=seed, stratify=stratify, columns=columns, **download_options)
+        if result.get("status") != "ok":
+            raise ValueError(result.get("message", "Download failed"))
+        return result["data"]
+
+    def get_ontology_index(
+        self,
+        dataset: str | None = None,
+        relations: tuple[str, ...] = ("is_a",),
+        refresh: bool = False,
+    ) -> OntologyIndex:
+        dataset = dataset or self.dataset
+        if dataset is None:
+            raise ValueError("No dataset selected")
+
+        asset = Downloader.download_asset(dataset, refresh=refresh)
+        if asset.get("status") != "ok":
+            raise ValueError(asset.get("message", "Download failed"))
+
+        if asset["metadata"].get("parser_type") != "obo":
+            raise ValueError(f"Dataset '{dataset}' is not an OBO ontology")
+
+        return OntologyIndex.from_obo(asset["local_path"], closure_relations=relations)
+
+    def get_interaction_graph(
+        self,
+        dataset: str | None = None,
+        source: str | None = None,
+        target: str | None = None,
+        attributes=(),
+        labels: tuple[str, str] | None = None,
+        sep: str | None = "|",
+        directed: bool = True,
+        **download_options,
+    ) -> InteractionGraph:
+        dataset = dataset or self.dataset
+        if dataset is None:
+            raise ValueError("No dataset selected")
+
+        return InteractionGraph.from_dataset(
+            dataset, source, target, attributes=attributes, labels=labels, sep=sep, directed=directed,
+            **download_options,
+        )
+
+    @staticmethod
+    def lookup_id(identifiers, datasets: str | list[str] | None = None, fetch: bool = True) -> dict:
+        hits = IdentifierStore.lookup(identifiers, datasets)
+        if not fetch:
+            return hits
+        return {dataset: IdentifierStore.fetch(dataset, rows) for dataset, rows in hits.items()}
+
+    @staticmethod
+    def search_content(query: str, datasets: str | list[str] | None = None, limit: int | None = 20):
+        return ContentStore.search(query, datasets=datasets, limit=limit)
+
+    @staticmethod
+    def get_symbol_resolver(
+        synonym_dataset: str | None = None,
+        id_dataset: str | None = None,
+        organism: str | None = "Dmel",
+        case_sensitive: bool = True,
+        refresh: bool = False,
+    ) -> SymbolResolver:
+        return SymbolResolver.build(synonym_dataset, id_dataset, organism, case_sensitive, refresh)
+
+    @staticmethod
+    def resolve_symbols(names, organism: str | None = "Dmel", case_sensitive: bool = True, refresh: bool = False):
+        return SymbolResolver.build(organism=organism, case_sensitive=case_sensitive, refresh=refresh).resolve(names)
+
+    def load_sql(self, dataset: str | None = None, refresh: bool = False) -> dict:
+        dataset = dataset or self.dataset
+        if dataset is None:
+            raise ValueError("No dataset selected")
+
+        return SQLStore.load(dataset, refresh=refresh)
+
+    @staticmethod
+    def query(sql: str, params=None, datasets: str | list[str] | None = None):
+        return SQLStore.query(sql, params=params, datasets=datasets)
+
     def get_column_descriptions(self, dataset: str | None = None, columns: str | list | None = "all"):
         dataset = dataset or self.dataset
         if dataset is None:
@@ -67,6 +228,14 @@ class FBD:
         dataset = dataset or self.dataset
         return DataManager.get_description(dataset)
 
+    @staticmethod
+    def get_rate_limit_status() -> dict:
+        return Downloader.rate_limit_status()
+
+    @staticmethod
+    def estimate_download_wait(priority: int = 0) -> float:
+        return Downloader.estimate_wait(priority)
+
     @staticmethod
     def get_categories():
         return DataManager.get_categories()
@@ -0,0 +1,5 @@
+"""
+Benchmarks for FBD's parsers and download path.
+
+Run ``python -m benchmarks.run --help`` from the repository root.
+"""
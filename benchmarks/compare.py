@@ -0,0 +1,66 @@
+# -*- coding: utf-8 -*-
+"""
+Compare two benchmark result files written by benchmarks.run.
+
+    python -m benchmarks.compare benchmarks/results/old.json benchmarks/results/new.json
+
+Exits with status 1 when any case got slower (or its peak memory grew) by
+more than --threshold.
+"""
+import argparse
+import json
+import sys
+from pathlib import Path
+
+
+def compare(baseline: dict, current: dict, threshold: float = 0.10) -> list[dict]:
+    """One row per case present in both reports, with time and memory ratios."""
+    rows = []
+    old_results, new_results = baseline["results"], current["results"]
+    for name in sorted(old_results.keys() & new_results.keys()):
+        old, new = old_results[name], new_results[name]
+        time_ratio = new["seconds"] / old["seconds"] if old["seconds"] else None
+        memory_ratio = new["peak_mb"] / old["peak_mb"] if old["peak_mb"] else None
+        rows.append({
+            "name": name,
+            "old_seconds": old["seconds"],
+            "new_seconds": new["seconds"],
+            "time_ratio": time_ratio,
+            "old_peak_mb": old["peak_mb"],
+            "new_peak_mb": new["peak_mb"],
+            "memory_ratio": memory_ratio,
+            "regression": any(
+                ratio is not None and ratio > 1 + threshold for ratio in (time_ratio, memory_ratio)
+            ),
+        })
+    return rows
+
+
+def print_comparison(rows: list[dict]) -> None:
+    print(f"{'case':<32} {'old s':>9} {'new s':>9} {'x time':>7} {'old MB':>9} {'new MB':>9} {'x mem':>7}")
+    for r in rows:
+        flag = "  <-- regression" if r["regression"] else ""
+        time_ratio = f"{r['time_ratio']:.2f}" if r["time_ratio"] is not None else "-"
+        memory_ratio = f"{r['memory_ratio']:.2f}" if r["memory_ratio"] is not None else "-"
+        print(
+            f"{r['name']:<32} {r['old_seconds']:>9.3f} {r['new_seconds']:>9.3f} {time_ratio:>7} "
+            f"{r['old_peak_mb']:>9.1f} {r['new_peak_mb']:>9.1f} {memory_ratio:>7}{flag}"
+        )
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("baseline", type=Path)
+    parser.add_argument("current", type=Path)
+    parser.add_argument("--threshold", type=float, default=0.10)
+    args = parser.parse_args(argv)
+
+    baseline = json.loads(args.baseline.read_text(encoding="utf-8"))
+    current = json.loads(args.current.read_text(encoding="utf-8"))
+    rows = compare(baseline, current, args.threshold)
+    print_comparison(rows)
+    return 1 if any(r["regression"] for r in rows) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
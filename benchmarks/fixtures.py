@@ -0,0 +1,252 @@
+# -*- coding: utf-8 -*-
+"""
+Synthetic files shaped like FlyBase downloads.
+
+Each writer is deterministic for a given (rows, seed) and returns the
+metadata the edge function would report for it (filename, header,
+parser_type, parse_config), so the same fixture can be parsed directly or
+served through benchmarks.server.
+"""
+import gzip
+import json
+import random
+from pathlib import Path
+
+
+TSV_COLUMNS = [
+    "Starting_gene(s)_symbol",
+    "Starting_gene(s)_FBgn",
+    "Ending_gene(s)_symbol",
+    "Ending_gene(s)_FBgn",
+    "Interaction_type",
+    "Publication_FBrf",
+]
+
+GAF_COLUMNS = [
+    "DB", "DB Object ID", "DB Object Symbol", "Qualifier", "GO ID", "DB:Reference",
+    "Evidence Code", "With (or) From", "Aspect", "DB Object Name", "DB Object Synonym",
+    "DB Object Type", "Taxon", "Date", "Assigned By", "Annotation Extension",
+    "Gene Product Form ID",
+]
+
+INTERACTION_TYPES = ("suppressible", "enhanceable", "phenotypic", "synthetic lethal")
+EVIDENCE_CODES = ("IDA", "IMP", "IGI", "IEA", "ISS", "TAS", "NAS")
+
+
+def _fbgn(rng: random.Random) -> str:
+    return f"FBgn{rng.randrange(10_000_000):07d}"
+
+
+def _symbols(rng: random.Random, n: int = 5000) -> list[str]:
+    prefixes = ("CG", "Adh", "wg", "hh", "dpp", "Notch", "Ubx", "elav", "tin", "Dl")
+    return [f"{rng.choice(prefixes)}{i}" for i in range(n)]
+
+
+def _open(path: Path, gz: bool):
+    return gzip.open(path, "wt", encoding="utf-8", compresslevel=6) if gz else open(path, "w", encoding="utf-8")
+
+
+def _name(stem: str, suffix: str, rows: int, gz: bool) -> str:
+    return f"{stem}_{rows}.{suffix}" + (".gz" if gz else "")
+
+
+def write_tsv(directory: Path, rows: int, gz: bool = False, seed: int = 0) -> dict:
+    """Genetic-interactions style TSV with a ## preamble and trailer."""
+    rng = random.Random(seed)
+    symbols = _symbols(rng)
+    filename = _name("gene_genetic_interactions", "tsv", rows, gz)
+    preamble = [
+        "## FlyBase Gene Genetic Interactions table",
+        "## Generated: Fri Jan 10 00:00:00 2025",
+        "## Using datasource: dbi:Pg:dbname=fb_2025_01_reporting;host=localhost;port=5432",
+        "##",
+    ]
+
+    with _open(Path(directory) / filename, gz) as f:
+        f.write("\n".join(preamble) + "\n")
+        f.write("#" + "\t".join(TSV_COLUMNS) + "\n")
+        for _ in range(rows):
+            f.write(
+                f"{rng.choice(symbols)}\t{_fbgn(rng)}\t{rng.choice(symbols)}\t{_fbgn(rng)}\t"
+                f"{rng.choice(INTERACTION_TYPES)}\tFBrf{rng.randrange(300_000):07d}\n"
+            )
+        f.write("## Finished processing\n")
+
+    return {
+        "filename": filename,
+        "header": len(preamble) + 1,
+        "parser_type": "tsv",
+        "parse_config": None,
+    }
+
+
+def write_fb(directory: Path, rows: int, gz: bool = False, seed: int = 0) -> dict:
+    """GAF 2.2 gene_association.fb with a ! preamble."""
+    rng = random.Random(seed)
+    symbols = _symbols(rng)
+    filename = _name("gene_association", "fb", rows, gz)
+    preamble = ["!gaf-version: 2.2", "!generated-by: FlyBase", "!date-generated: 2025-01-10", "!"]
+
+    with _open(Path(directory) / filename, gz) as f:
+        f.write("\n".join(preamble) + "\n")
+        for _ in range(rows):
+            symbol = rng.choice(symbols)
+            f.write("\t".join((
+                "FB", _fbgn(rng), symbol, rng.choice(("enables", "involved_in", "located_in")),
+                f"GO:{rng.randrange(100_000):07d}", f"FB:FBrf{rng.randrange(300_000):07d}",
+                rng.choice(EVIDENCE_CODES), "", rng.choice("PFC"), f"{symbol} protein",
+                f"{symbol}|CG{rng.randrange(20_000)}", "protein", "taxon:7227", "20250110",
+                "FlyBase", "", "",
+            )) + "\n")
+
+    return {
+        "filename": filename,
+        "header": None,
+        "parser_type": "fb",
+        "parse_config": {"start_line": len(preamble), "columns": GAF_COLUMNS},
+    }
+
+
+def write_affy(directory: Path, rows: int, gz: bool = False, seed: int = 0) -> dict:
+    """Headerless Affymetrix probe-set to gene mapping."""
+    rng = random.Random(seed)
+    symbols = _symbols(rng)
+    filename = _name("affy_drosophila_2", "tsv", rows, gz)
+
+    with _open(Path(directory) / filename, gz) as f:
+        for i in range(rows):
+            f.write(f"{1_620_000 + i}_at\t{_fbgn(rng)}\t{rng.choice(symbols)}\tCG{rng.randrange(20_000)}\n")
+
+    return {"filename": filename, "header": None, "parser_type": "affy", "parse_config": None}
+
+
+def write_json(directory: Path, rows: int, gz: bool = False, seed: int = 0) -> dict:
+    """Alliance-style JSON with metaData and a data array of nested records."""
+    rng = random.Random(seed)
+    symbols = _symbols(rng)
+    filename = _name("disease_model_annotations", "json", rows, gz)
+
+    with _open(Path(directory) / filename, gz) as f:
+        f.write('{"metaData": {"dataProvider": "FB", "release": "2025_01"}, "data": [')
+        for i in range(rows):
+            record = {
+                "objectId": f"FB:{_fbgn(rng)}",
+                "objectName": rng.choice(symbols),
+                "DOid": f"DOID:{rng.randrange(100_000)}",
+                "evidence": {
+                    "evidenceCodes": [rng.choice(EVIDENCE_CODES)],
+                    "publication": {"publicationId": f"FB:FBrf{rng.randrange(300_000):07d}"},
+                },
+                "dateAssigned": "2025-01-10",
+            }
+            f.write(("," if i else "") + json.dumps(record))
+        f.write("]}\n")
+
+    return {"filename": filename, "header": None, "parser_type": "json", "parse_config": None}
+
+
+def write_obo(directory: Path, terms: int, gz: bool = False, seed: int = 0) -> dict:
+    """FBbt-like OBO ontology: is_a and part_of links within a local window."""
+    rng = random.Random(seed)
+    filename = _name("fly_anatomy", "obo", terms, gz)
+
+    with _open(Path(directory) / filename, gz) as f:
+        f.write("format-version: 1.2\ndata-version: fbbt/releases/2025-01-10\nontology: fbbt\n")
+        f.write('subsetdef: cur "curated"\n\n')
+        for i in range(terms):
+            f.write(f"[Term]\nid: FBbt:{i:08d}\nname: structure {i}\nnamespace: fly_anatomy.ontology\n")
+            f.write(f'def: "Anatomical structure number {i}." [FBC:auto_generated_definition]\n')
+            f.write(f'synonym: "struct {i}" EXACT []\n')
+            if i:
+                for parent in {rng.randrange(max(0, i - 200), i) for _ in range(rng.choice((1, 1, 2)))}:
+                    f.write(f"is_a: FBbt:{parent:08d} ! structure {parent}\n")
+                if rng.random() < 0.4:
+                    parent = rng.randrange(max(0, i - 500), i)
+                    f.write(f'relationship: part_of FBbt:{parent:08d} {{source="FBC"}} ! structure {parent}\n')
+            f.write("\n")
+        f.write("[Typedef]\nid: part_of\nname: part of\nis_transitive: true\n")
+
+    return {"filename": filename, "header": None, "parser_type": "obo", "parse_config": None}
+
+
+def write_synonyms(directory: Path, rows: int, gz: bool = False, seed: int = 0) -> dict:
+    """fb_synonym style TSV: one row per FlyBase object with |-separated synonyms."""
+    rng = random.Random(seed)
+    filename = _name("fb_synonym", "tsv", rows, gz)
+    preamble = ["## FlyBase Synonym table", "## Generated: Fri Jan 10 00:00:00 2025", "##"]
+    columns = [
+        "primary_FBid", "organism_abbreviation", "current_symbol", "current_fullname",
+        "fullname_synonym(s)", "symbol_synonym(s)",
+    ]
+
+    with _open(Path(directory) / filename, gz) as f:
+        f.write("\n".join(preamble) + "\n")
+        f.write("#" + "\t".join(columns) + "\n")
+        for i in range(rows):
+            kind, organism = ("FBgn", "Dmel") if i % 10 else ("FBal", "Dmel") if i % 20 else ("FBgn", "Dsim")
+            # Every synonym sym{k} is shared by two consecutive genes, so half the lookups are ambiguous.
+            synonyms = [f"CG{i + 10_000}", f"sym{i // 2}"] + [f"alias{rng.randrange(rows)}" for _ in range(rng.randrange(3))]
+            f.write("\t".join((
+                f"{kind}{i:07d}", organism, f"g{i}", f"gene {i}", f"gene {i} old|old name {i}", "|".join(synonyms),
+            )) + "\n")
+        f.write("## Finished processing\n")
+
+    return {"filename": filename, "header": len(preamble) + 1, "parser_type": "tsv", "parse_config": None}
+
+
+def write_id_map(directory: Path, rows: int, gz: bool = False, seed: int = 0) -> dict:
+    """fbgn_annotation_ID style TSV: primary and secondary FBgns and annotation IDs per gene."""
+    rng = random.Random(seed)
+    filename = _name("fbgn_annotation_ID", "tsv", rows, gz)
+    preamble = ["## FlyBase FBgn-Annotation ID Correspondence Table", "## Generated: Fri Jan 10 00:00:00 2025", "##"]
+    columns = [
+        "gene_symbol", "organism_abbreviation", "primary_FBgn#", "secondary_FBgn#(s)",
+        "annotation_ID", "secondary_annotation_ID(s)",
+    ]
+
+    with _open(Path(directory) / filename, gz) as f:
+        f.write("\n".join(preamble) + "\n")
+        f.write("#" + "\t".join(columns) + "\n")
+        for i in range(rows):
+            secondary = ",".join(f"FBgn{9_000_000 + i * 3 + k:07d}" for k in range(rng.randrange(3)))
+            f.write("\t".join((
+                f"g{i}", "Dmel", f"FBgn{i:07d}", secondary, f"CG{i}", f"CG{i + 50_000}" if i % 4 == 0 else "",
+            )) + "\n")
+        f.write("## Finished processing\n")
+
+    return {"filename": filename, "header": len(preamble) + 1, "parser_type": "tsv", "parse_config": None}
+
+
+WRITERS = {
+    "tsv": write_tsv,
+    "fb": write_fb,
+    "affy": write_affy,
+    "json": write_json,
+    "obo": write_obo,
+    "synonyms": write_synonyms,
+    "id_map": write_id_map,
+}
+
+# Rows written per fixture kind, relative to the TSV row count.
+ROW_RATIOS = {"tsv": 1.0, "fb": 0.5, "affy": 0.1, "json": 0.1, "obo": 0.02, "synonyms": 0.1, "id_map": 0.1}
+
+
+def build(directory: Path, kind: str, rows: int, gz: bool = False, seed: int = 0) -> dict:
+    """
+    Write (or reuse) one fixture and return its metadata with the local
+    path under "path". Existing files with the same name are reused.
+    """
+    directory = Path(directory) / f"seed{seed}"
+    directory.mkdir(parents=True, exist_ok=True)
+    count = max(1, int(rows * ROW_RATIOS[kind]))
+
+    marker = directory / f".{kind}_{count}_{int(gz)}.json"
+    if marker.exists():
+        metadata = json.loads(marker.read_text(encoding="utf-8"))
+        if (directory / metadata["filename"]).exists():
+            return {**metadata, "path": directory / metadata["filename"]}
+
+    metadata = WRITERS[kind](directory, count, gz=gz, seed=seed)
+    metadata["rows"] = count
+    marker.write_text(json.dumps(metadata), encoding="utf-8")
+    return {**metadata, "path": directory / metadata["filename"]}
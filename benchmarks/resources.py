@@ -0,0 +1,112 @@
+# -*- coding: utf-8 -*-
+"""
+Per-dataset resource table: elapsed time and peak traced memory of every
+download/parse stage, for sizing workers.
+
+    python -m benchmarks.resources --category Genes --out genes.csv
+    python -m benchmarks.resources --dataset gene_genetic_interactions --dataset gene_association
+    python -m benchmarks.resources                        # whole catalog
+    python -m benchmarks.resources --synthetic --rows 200000
+
+Real datasets are downloaded through the normal rate limiter in "wait"
+mode, so a whole-catalog run takes as long as the download budget
+requires; already cached files are profiled without a new transfer.
+--synthetic profiles the benchmark fixtures through the local edge
+function stub instead.
+"""
+import argparse
+import shutil
+import sys
+import tempfile
+from pathlib import Path
+
+from benchmarks import fixtures
+from benchmarks.run import _patched_config
+from benchmarks.server import EdgeFunctionStub
+
+
+def profile_datasets(datasets, refresh: bool = False, verbose: bool = True):
+    """Profile download_file for each dataset and return FBD.core.profiling.resource_table."""
+    from FBD.fbd import FBD
+    from FBD.core.profiling import resource_table
+
+    fbd = FBD()
+    reports = []
+    for dataset in datasets:
+        try:
+            _, report = fbd.download_file(dataset, wait=True, refresh=refresh, profile=True)
+        except Exception as exc:
+            report = {"dataset": dataset, "error": f"{type(exc).__name__}: {exc}"}
+        reports.append(report)
+        if verbose:
+            if "error" in report:
+                print(f"{dataset:<48} {report['error']}", flush=True)
+            else:
+                print(f"{dataset:<48} {report['seconds']:>9.3f}s  {report['peak_bytes'] / 1e6:>9.1f} MB peak",
+                      flush=True)
+
+    table = resource_table(reports)
+    errors = [r.get("error") for r in reports]
+    if any(errors):
+        table["error"] = errors
+    return table
+
+
+def catalog_datasets(category: str | None = None) -> list[str]:
+    from FBD.fbd import FBD
+
+    if category:
+        return list(FBD.get_files_by_category(category))
+    return [ds for datasets in FBD.get_files_by_category().values() for ds in datasets]
+
+
+def profile_synthetic(rows: int, fixtures_dir: Path | None = None, verbose: bool = True):
+    """Profile every fixture kind (plain and gzipped) served by EdgeFunctionStub."""
+    fixture_dir = Path(fixtures_dir or Path(tempfile.gettempdir()) / "fbd-bench-fixtures") / str(rows)
+    work_dir = Path(tempfile.mkdtemp(prefix="fbd-resources-"))
+    try:
+        with EdgeFunctionStub() as stub, _patched_config(
+            EDGE_FUNCTION_URL=stub.url,
+            DOWNLOAD_DIR=work_dir / "downloads",
+            CACHE_DIR=work_dir / "cache",
+            DOWNLOAD_RATE_LIMIT_ENABLED=False,
+        ):
+            names = []
+            for kind in fixtures.WRITERS:
+                for gz in (False, True):
+                    name = f"{kind}{'.gz' if gz else ''}"
+                    stub.add(name, fixtures.build(fixture_dir, kind, rows, gz))
+                    names.append(name)
+            return profile_datasets(names, refresh=True, verbose=verbose)
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--dataset", action="append", help="dataset to profile (repeatable)")
+    parser.add_argument("--category", help="profile every dataset of this category")
+    parser.add_argument("--refresh", action="store_true", help="download again even if cached")
+    parser.add_argument("--synthetic", action="store_true", help="profile benchmark fixtures via the local stub")
+    parser.add_argument("--rows", type=int, default=200_000, help="TSV rows for --synthetic")
+    parser.add_argument("--fixtures-dir", type=Path)
+    parser.add_argument("--out", type=Path, help="write the table as CSV")
+    args = parser.parse_args(argv)
+
+    if args.synthetic:
+        table = profile_synthetic(args.rows, args.fixtures_dir)
+    else:
+        datasets = args.dataset or catalog_datasets(args.category)
+        table = profile_datasets(datasets, refresh=args.refresh)
+
+    if args.out:
+        table.to_csv(args.out, index=False)
+        print(f"\nSaved {args.out}")
+    else:
+        print()
+        print(table.to_string(index=False))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,412 @@
+# -*- coding: utf-8 -*-
+"""
+Time and memory-profile FBD's parsers and download path.
+
+    python -m benchmarks.run --scale small
+    python -m benchmarks.run --scale large --only "parse.tsv*" --baseline benchmarks/results/old.json
+
+Fixtures are generated once per scale in --fixtures-dir and reused by later
+runs. Each case is timed --repeat times (best and median wall time are
+reported) and then run once more under tracemalloc for its peak Python
+allocation. Results are written as JSON to --out (default
+benchmarks/results/<timestamp>.json); compare two result files with
+``python -m benchmarks.compare``.
+"""
+import argparse
+import fnmatch
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from pathlib import Path
+
+from benchmarks import fixtures
+from benchmarks.compare import compare, print_comparison
+from benchmarks.server import EdgeFunctionStub
+
+RESULTS_DIR = Path(__file__).resolve().parent / "results"
+
+# Rows in the TSV fixture; the other fixtures scale with fixtures.ROW_RATIOS.
+SCALES = {
+    "tiny": 2_000,
+    "small": 200_000,
+    "medium": 1_000_000,
+    "large": 3_000_000,
+}
+
+
+class Case:
+    def __init__(self, name: str, fn, setup=None, input_path: Path | None = None):
+        self.name = name
+        self.fn = fn
+        self.setup = setup
+        self.input_path = input_path
+
+
+def _consume(result) -> int | None:
+    """Exhaust lazy results and return a row count where one makes sense."""
+    if isinstance(result, dict) and "data" in result:
+        result = result["data"]
+    if hasattr(result, "shape"):
+        return int(result.shape[0])
+    if hasattr(result, "number_of_nodes"):
+        return result.number_of_nodes()
+    if hasattr(result, "__next__"):
+        return sum(_consume(item) or 1 for item in result)
+    return None
+
+
+def measure(case: Case, repeat: int) -> dict:
+    timings, rows = [], None
+    for _ in range(repeat):
+        args = case.setup() if case.setup else ()
+        start = time.perf_counter()
+        rows = _consume(case.fn(*args))
+        timings.append(time.perf_counter() - start)
+
+    args = case.setup() if case.setup else ()
+    tracemalloc.start()
+    try:
+        _consume(case.fn(*args))
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    best = min(timings)
+    result = {
+        "seconds": best,
+        "seconds_median": statistics.median(timings),
+        "repeat": repeat,
+        "peak_mb": peak / 1e6,
+        "rows": rows,
+    }
+    if case.input_path is not None:
+        size = case.input_path.stat().st_size
+        result["input_mb"] = size / 1e6
+        result["mb_per_s"] = size / 1e6 / best if best else None
+    return result
+
+
+@contextmanager
+def _patched_config(**values):
+    from FBD.core.config import Config
+
+    saved = {name: vars(Config).get(name) for name in values}
+    for name, value in values.items():
+        setattr(Config, name, value)
+    try:
+        yield
+    finally:
+        for name, value in saved.items():
+            setattr(Config, name, value)
+
+
+def parse_cases(fixture_dir: Path, rows: int) -> list[Case]:
+    from FBD.client.parse import Parse
+
+    cases = []
+    for gz in (False, True):
+        suffix = ".gz" if gz else ""
+        tsv = fixtures.build(fixture_dir, "tsv", rows, gz)
+        fb = fixtures.build(fixture_dir, "fb", rows, gz)
+        affy = fixtures.build(fixture_dir, "affy", rows, gz)
+        js = fixtures.build(fixture_dir, "json", rows, gz)
+        obo = fixtures.build(fixture_dir, "obo", rows, gz)
+
+        cases += [
+            Case(f"parse.tsv{suffix}", lambda m=tsv: Parse.parse(m["path"], "tsv", header=m["header"]),
+                 input_path=tsv["path"]),
+            Case(f"parse.tsv.python{suffix}", lambda m=tsv: Parse.tsv_to_df(m["path"], m["header"]),
+                 input_path=tsv["path"]),
+            Case(f"parse.tsv.chunked{suffix}",
+                 lambda m=tsv: Parse.parse(m["path"], "tsv", header=m["header"], chunksize=100_000),
+                 input_path=tsv["path"]),
+            Case(f"parse.fb{suffix}",
+                 lambda m=fb: Parse.parse(m["path"], "fb", config=m["parse_config"]),
+                 input_path=fb["path"]),
+            Case(f"parse.affy{suffix}", lambda m=affy: Parse.parse(m["path"], "affy"),
+                 input_path=affy["path"]),
+            Case(f"parse.json{suffix}", lambda m=js: Parse.parse(m["path"], "json"),
+                 input_path=js["path"]),
+            Case(f"parse.json.chunked{suffix}",
+                 lambda m=js: Parse.parse(m["path"], "json", chunksize=50_000),
+                 input_path=js["path"]),
+            Case(f"parse.obo{suffix}", lambda m=obo: Parse.parse(m["path"], "obo"),
+                 input_path=obo["path"]),
+            Case(f"detect_header_line{suffix}", lambda m=tsv: Parse.detect_header_line(m["path"]),
+                 input_path=tsv["path"]),
+        ]
+
+    tsv_gz = fixtures.build(fixture_dir, "tsv", rows, gz=True)
+    scratch = Path(tempfile.mkdtemp(prefix="fbd-bench-gz-"))
+
+    def copy_gz():
+        target = scratch / tsv_gz["path"].name
+        shutil.copyfile(tsv_gz["path"], target)
+        return (target,)
+
+    cases.append(Case("decompress_gz", Parse.decompress_gz, setup=copy_gz, input_path=tsv_gz["path"]))
+
+    tsv = fixtures.build(fixture_dir, "tsv", rows, gz=False)
+    cases.append(Case(
+        "parse.tsv.parallel",
+        lambda: Parse.tsv_to_df(tsv["path"], tsv["header"], workers=max(os.cpu_count() or 1, 2)),
+        input_path=tsv["path"],
+    ))
+    return cases
+
+
+def download_cases(fixture_dir: Path, rows: int, stub: EdgeFunctionStub) -> list[Case]:
+    from FBD.client.downloader import Downloader
+
+    cases = []
+    for kind in ("tsv", "fb", "json", "obo"):
+        for gz in (False, True):
+            meta = fixtures.build(fixture_dir, kind, rows, gz)
+            name = f"{kind}{'.gz' if gz else ''}"
+            stub.add(name, meta)
+            cases.append(Case(
+                f"download_file.{name}",
+                lambda n=name: Downloader.download_file(n, refresh=True),
+                input_path=meta["path"],
+            ))
+            if kind != "obo":
+                cases.append(Case(
+                    f"download_file.{name}.pipeline",
+                    lambda n=name: Downloader.download_file(n, refresh=True, pipeline=True),
+                    input_path=meta["path"],
+                ))
+
+    def first_chunk(name, pipeline):
+        chunks = Downloader.download_file(name, refresh=True, chunksize=10_000, pipeline=pipeline)["data"]
+        chunk = next(chunks)
+        chunks.close()
+        return chunk
+
+    for name in ("tsv.gz", "fb.gz"):
+        for pipeline in (False, True):
+            cases.append(Case(
+                f"first_chunk.{name}{'.pipeline' if pipeline else ''}",
+                lambda n=name, p=pipeline: first_chunk(n, p),
+            ))
+
+    from FBD.client.sampling import Sampler
+
+    cases += [
+        Case("sample.tsv", lambda: Sampler.sample("tsv", 10_000, seed=0)),
+        Case("sample.tsv.stratified", lambda: Sampler.sample("tsv", 10_000, seed=0, stratify="Interaction_type")),
+        Case("sample.tsv.full_load", lambda: Downloader.download_file("tsv")["data"].sample(10_000, random_state=0)),
+    ]
+
+    from FBD.client.graph import InteractionGraph
+
+    cases += [
+        Case("graph.tsv.from_dataset", lambda: InteractionGraph.from_dataset("tsv", attributes=["Interaction_type"])),
+        Case("graph.tsv.to_csr", lambda: InteractionGraph.from_dataset("tsv").to_csr()),
+    ]
+
+    from FBD.client.id_index import IdentifierStore
+
+    IdentifierStore.build("tsv")
+    wanted = Downloader.download_file("tsv", columns=["Ending_gene(s)_FBgn"])["data"].iloc[::997, 0].tolist()
+    cases += [
+        Case("lookup_id.tsv.rows", lambda: IdentifierStore.lookup(wanted)),
+        Case("lookup_id.tsv.fetch", lambda: IdentifierStore.fetch("tsv", IdentifierStore.lookup(wanted)["tsv"])),
+        Case("lookup_id.tsv.full_scan", lambda: (lambda df: df[df.isin(wanted).any(axis=1)])(
+            Downloader.download_file("tsv")["data"])),
+    ]
+
+    from FBD.client.text_index import ContentStore
+
+    ContentStore.build("tsv")
+    query = f"{wanted[0]} suppressible"
+
+    def regex_scan():
+        df = Downloader.download_file("tsv")["data"]
+        pattern = rf"(?i)\b(?:{wanted[0]}|suppressible)\b"
+        return df[df.select_dtypes(exclude="number").apply(lambda c: c.str.contains(pattern)).any(axis=1)]
+
+    cases += [
+        Case("search_content.tsv", lambda: ContentStore.search(query, datasets="tsv")),
+        Case("search_content.tsv.regex_scan", regex_scan),
+    ]
+
+    from FBD.client.columnar import ColumnarCache
+
+    ColumnarCache.get("tsv")
+    cases += [
+        Case("columnar.write.tsv", lambda: ColumnarCache.write(
+            "tsv", Downloader.download_file("tsv", chunksize=100_000)["data"])),
+        Case("columnar.load.tsv", lambda: ColumnarCache.load("tsv")),
+        Case("columnar.download_file.tsv", lambda: Downloader.download_file("tsv")),
+    ]
+
+    from FBD.client.partitions import PartitionedCache
+
+    PartitionedCache.get("tsv", "Interaction_type")
+    tsv_path = Downloader.download_asset("tsv")["local_path"]
+    where = {"Interaction_type": "suppressible"}
+    cases += [
+        Case("partitions.write.tsv", lambda: PartitionedCache.write(
+            "tsv", Downloader.download_file("tsv", chunksize=100_000)["data"], "Interaction_type", tsv_path)),
+        Case("partitions.where.tsv", lambda: Downloader.download_file("tsv", where=where)),
+        Case("partitions.where.tsv.full_load", lambda: PartitionedCache.filter(
+            Downloader.download_file("tsv")["data"], where)),
+    ]
+
+    import numpy as np
+    import pandas as pd
+    from FBD.client.resolver import SymbolResolver
+
+    for kind, dataset in (("synonyms", SymbolResolver.SYNONYM_DATASET), ("id_map", SymbolResolver.ID_DATASET)):
+        stub.add(dataset, fixtures.build(fixture_dir, kind, rows))
+    resolver = SymbolResolver.build()
+    synonyms = Downloader.download_file(SymbolResolver.SYNONYM_DATASET)["data"]
+    names = np.resize(synonyms["current_symbol"].to_numpy(dtype=object), 1_000_000)
+
+    def merge_resolve():
+        table = synonyms.assign(name=synonyms["symbol_synonym(s)"].str.split("|")).explode("name")
+        table = pd.concat([table, synonyms.assign(name=synonyms["current_symbol"])])
+        return pd.DataFrame({"name": names}).merge(table[["name", "primary_FBid"]], on="name", how="left")
+
+    cases += [
+        Case("resolver.build", lambda: SymbolResolver.build()),
+        Case("resolver.resolve_1m", lambda: resolver.resolve(names)),
+        Case("resolver.merge_1m", merge_resolve),
+    ]
+
+    from FBD.client.sql_store import SQLStore
+
+    SQLStore.load("tsv")
+    target = wanted[0]
+    cases += [
+        Case("sql.load.tsv", lambda: SQLStore.load("tsv")),
+        Case("sql.query.tsv", lambda: SQLStore.query(
+            'SELECT * FROM tsv WHERE "Ending_gene(s)_FBgn" = ?', params=(target,))),
+        Case("sql.query.tsv.full_load", lambda: (lambda df: df[df["Ending_gene(s)_FBgn"] == target])(
+            Downloader.download_file("tsv")["data"])),
+    ]
+    return cases
+
+
+def transfer_cases(fixture_dir: Path, rows: int, stub: EdgeFunctionStub, work_dir: Path) -> list[Case]:
+    """Raw body transfer from the stub: Transfer.to_file against the old 8 KiB iter_content loop."""
+    import requests
+    from FBD.client.transfer import Transfer
+
+    meta = fixtures.build(fixture_dir, "tsv", rows, gz=False)
+    url = f"{stub.url}/files/{meta['filename']}"
+    target = work_dir / "transfer.out"
+
+    def readinto():
+        with requests.get(url, stream=True, timeout=60) as response:
+            Transfer.to_file(response, target)
+
+    def iter_content():
+        with requests.get(url, stream=True, timeout=60) as response, open(target, "wb") as f:
+            for chunk in response.iter_content(chunk_size=8192):
+                f.write(chunk)
+
+    return [
+        Case("transfer.readinto", readinto, input_path=meta["path"]),
+        Case("transfer.iter_content", iter_content, input_path=meta["path"]),
+    ]
+
+
+def _git_commit() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=Path(__file__).resolve().parent,
+            capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(
+    scale: str = "small",
+    rows: int | None = None,
+    only: list[str] | None = None,
+    repeat: int = 3,
+    fixtures_dir: Path | None = None,
+    verbose: bool = True,
+) -> dict:
+    rows = rows or SCALES[scale]
+    fixture_dir = Path(fixtures_dir or Path(tempfile.gettempdir()) / "fbd-bench-fixtures") / str(rows)
+    work_dir = Path(tempfile.mkdtemp(prefix="fbd-bench-"))
+
+    def selected(case):
+        return not only or any(fnmatch.fnmatch(case.name, pattern) for pattern in only)
+
+    results = {}
+    with EdgeFunctionStub() as stub, _patched_config(
+        EDGE_FUNCTION_URL=stub.url,
+        DOWNLOAD_DIR=work_dir / "downloads",
+        CACHE_DIR=work_dir / "cache",
+        DOWNLOAD_RATE_LIMIT_ENABLED=False,
+    ):
+        cases = (
+            parse_cases(fixture_dir, rows)
+            + download_cases(fixture_dir, rows, stub)
+            + transfer_cases(fixture_dir, rows, stub, work_dir)
+        )
+        for case in filter(selected, cases):
+            results[case.name] = measure(case, repeat)
+            if verbose:
+                r = results[case.name]
+                print(f"{case.name:<32} {r['seconds']:>9.3f}s  {r['peak_mb']:>9.1f} MB peak", flush=True)
+
+    shutil.rmtree(work_dir, ignore_errors=True)
+    return {
+        "meta": {
+            "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "commit": _git_commit(),
+            "python": sys.version.split()[0],
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "scale": scale,
+            "rows": rows,
+            "repeat": repeat,
+        },
+        "results": results,
+    }
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scale", choices=SCALES, default="small")
+    parser.add_argument("--rows", type=int, help="TSV rows; overrides --scale")
+    parser.add_argument("--only", action="append", help="glob of case names to run (repeatable)")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--fixtures-dir", type=Path)
+    parser.add_argument("--out", type=Path, help="results file (default: benchmarks/results/<timestamp>.json)")
+    parser.add_argument("--baseline", type=Path, help="compare against this results file")
+    parser.add_argument("--threshold", type=float, default=0.10, help="relative slowdown flagged as regression")
+    args = parser.parse_args(argv)
+
+    report = run(args.scale, args.rows, args.only, args.repeat, args.fixtures_dir)
+
+    out = args.out or RESULTS_DIR / f"{datetime.now().strftime('%Y%m%d-%H%M%S')}.json"
+    out.parent.mkdir(parents=True, exist_ok=True)
+    out.write_text(json.dumps(report, indent=2), encoding="utf-8")
+    print(f"\nSaved {out}")
+
+    if args.baseline:
+        baseline = json.loads(args.baseline.read_text(encoding="utf-8"))
+        rows = compare(baseline, report, args.threshold)
+        print_comparison(rows)
+        return 1 if any(r["regression"] for r in rows) else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,129 @@
+# -*- coding: utf-8 -*-
+"""
+Local stand-in for the FBD edge function.
+
+Serves the subset of the edge function API that Downloader and DataManager
+use (/search, /datasets/<name>/header) plus the dataset files themselves
+under /files/, from a threaded HTTP server on 127.0.0.1. Point
+Config.EDGE_FUNCTION_URL at EdgeFunctionStub.url to run the real download
+path without touching the network.
+"""
+import json
+import shutil
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, unquote, urlparse
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send_json(self, payload: dict, status: int = 200) -> None:
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_file(self, path: Path) -> None:
+        self.send_response(200)
+        self.send_header("Content-Type", "application/octet-stream")
+        self.send_header("Content-Length", str(path.stat().st_size))
+        self.end_headers()
+        with open(path, "rb") as f:
+            try:
+                shutil.copyfileobj(f, self.wfile, self.server.chunk_size)
+            except (BrokenPipeError, ConnectionResetError):
+                pass  # client stopped reading early (prefix reads)
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        parts = [unquote(p) for p in url.path.strip("/").split("/")]
+        datasets = self.server.datasets
+        self.server.hits[parts[0]] = self.server.hits.get(parts[0], 0) + 1
+
+        if parts == ["search"]:
+            query = parse_qs(url.query).get("q", [""])[0]
+            if query in datasets:
+                meta = datasets[query]
+                return self._send_json({
+                    "status": "ok",
+                    "dataset": query,
+                    "link": f"{self.server.url}/files/{meta['filename']}",
+                    "filename": meta["filename"],
+                    "header": meta.get("header"),
+                    "parser_type": meta.get("parser_type"),
+                    "parse_config": meta.get("parse_config"),
+                })
+            matches = [name for name in datasets if query.lower() in name.lower()]
+            if matches:
+                return self._send_json({"status": "multiple", "matches": {"Benchmarks": matches}})
+            return self._send_json({"status": "not_found"})
+
+        if len(parts) == 3 and parts[0] == "datasets" and parts[2] == "header":
+            meta = datasets.get(parts[1])
+            if meta is None:
+                return self._send_json({"status": "not_found"}, 404)
+            return self._send_json({"status": "ok", "header": meta.get("header")})
+
+        if len(parts) == 2 and parts[0] == "files":
+            for meta in datasets.values():
+                if meta["filename"] == parts[1]:
+                    return self._send_file(Path(meta["path"]))
+
+        self._send_json({"status": "not_found"}, 404)
+
+
+class EdgeFunctionStub:
+    """
+    Threaded local HTTP server answering like the edge function.
+
+    datasets maps dataset name -> metadata as returned by
+    benchmarks.fixtures.build (filename, header, parser_type, parse_config
+    and the local "path" to serve). Use as a context manager; request
+    counts per endpoint are kept in .hits.
+    """
+
+    def __init__(self, datasets: dict | None = None, chunk_size: int = 1 << 16):
+        self.datasets = dict(datasets or {})
+        self.chunk_size = chunk_size
+        self.hits = {}
+        self._server = None
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def add(self, name: str, metadata: dict) -> None:
+        self.datasets[name] = metadata
+
+    def start(self) -> "EdgeFunctionStub":
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+        self._server.daemon_threads = True
+        self._server.datasets = self.datasets
+        self._server.chunk_size = self.chunk_size
+        self._server.hits = self.hits
+        self._server.url = self.url
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._thread.join()
+            self._server = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
@@ -0,0 +1,46 @@
+import pytest
+
+from benchmarks import fixtures
+from benchmarks.server import EdgeFunctionStub
+from FBD.core.config import Config
+
+
+@pytest.fixture
+def cache(tmp_path, monkeypatch):
+    """Download and cache directories under tmp_path, with the rate limit off."""
+    monkeypatch.setattr(Config, "DOWNLOAD_DIR", tmp_path / "downloads")
+    monkeypatch.setattr(Config, "CACHE_DIR", tmp_path / "cache")
+    monkeypatch.setattr(Config, "DOWNLOAD_RATE_LIMIT_ENABLED", False)
+    return tmp_path
+
+
+@pytest.fixture
+def stub_options():
+    """Keyword arguments for the stub's EdgeFunctionStub; override in a test module."""
+    return {}
+
+
+@pytest.fixture
+def stub_datasets():
+    """{name: (fixture kind, rows, gz)} registered on the stub; override in a test module."""
+    return {}
+
+
+@pytest.fixture
+def stub(cache, monkeypatch, stub_options, stub_datasets):
+    """A running EdgeFunctionStub that Config.EDGE_FUNCTION_URL points to, serving stub_datasets."""
+    with EdgeFunctionStub(**stub_options) as server:
+        monkeypatch.setattr(Config, "EDGE_FUNCTION_URL", server.url)
+        for name, (kind, rows, gz) in stub_datasets.items():
+            server.add(name, fixtures.build(cache / "fixtures", kind, rows=rows, gz=gz))
+        yield server
+
+
+@pytest.fixture
+def serve(stub, cache):
+    """serve(name, kind, rows, gz=False) builds a benchmark fixture and registers it on the stub."""
+    def serve(name, kind, rows, gz=False):
+        metadata = fixtures.build(cache / "fixtures", kind, rows=rows, gz=gz)
+        stub.add(name, metadata)
+        return metadata
+    return serve
@@ -0,0 +1,29 @@
+import pandas as pd
+
+from benchmarks.compare import compare
+from benchmarks.run import run
+from FBD.client.downloader import Downloader
+from FBD.client.parse import Parse
+
+
+def test_stub_serves_the_real_download_path(stub, serve):
+    meta = serve("interactions", "tsv", rows=50, gz=True)
+    result = Downloader.download_file("interactions")
+
+    expected = Parse.parse(meta["path"], "tsv", header=meta["header"])
+    assert result["status"] == "ok"
+    assert len(result["data"]) == 50
+    pd.testing.assert_frame_equal(result["data"], expected)
+    assert stub.hits == {"search": 1, "files": 1}
+
+
+def test_run_and_compare(tmp_path):
+    report = run(rows=100, only=["parse.fb", "download_file.fb"], repeat=1,
+                 fixtures_dir=tmp_path, verbose=False)
+
+    assert set(report["results"]) == {"parse.fb", "download_file.fb"}
+    assert report["results"]["parse.fb"]["rows"] == 50
+
+    slower = {"results": {name: {**r, "seconds": r["seconds"] * 2} for name, r in report["results"].items()}}
+    rows = compare(report, slower)
+    assert all(r["regression"] for r in rows)
@@ -0,0 +1,44 @@
+import pytest
+
+from FBD.core.cache import dataset_path, save_npz, source_signature, staged_dir
+from FBD.core.config import Config
+
+
+def test_source_signature_changes_with_the_file(tmp_path):
+    path = tmp_path / "data.tsv"
+    assert source_signature(path) is None
+
+    path.write_text("a\n")
+    first = source_signature(path)
+    path.write_text("a\nb\n")
+
+    assert first.startswith("data.tsv:2:")
+    assert source_signature(path) != first
+
+
+def test_dataset_path_and_save_npz(tmp_path, monkeypatch):
+    np = pytest.importorskip("numpy")
+    monkeypatch.setattr(Config, "CACHE_DIR", tmp_path)
+
+    path = dataset_path("index", "a/b", ".ids.npz")
+    assert path == tmp_path / "index" / "a_b.ids.npz"
+
+    save_npz(path, values=np.arange(3))
+    with np.load(path) as data:
+        assert data["values"].tolist() == [0, 1, 2]
+    assert [p.name for p in path.parent.iterdir()] == ["a_b.ids.npz"]
+
+
+def test_staged_dir_replaces_target_only_on_success(tmp_path):
+    target = tmp_path / "cache" / "ds"
+    with staged_dir(target) as staging:
+        (staging / "meta.json").write_text("1")
+    assert (target / "meta.json").read_text() == "1"
+
+    with pytest.raises(RuntimeError):
+        with staged_dir(target) as staging:
+            (staging / "meta.json").write_text("2")
+            raise RuntimeError("boom")
+
+    assert (target / "meta.json").read_text() == "1"
+    assert [p.name for p in target.parent.iterdir()] == ["ds"]
@@ -0,0 +1,91 @@
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from FBD.client.columnar import ColumnarCache
+from FBD.core.config import Config
+from FBD.core.events import Events
+from FBD.fbd import FBD
+
+
+def mapped(array) -> bool:
+    while array is not None:
+        if isinstance(array, np.memmap):
+            return True
+        array = array.base
+    return False
+
+
+def frame():
+    return pd.DataFrame({
+        "score": [1, 2, 3, 4],
+        "weight": [0.5, np.nan, 1.5, 2.0],
+        "flag": [True, False, True, True],
+        "symbol": ["wg", None, "hh", "wg"],
+        "evidence": [{"codes": ["IDA"]}, None, {"codes": []}, {"codes": ["IMP"]}],
+    })
+
+
+def column_sum(args):
+    cache_dir, dataset, column = args
+    Config.CACHE_DIR = cache_dir
+    df = ColumnarCache.load(dataset)
+    return float(df[column].sum()), mapped(df[column].to_numpy())
+
+
+def test_roundtrip_maps_numeric_columns_and_category_codes(cache):
+    df = frame()
+    ColumnarCache.write("d", [df.iloc[:2], df.iloc[2:]])
+    loaded = ColumnarCache.load("d")
+
+    assert loaded["score"].tolist() == [1, 2, 3, 4]
+    assert loaded["weight"].isna().tolist() == [False, True, False, False]
+    assert loaded["flag"].dtype == bool
+    assert loaded["symbol"].tolist()[:1] + loaded["symbol"].tolist()[2:] == ["wg", "hh", "wg"]
+    assert pd.isna(loaded["symbol"].iloc[1])
+    assert loaded["evidence"].tolist() == df["evidence"].tolist()
+
+    assert mapped(loaded["score"].to_numpy())
+    assert not loaded["score"].to_numpy().flags.writeable
+    assert mapped(loaded["symbol"].array.codes)
+    assert loaded["symbol"].array.codes.dtype == np.int8
+
+    assert list(ColumnarCache.load("d", columns=["symbol", "score"]).columns) == ["symbol", "score"]
+    with pytest.raises(ValueError, match="Unknown columns"):
+        ColumnarCache.load("d", columns=["nope"])
+
+
+def test_column_changing_type_between_chunks_becomes_categorical(cache):
+    ColumnarCache.write("d", [pd.DataFrame({"x": [1, 2]}), pd.DataFrame({"x": ["a", None]})])
+    x = ColumnarCache.load("d")["x"]
+
+    assert x.dtype == "category"
+    assert x.tolist()[:3] == [1, 2, "a"]
+
+
+def test_worker_processes_map_the_same_files(cache):
+    ColumnarCache.write("d", pd.DataFrame({"v": np.arange(100_000, dtype=np.int64)}))
+    with ProcessPoolExecutor(2) as pool:
+        results = list(pool.map(column_sum, [(Config.CACHE_DIR, "d", "v")] * 2))
+
+    assert results == [(float(np.arange(100_000).sum()), True)] * 2
+
+
+def test_load_mapped_rebuilds_after_the_file_changes(serve):
+    serve("ggi", "tsv", rows=500, gz=True)
+    events = []
+    with Events.subscribed(events.append):
+        fbd = FBD("ggi")
+        df = fbd.load_mapped()
+        again = fbd.load_mapped(columns=["Interaction_type"])
+        expected = fbd.download_file()
+
+        fbd.download_file(refresh=True)
+        fbd.load_mapped()
+
+    assert [e.name for e in events].count("columnar.write") == 2
+    assert df.astype(object).to_dict("list") == expected.astype(object).to_dict("list")
+    assert list(again.columns) == ["Interaction_type"]
+    assert again["Interaction_type"].dtype == "category"
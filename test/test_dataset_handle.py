@@ -0,0 +1,80 @@
+from unittest.mock import patch
+
+import pandas as pd
+import pytest
+
+from FBD.client.dataset_handle import DatasetHandle
+from FBD.client.downloader import Downloader
+from FBD.fbd import FBD
+
+
+@pytest.fixture(autouse=True)
+def small_preview(monkeypatch):
+    monkeypatch.setattr(DatasetHandle, "PREVIEW_BYTES", 16 << 10)
+
+
+@pytest.fixture
+def stub_options():
+    return {"chunk_size": 4096}
+
+
+def test_open_is_lazy():
+    with patch("FBD.client.downloader.Downloader.search_file") as search:
+        handle = FBD("gene_genetic_interactions").open()
+
+    assert handle.dataset == "gene_genetic_interactions"
+    search.assert_not_called()
+
+
+@pytest.mark.parametrize("kind", ["tsv", "fb", "json"])
+@pytest.mark.parametrize("gz", [False, True])
+def test_preview_from_http_prefix(tmp_path, serve, kind, gz):
+    serve("ds", kind, rows=20_000, gz=gz)
+    handle = FBD().open("ds")
+
+    with patch("FBD.client.downloader._rate_limiter.check", side_effect=AssertionError("slot used")):
+        head = handle.head(3)
+        columns = handle.columns
+        estimate = handle.estimate_rows()
+
+    assert not handle.cached
+    assert not list((tmp_path / "downloads").glob("*"))
+
+    full = handle.load()
+    pd.testing.assert_frame_equal(head, full.head(3))
+    assert columns == list(full.columns)
+    assert abs(estimate - len(full)) / len(full) < 0.2
+
+
+def test_head_grows_prefix_until_enough_rows(serve):
+    serve("ds", "tsv", rows=5000, gz=True)
+    handle = DatasetHandle("ds")
+
+    first = handle.head(2)
+    more = handle.head(1000)
+
+    assert len(more) == 1000
+    pd.testing.assert_frame_equal(more.head(2), first)
+
+
+def test_preview_uses_cached_file(serve):
+    serve("ds", "tsv", rows=500, gz=True)
+    full = DatasetHandle("ds").load()
+
+    handle = DatasetHandle("ds")
+    with patch.object(Downloader, "_read_http_prefix", side_effect=AssertionError("network used")), \
+            patch.object(Downloader, "search_file", side_effect=AssertionError("network used")):
+        assert handle.cached
+        pd.testing.assert_frame_equal(handle.head(10), full.head(10))
+        assert abs(handle.estimate_rows() - len(full)) <= 25
+
+        whole = DatasetHandle("ds")
+        whole.PREVIEW_BYTES = 1 << 20
+        assert whole.estimate_rows() == len(full)
+
+
+def test_preview_unsupported_parser_type(serve):
+    serve("onto", "obo", rows=2000, gz=False)
+
+    with pytest.raises(ValueError, match="No preview"):
+        DatasetHandle("onto").head()
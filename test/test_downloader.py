@@ -1,3 +1,4 @@
+import io
 import pytest
 from unittest.mock import patch, MagicMock
 from pathlib import Path
@@ -6,7 +7,7 @@ import json
 
 from FBD.client.downloader import Downloader
 from FBD.core.config import Config
-from FBD.core.rate_limiter import RateLimiter
+from FBD.core.rate_limiter import RateLimiter, RateLimitExceeded
 
 
 @pytest.fixture(autouse=True)
@@ -29,6 +30,14 @@ def make_mock_response(data: dict):
     return mock
 
 
+def make_file_response(payload: bytes):
+    mock = MagicMock()
+    mock.raw = io.BytesIO(payload)
+    mock.headers = {"Content-Length": str(len(payload))}
+    mock.raise_for_status.return_value = None
+    return mock
+
+
 def test_search_file_not_found():
     with patch("FBD.client.downloader.requests.get") as mock_get:
         mock_get.return_value = make_mock_response({
@@ -104,9 +113,7 @@ def test_download_file_success_tsv(tmp_path):
     }
     fake_df = MagicMock()
 
-    mock_file_response = MagicMock()
-    mock_file_response.iter_content.return_value = [b"col1\tcol2\n1\t2"]
-    mock_file_response.raise_for_status.return_value = None
+    mock_file_response = make_file_response(b"col1\tcol2\n1\t2")
 
     with patch("FBD.client.downloader.Downloader.search_file", return_value=fake_search_result), \
          patch("FBD.client.downloader.Config.DOWNLOAD_DIR", tmp_path), \
@@ -135,9 +142,7 @@ def test_download_file_success_fb(tmp_path):
     }
     fake_df = MagicMock()
 
-    mock_file_response = MagicMock()
-    mock_file_response.iter_content.return_value = [b"fake gz payload"]
-    mock_file_response.raise_for_status.return_value = None
+    mock_file_response = make_file_response(b"fake gz payload")
 
     with patch("FBD.client.downloader.Downloader.search_file", return_value=fake_search_result), \
          patch("FBD.client.downloader.Config.DOWNLOAD_DIR", tmp_path), \
@@ -185,9 +190,7 @@ def test_download_asset_success(tmp_path):
         "parse_config": {},
     }
 
-    mock_file_response = MagicMock()
-    mock_file_response.iter_content.return_value = [b"col1\tcol2\n1\t2"]
-    mock_file_response.raise_for_status.return_value = None
+    mock_file_response = make_file_response(b"col1\tcol2\n1\t2")
 
     with patch("FBD.client.downloader.Downloader.search_file", return_value=fake_search_result), \
          patch("FBD.client.downloader.Config.DOWNLOAD_DIR", tmp_path), \
@@ -249,7 +252,12 @@ def test_download_asset_offline_uses_cached_metadata_and_local_file(tmp_path):
 
         assert result["status"] == "ok"
         assert result["local_path"] == local_file
+        local_format = result["metadata"].pop("local_format")
         assert result["metadata"] == cached_metadata
+        assert local_format["compression"] is None
+
+        saved = json.loads((metadata_dir / "gene_association.metadata.json").read_text(encoding="utf-8"))
+        assert saved["local_format"] == local_format
 
 
 def test_download_asset_offline_without_metadata_cache_returns_error(tmp_path):
@@ -292,12 +300,25 @@ def test_download_asset_rate_limited_uses_cached_metadata_and_local_file(tmp_pat
 
         assert result["status"] == "ok"
         assert result["local_path"] == local_file
+        assert result["metadata"].pop("local_format")["compression"] is None
         assert result["metadata"] == cached_metadata
 
 
+GENE_ASSOCIATION_SEARCH_RESULT = {
+    "status": "ok",
+    "dataset": "gene_association",
+    "link": "http://example.com/gene_association.fb.gz",
+    "filename": "gene_association.fb.gz",
+    "header": None,
+    "parser_type": "fb",
+    "parse_config": {"start_line": 5, "columns": ["DB", "DB Object ID"]},
+}
+
+
 def test_download_asset_rate_limited_without_cache_returns_rate_limit_error(tmp_path):
     with patch("FBD.client.downloader.Config.DOWNLOAD_DIR", tmp_path), \
          patch("FBD.client.downloader.Config.CACHE_DIR", tmp_path), \
+         patch("FBD.client.downloader.Downloader.search_file", return_value=GENE_ASSOCIATION_SEARCH_RESULT), \
          patch("FBD.client.downloader._rate_limiter.check", side_effect=RuntimeError("Download limit reached")):
 
         result = Downloader.download_asset("gene_association")
@@ -316,3 +337,86 @@ def test_rate_limiter_blocks(isolated_cache):
 
     with pytest.raises(RuntimeError):
         limiter.check()
+
+
+def test_download_asset_rate_limited_reports_retry_after(tmp_path):
+    with patch("FBD.client.downloader.Config.DOWNLOAD_DIR", tmp_path), \
+         patch("FBD.client.downloader.Config.CACHE_DIR", tmp_path), \
+         patch("FBD.client.downloader.Downloader.search_file", return_value=GENE_ASSOCIATION_SEARCH_RESULT), \
+         patch("FBD.client.downloader._rate_limiter.check",
+               side_effect=RateLimitExceeded("Download limit reached", retry_after=42.0)) as mock_check:
+
+        result = Downloader.download_asset("gene_association", wait=True, priority=3)
+
+        assert result["status"] == "error"
+        assert result["retry_after"] == 42.0
+        mock_check.assert_called_once_with(wait=True, priority=3, deadline=None)
+
+
+def test_download_asset_cache_hit_skips_network_and_rate_limiter(tmp_path):
+    (tmp_path / "gene_association.fb").write_text("cached file", encoding="utf-8")
+    metadata_dir = tmp_path / "metadata"
+    metadata_dir.mkdir()
+    cached_metadata = {k: v for k, v in GENE_ASSOCIATION_SEARCH_RESULT.items() if k != "link"}
+    (metadata_dir / "gene_association.metadata.json").write_text(
+        json.dumps(cached_metadata),
+        encoding="utf-8",
+    )
+
+    with patch("FBD.client.downloader.Config.DOWNLOAD_DIR", tmp_path), \
+         patch("FBD.client.downloader.Config.CACHE_DIR", tmp_path), \
+         patch("FBD.client.downloader.requests.get") as mock_get, \
+         patch("FBD.client.downloader._rate_limiter.check") as mock_check:
+
+        result = Downloader.download_asset("gene_association")
+
+        assert result["status"] == "ok"
+        assert result["cache_hit"] is True
+        assert result["local_path"] == tmp_path / "gene_association.fb"
+        mock_get.assert_not_called()
+        mock_check.assert_not_called()
+
+
+def test_download_asset_charges_rate_limiter_only_for_transfers(tmp_path):
+    fake_search_result = {
+        "status": "ok",
+        "dataset": "valid_dataset",
+        "link": "http://example.com/file.tsv",
+        "filename": "file.tsv",
+        "header": 0,
+        "parser_type": "tsv",
+        "parse_config": {},
+    }
+
+    with patch("FBD.client.downloader.Downloader.search_file", return_value=fake_search_result), \
+         patch("FBD.client.downloader.Config.DOWNLOAD_DIR", tmp_path), \
+         patch("FBD.client.downloader.Config.CACHE_DIR", tmp_path), \
+         patch("FBD.client.downloader.requests.get",
+               side_effect=lambda *a, **k: make_file_response(b"col1\tcol2\n1\t2")) as mock_get, \
+         patch("FBD.client.downloader._rate_limiter.check") as mock_check:
+
+        first = Downloader.download_asset("valid_dataset")
+        second = Downloader.download_asset("valid_dataset")
+        refreshed = Downloader.download_asset("valid_dataset", refresh=True)
+
+        assert first["cache_hit"] is False
+        assert second["cache_hit"] is True
+        assert refreshed["cache_hit"] is False
+        assert mock_check.call_count == 2
+        assert mock_get.call_count == 2
+
+
+def test_rate_limit_status_reports_usage(isolated_cache):
+    Config.DOWNLOAD_RATE_LIMIT_ENABLED = True
+    limiter = RateLimiter("download")
+
+    with patch("FBD.client.downloader._rate_limiter", limiter):
+        before = Downloader.rate_limit_status()
+        limiter.check()
+        after = Downloader.rate_limit_status()
+
+    assert before["used"] == 0
+    assert before["remaining"] == Config.DOWNLOAD_MAX_CALLS
+    assert after["used"] == 1
+    assert after["remaining"] == Config.DOWNLOAD_MAX_CALLS - 1
+    assert 0 < after["reset_in"] <= Config.DOWNLOAD_WINDOW_SECONDS
@@ -0,0 +1,101 @@
+import gzip
+import io
+import logging
+from unittest.mock import patch, MagicMock
+
+import pytest
+
+from FBD.client.downloader import Downloader
+from FBD.core.config import Config
+from FBD.core.events import Events
+
+
+@pytest.fixture
+def events():
+    received = []
+    with Events.subscribed(received.append):
+        yield received
+
+
+def test_emit_without_subscribers_is_a_no_op():
+    assert Events.emit("nothing.listens") is None
+
+
+def test_span_records_duration_fields_and_errors(events):
+    with Events.span("stage", dataset="d") as event:
+        event["bytes"] = 10
+        event["rows"] = 2
+
+    with pytest.raises(KeyError):
+        with Events.span("failing"):
+            raise KeyError("x")
+
+    ok, failed = events
+    assert ok.name == "stage" and ok.dataset == "d" and ok.bytes == 10
+    assert ok.fields == {"rows": 2}
+    assert ok.duration >= 0
+    assert failed.to_dict()["error"] == "KeyError"
+
+
+def test_failing_subscriber_does_not_break_emit(events):
+    def broken(event):
+        raise RuntimeError("boom")
+
+    with Events.subscribed(broken):
+        Events.emit("stage")
+
+    assert [e.name for e in events] == ["stage"]
+
+
+def test_events_are_logged_at_debug_following_config_log_level(caplog, monkeypatch):
+    monkeypatch.setattr(Config, "LOG_LEVEL", "INFO")
+    with caplog.at_level(logging.DEBUG):
+        Events.emit("hidden")
+    assert caplog.records == []
+
+    monkeypatch.setattr(Config, "LOG_LEVEL", "DEBUG")
+    with caplog.at_level(logging.DEBUG):
+        Events.emit("shown", bytes=5)
+    record, = caplog.records
+    assert record.fbd_event["name"] == "shown"
+    assert record.fbd_event["bytes"] == 5
+    assert logging.getLogger("FBD").level == logging.NOTSET
+
+
+def test_download_file_emits_stage_events(tmp_path, events):
+    payload = b"##meta\n#col1\tcol2\n1\t2\n3\t4\n"
+    metadata = {
+        "status": "ok",
+        "dataset": "ds",
+        "link": "http://example.com/file.tsv.gz",
+        "filename": "file.tsv.gz",
+        "header": 2,
+        "parser_type": "tsv",
+        "parse_config": {},
+    }
+    response = MagicMock()
+    response.raw = io.BytesIO(gzip.compress(payload))
+
+    with patch("FBD.client.downloader.Downloader.search_file", return_value=metadata), \
+         patch("FBD.client.downloader.Config.DOWNLOAD_DIR", tmp_path), \
+         patch("FBD.client.downloader.Config.CACHE_DIR", tmp_path), \
+         patch("FBD.client.downloader.requests.get", return_value=response), \
+         patch("FBD.client.downloader._rate_limiter.check"):
+        first = Downloader.download_file("ds")
+        second = Downloader.download_file("ds")
+
+    assert first["status"] == second["status"] == "ok"
+    by_name = {}
+    for event in events:
+        by_name.setdefault(event.name, []).append(event)
+
+    assert [e.cache_hit for e in by_name["metadata.cache"]] == [False, True]
+    assert [e.cache_hit for e in by_name["download.file"]] == [False, True]
+    transfer, = by_name["download.transfer"]
+    assert transfer.bytes == len(gzip.compress(payload))
+    decompress, = by_name["decompress"]
+    assert decompress.bytes == len(payload)
+    assert len(by_name["rate_limit.check"]) == 1
+    assert [e.fields["rows"] for e in by_name["parse.dispatch"]] == [2, 2]
+    assert by_name["parse.dispatch"][0].fields["parser_type"] == "tsv"
+    assert "parse.read" in by_name and "parse.clean" in by_name
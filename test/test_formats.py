@@ -0,0 +1,86 @@
+import gzip
+import random
+import struct
+import zlib
+from unittest.mock import patch
+
+import pytest
+
+from FBD.client.formats import FileFormat
+from FBD.client.parse import Parse
+
+
+def _bgzip_block(data: bytes) -> bytes:
+    """One BGZF block: a gzip member with a "BC" extra subfield."""
+    deflate = zlib.compressobj(6, zlib.DEFLATED, -15)
+    payload = deflate.compress(data) + deflate.flush()
+    extra = b"BC" + struct.pack("<HH", 2, 25 + len(payload))
+    header = b"\x1f\x8b\x08\x04" + b"\x00" * 4 + b"\x00\xff" + struct.pack("<H", len(extra)) + extra
+    return header + payload + struct.pack("<II", zlib.crc32(data), len(data))
+
+
+@pytest.fixture(autouse=True)
+def clear_known():
+    FileFormat._known.clear()
+    yield
+    FileFormat._known.clear()
+
+
+def test_sniff_codecs(tmp_path):
+    plain = tmp_path / "plain.tsv"
+    plain.write_bytes(b"a\tb\n")
+    gz = tmp_path / "file.gz"
+    gz.write_bytes(gzip.compress(b"a\tb\n"))
+    bgz = tmp_path / "file.bgz"
+    bgz.write_bytes(_bgzip_block(b"a\tb\n") + _bgzip_block(b""))
+    zst = tmp_path / "file.zst"
+    zst.write_bytes(b"\x28\xb5\x2f\xfd" + b"\x00" * 8)
+
+    assert FileFormat.sniff(plain) is None
+    assert FileFormat.sniff(gz) == "gzip"
+    assert FileFormat.sniff(bgz) == "bgzip"
+    assert FileFormat.sniff(zst) == "zstd"
+
+    with FileFormat.open(bgz, "rt") as f:
+        assert f.read() == "a\tb\n"
+
+
+def test_compression_is_sniffed_once_until_file_changes(tmp_path):
+    path = tmp_path / "file.tsv"
+    path.write_bytes(gzip.compress(b"a\tb\n"))
+
+    with patch.object(FileFormat, "sniff", wraps=FileFormat.sniff) as sniff:
+        assert FileFormat.compression(path) == "gzip"
+        assert Parse.is_gzip(path)
+        with FileFormat.open(path, "rt") as f:
+            assert f.read() == "a\tb\n"
+        assert sniff.call_count == 1
+
+        path.write_bytes(b"plain text file\n")
+        assert FileFormat.compression(path) is None
+        assert sniff.call_count == 2
+
+
+def test_describe_stores_codec_in_metadata(tmp_path):
+    path = tmp_path / "file.tsv"
+    path.write_bytes(gzip.compress(b"a\tb\n"))
+    metadata = {"parser_type": "tsv"}
+
+    assert FileFormat.describe(path, metadata)
+    assert not FileFormat.describe(path, metadata)
+    assert metadata["local_format"]["compression"] == "gzip"
+
+    FileFormat._known.clear()
+    with patch.object(FileFormat, "sniff") as sniff:
+        assert FileFormat.compression(path, metadata) == "gzip"
+        sniff.assert_not_called()
+
+
+def test_detect_header_line_reads_only_a_prefix(tmp_path):
+    path = tmp_path / "file.tsv.gz"
+    body = "".join(f"{i}\t{random.getrandbits(64):016x}\n" for i in range(200_000))
+    data = gzip.compress(("## comment\n#a\tb\n" + body).encode())
+    # A truncated stream fails only if it is decompressed to the end.
+    path.write_bytes(data[: len(data) // 2])
+
+    assert Parse.detect_header_line(path) == 1
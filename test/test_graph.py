@@ -0,0 +1,112 @@
+from unittest.mock import patch
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from FBD.client.graph import InteractionGraph
+from FBD.fbd import FBD
+
+
+@pytest.fixture
+def interactions():
+    return pd.DataFrame({
+        "Starting_gene(s)_symbol": ["a|b", "c", "a", None],
+        "Starting_gene(s)_FBgn": ["FBgn1|FBgn2", "FBgn3", "FBgn1", None],
+        "Ending_gene(s)_symbol": ["c", "a|d", "c", "x"],
+        "Ending_gene(s)_FBgn": ["FBgn3", "FBgn1|FBgn4", "FBgn3", "FBgn9"],
+        "Interaction_type": ["suppressible", "enhanceable", "suppressible", "lethal"],
+        "score": ["1", "2", "3", "4"],
+    })
+
+
+def build(df, **kwargs):
+    source, target, labels = InteractionGraph.default_columns(df.columns)
+    return InteractionGraph.from_frame(df, source, target, labels=labels, **kwargs)
+
+
+def test_from_frame_interns_nodes_and_splits_lists(interactions):
+    graph = build(interactions, attributes=["Interaction_type", "score"])
+
+    assert graph.nodes.tolist() == ["FBgn1", "FBgn2", "FBgn3", "FBgn4"]
+    assert graph.labels.tolist() == ["a", "b", "c", "d"]
+    assert graph.sources.dtype == np.int32
+    assert list(zip(graph.sources, graph.targets)) == [(0, 2), (1, 2), (2, 0), (2, 3), (0, 2)]
+    assert graph.rows.tolist() == [0, 0, 1, 1, 2]
+
+    assert graph.edge_attributes["score"].dtype == np.int64
+    assert graph.edge_attributes["score"].tolist() == [1, 1, 2, 2, 3]
+    types = graph.edge_attributes["Interaction_type"]
+    assert graph.categories["Interaction_type"][types].tolist() == [
+        "suppressible", "suppressible", "enhanceable", "enhanceable", "suppressible",
+    ]
+    assert graph.codes(["FBgn3", "FBgn0"]).tolist() == [2, -1]
+
+
+def test_to_csr_sums_parallel_edges(interactions):
+    graph = build(interactions, attributes=["score"])
+
+    indptr, indices, data = graph.to_csr()
+    sym_indptr, sym_indices, sym_data = graph.to_csr(weight="score", symmetric=True)
+
+    dense = np.zeros((4, 4))
+    for row in range(4):
+        dense[row, indices[indptr[row]:indptr[row + 1]]] = data[indptr[row]:indptr[row + 1]]
+    assert dense.tolist() == [[0, 0, 2, 0], [0, 0, 1, 0], [1, 0, 0, 1], [0, 0, 0, 0]]
+
+    assert sym_indptr.tolist() == [0, 1, 2, 5, 6]
+    assert sym_indices.tolist() == [2, 2, 0, 1, 3, 2]
+    assert sym_data.tolist() == [6, 1, 6, 1, 2, 2]
+    assert data.dtype == sym_data.dtype == np.float64
+    assert graph.to_csr(dtype=np.float32)[2].dtype == np.float32
+
+
+def test_to_scipy_requires_scipy(interactions):
+    graph = build(interactions)
+    with patch("FBD.client.graph.optional_import", return_value=None):
+        with pytest.raises(ImportError, match="scipy"):
+            graph.to_scipy()
+
+
+def test_to_scipy_returns_csr_matrix(interactions):
+    sparse = pytest.importorskip("scipy.sparse")
+    matrix = build(interactions).to_scipy()
+
+    assert isinstance(matrix, sparse.csr_matrix)
+    assert matrix.shape == (4, 4)
+    assert matrix[0, 2] == 2
+
+
+def test_undirected_edge_index(interactions):
+    index = build(interactions, directed=False).edge_index()
+
+    assert index.shape == (2, 10)
+    assert index.dtype == np.int64
+    assert index[:, 5:].tolist() == index[::-1, :5].tolist()
+
+
+def test_from_frame_rejects_bad_input(interactions):
+    with pytest.raises(ValueError, match="Unknown columns"):
+        InteractionGraph.from_frame(interactions, "missing", "Ending_gene(s)_FBgn")
+
+    interactions.loc[0, "Starting_gene(s)_symbol"] = "a"
+    with pytest.raises(ValueError, match="as many items"):
+        build(interactions)
+
+    graph = InteractionGraph.from_frame(
+        interactions, "Starting_gene(s)_FBgn", "Ending_gene(s)_FBgn", attributes=["Interaction_type"]
+    )
+    with pytest.raises(ValueError, match="categorical"):
+        graph.to_csr(weight="Interaction_type")
+
+
+def test_get_interaction_graph_from_dataset(serve):
+    serve("ggi", "tsv", rows=500, gz=True)
+
+    fbd = FBD("ggi")
+    graph = fbd.get_interaction_graph(attributes=["Interaction_type"])
+    df = fbd.download_file()
+
+    assert graph.n_edges == len(df)
+    assert graph.nodes[graph.sources].tolist() == df["Starting_gene(s)_FBgn"].tolist()
+    assert graph.labels[graph.targets].tolist() == df["Ending_gene(s)_symbol"].tolist()
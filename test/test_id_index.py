@@ -0,0 +1,113 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from FBD.client.id_index import IdentifierIndex, IdentifierStore, decode_ids, encode_ids
+from FBD.core.config import Config
+from FBD.core.events import Events
+from FBD.fbd import FBD
+
+
+@pytest.fixture(autouse=True)
+def index_identifiers(monkeypatch):
+    monkeypatch.setattr(Config, "INDEX_IDENTIFIERS", True)
+
+
+def frame():
+    return pd.DataFrame({
+        "genes": ["FBgn0000490|FBgn0000001", "FBgn0000002", None, "FBgn0000490"],
+        "refs": ["FBrf0000001", "see FBal0000003", "FBgn0000002", "none"],
+        "score": [1, 2, 3, 4],
+    })
+
+
+def test_encode_and_decode_ids():
+    ids = ["FBgn0000490", "FBtr0012345", "FBsf0000000001", "FBsf0000001", "FBgn12345678"]
+    keys = encode_ids(ids + ["wg", None, "FBgn00004901234", "FBgn000049"])
+
+    assert keys[5:].tolist() == [-1, -1, -1, -1]
+    assert len(set(keys[:5].tolist())) == 5
+    assert decode_ids(keys[:5]) == ids
+
+
+def test_builder_indexes_ten_digit_identifiers():
+    builder = IdentifierIndex.builder("d")
+    builder.update(pd.DataFrame({"ids": ["FBsf0000000001 FBgn0000001", "FBsf0000001", "FBsf00000000012"]}))
+    index = builder.build()
+
+    assert decode_ids(index.keys) == ["FBgn0000001", "FBsf0000001", "FBsf0000000001"]
+    assert index.rows_for(encode_ids(["FBsf0000000001"])).tolist() == [0]
+
+
+def test_builder_indexes_every_mention_by_row_position(tmp_path):
+    builder = IdentifierIndex.builder("d")
+    builder.update(frame().iloc[:2])
+    builder.update(frame().iloc[2:])
+    index = builder.build()
+
+    assert decode_ids(index.keys) == ["FBal0000003", "FBgn0000001", "FBgn0000002", "FBgn0000490", "FBrf0000001"]
+    assert index.rows_for(encode_ids(["FBgn0000490"])).tolist() == [0, 3]
+    assert index.rows_for(encode_ids(["FBgn0000002", "FBal0000003"])).tolist() == [1, 2]
+    assert index.rows_for(encode_ids(["FBgn0009999"])).tolist() == []
+
+    loaded = IdentifierIndex.load(index.save(tmp_path / "d.ids.npz"))
+    assert loaded._keys is None
+    assert loaded.meta["rows"] == 4
+    assert loaded.rows_for(encode_ids(["FBgn0000490"])).tolist() == [0, 3]
+
+
+def test_bloom_filter_has_no_false_negatives_and_few_false_positives():
+    keys = np.arange(0, 20_000, 2, dtype=np.int64) + 10_000_000
+    index = IdentifierIndex("d", keys, np.arange(len(keys) + 1), np.zeros(len(keys)))
+
+    assert index.might_contain(keys).all()
+    assert index.might_contain(keys + 1).mean() < 0.03
+
+
+def test_download_indexes_dataset_and_lookup_fetches_rows(serve):
+    serve("ggi", "tsv", rows=500, gz=True)
+    events = []
+    with Events.subscribed(events.append):
+        chunks = FBD().download_file("ggi", chunksize=120)
+        df = pd.concat(list(chunks))
+        assert IdentifierStore.datasets() == ["ggi"]
+
+        wanted = df["Ending_gene(s)_FBgn"].iloc[[10, 400]].tolist()
+        hits = FBD.lookup_id(wanted + ["FBgn0000000"], fetch=False)
+        rows = FBD.lookup_id(wanted)["ggi"]
+
+    expected = df[df.isin(wanted).any(axis=1)]
+    assert hits["ggi"].tolist() == expected.index.tolist()
+    pd.testing.assert_frame_equal(rows, expected)
+    assert [e.name for e in events].count("index.identifiers") == 1
+
+    lookup = [e for e in events if e.name == "index.lookup"][0]
+    assert lookup.fields == {"ids": 3, "searched": 1, "skipped": 0, "matched": 1}
+    assert FBD.lookup_id("FBgn0000000", fetch=False) == {}
+
+
+def test_stale_index_is_ignored_and_projection_is_not_indexed(serve):
+    serve("ggi", "tsv", rows=50)
+
+    df = FBD().download_file("ggi", columns=["Starting_gene(s)_FBgn"])
+    assert IdentifierStore.load("ggi") is None
+
+    FBD().download_file("ggi")
+    index = IdentifierStore.load("ggi")
+    assert index is not None
+
+    with open(index.meta["local_path"], "a") as f:
+        f.write("\n")
+    assert IdentifierStore.load("ggi") is None
+    assert FBD.lookup_id(df.iloc[0, 0], fetch=False) == {}
+    assert FBD.lookup_id(df.iloc[0, 0], datasets="ggi", fetch=False)["ggi"].tolist() == [0]
+
+
+def test_without_indexing_lookup_with_datasets_builds_the_index(serve, monkeypatch):
+    monkeypatch.setattr(Config, "INDEX_IDENTIFIERS", False)
+    serve("ggi", "tsv", rows=50)
+
+    df = FBD().download_file("ggi")
+    assert IdentifierStore.datasets() == []
+    assert FBD.lookup_id(df.iloc[3, 1], fetch=False) == {}
+    assert 3 in FBD.lookup_id(df.iloc[3, 1], datasets="ggi", fetch=False)["ggi"]
@@ -0,0 +1,55 @@
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+
+HEAVY_MODULES = ("pandas", "numpy", "obonet", "networkx", "requests", "platformdirs")
+
+
+def importtime(code: str) -> tuple[dict, set]:
+    """
+    Run `code` under `python -X importtime` and return ({module: cumulative_us},
+    names in sys.modules afterwards). importlib.import_module does not show up
+    in -X importtime, so the sys.modules snapshot is what guards lazy imports.
+    """
+    probe = f"{code}\nimport sys\nprint('\\n'.join(sys.modules))"
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", probe],
+        cwd=REPO_ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+    timings = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line.split("|")
+        cumulative = cumulative.strip()
+        if cumulative.isdigit():
+            timings[name.strip()] = int(cumulative)
+    return timings, set(proc.stdout.split())
+
+
+@pytest.mark.parametrize("code", [
+    "import FBD",
+    "from FBD.fbd import FBD; FBD('gene_genetic_interactions')",
+    "from FBD.client.downloader import Downloader",
+    "from FBD.client.parser_dispatcher import ParserDispatcher",
+])
+def test_import_does_not_load_heavy_dependencies(code):
+    timings, modules = importtime(code)
+
+    assert "FBD" in timings
+    loaded = sorted(m for m in HEAVY_MODULES if m in modules)
+    assert loaded == [], f"`{code}` eagerly imported {loaded}"
+
+
+def test_heavy_dependencies_load_on_first_use():
+    _, modules = importtime("from FBD.client.parse import pd; pd.DataFrame")
+
+    assert "pandas" in modules
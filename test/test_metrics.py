@@ -0,0 +1,117 @@
+import gzip
+import io
+import json
+from unittest.mock import patch, MagicMock
+
+import pytest
+
+from FBD.client.data_manager import DataManager
+from FBD.client.downloader import Downloader
+from FBD.core.events import Events
+from FBD.core.metrics import Metrics
+from FBD.core.rate_limiter import RateLimitExceeded
+
+
+@pytest.fixture
+def metrics():
+    Metrics.reset()
+    Metrics.enable(labels={"worker": "w1"})
+    yield Metrics
+    Metrics.disable()
+    Metrics.reset()
+
+
+def counter(snapshot, name, **labels):
+    for series in snapshot["counters"].get(name, []):
+        if all(series["labels"].get(k) == v for k, v in labels.items()):
+            return series["value"]
+    return 0
+
+
+def test_disabled_metrics_do_not_subscribe():
+    Metrics.disable()
+    assert Metrics._on_event not in Events._subscribers
+    Events.emit("download.transfer", bytes=10)
+    assert Metrics.snapshot()["counters"] == {}
+
+
+def test_download_pipeline_metrics(tmp_path, metrics):
+    payload = b"##meta\n#col1\tcol2\n1\t2\n"
+    metadata = {
+        "status": "ok",
+        "dataset": "ds",
+        "link": "http://example.com/file.tsv.gz",
+        "filename": "file.tsv.gz",
+        "header": 2,
+        "parser_type": "tsv",
+        "parse_config": {},
+    }
+    search = MagicMock(status_code=200)
+    search.json.return_value = metadata
+    transfer = MagicMock(status_code=200)
+    transfer.raw = io.BytesIO(gzip.compress(payload))
+
+    def get(url, **kwargs):
+        return search if url.endswith("/search") else transfer
+
+    with patch("FBD.client.downloader.Config.DOWNLOAD_DIR", tmp_path), \
+         patch("FBD.client.downloader.Config.CACHE_DIR", tmp_path), \
+         patch("FBD.client.downloader.requests.get", side_effect=get), \
+         patch("FBD.client.downloader._rate_limiter.check"):
+        Downloader.download_file("ds")
+        Downloader.download_file("ds")
+
+    snap = metrics.snapshot()
+    assert counter(snap, "fbd_http_requests_total", endpoint="search") == 1
+    assert counter(snap, "fbd_http_requests_total", endpoint="file") == 1
+    assert counter(snap, "fbd_cache_requests_total", cache="metadata", result="miss") == 1
+    assert counter(snap, "fbd_cache_requests_total", cache="metadata", result="hit") == 1
+    assert counter(snap, "fbd_cache_requests_total", cache="file", result="hit") == 1
+    assert counter(snap, "fbd_downloaded_bytes_total") == len(gzip.compress(payload))
+    assert counter(snap, "fbd_decompressed_bytes_total") == len(payload)
+
+    hist, = snap["histograms"]["fbd_parse_duration_seconds"]
+    assert hist["labels"] == {"worker": "w1", "parser_type": "tsv"}
+    assert hist["count"] == 2 and sum(hist["counts"]) == 2
+
+
+def test_rate_limit_rejections_and_data_manager_endpoints(tmp_path, metrics):
+    metadata = {
+        "status": "ok", "dataset": "ds", "link": "http://example.com/f.tsv",
+        "filename": "f.tsv", "header": 1, "parser_type": "tsv", "parse_config": {},
+    }
+    response = MagicMock(status_code=200)
+    response.json.return_value = {"header": 3}
+
+    with patch("FBD.client.downloader.Downloader.search_file", return_value=metadata), \
+         patch("FBD.client.downloader.Config.DOWNLOAD_DIR", tmp_path), \
+         patch("FBD.client.downloader.Config.CACHE_DIR", tmp_path), \
+         patch("FBD.client.downloader._rate_limiter.check", side_effect=RateLimitExceeded("full", 5)), \
+         patch("FBD.client.data_manager.requests.get", return_value=response):
+        result = Downloader.download_asset("ds")
+        DataManager._get("datasets/ds/header")
+        DataManager._get("datasets/other/header")
+
+    assert result["status"] == "error"
+    snap = metrics.snapshot()
+    assert counter(snap, "fbd_rate_limit_rejections_total") == 1
+    assert counter(snap, "fbd_http_requests_total", endpoint="datasets/*/header") == 2
+
+
+def test_prometheus_and_json_export(tmp_path, metrics):
+    Metrics.inc("fbd_downloaded_bytes_total", 123456789)
+    Metrics.observe("fbd_parse_duration_seconds", 0.3, parser_type="obo")
+
+    text = Metrics.to_prometheus()
+    assert "# TYPE fbd_downloaded_bytes_total counter" in text
+    assert 'fbd_downloaded_bytes_total{worker="w1"} 123456789' in text
+    assert 'fbd_parse_duration_seconds_bucket{worker="w1",parser_type="obo",le="0.25"} 0' in text
+    assert 'fbd_parse_duration_seconds_bucket{worker="w1",parser_type="obo",le="0.5"} 1' in text
+    assert 'fbd_parse_duration_seconds_bucket{worker="w1",parser_type="obo",le="+Inf"} 1' in text
+    assert 'fbd_parse_duration_seconds_count{worker="w1",parser_type="obo"} 1' in text
+
+    prom = Metrics.write_textfile(tmp_path / "fbd.prom")
+    assert prom.read_text(encoding="utf-8") == text
+    data = json.loads(Metrics.write_json(tmp_path / "fbd.json").read_text(encoding="utf-8"))
+    assert counter(data, "fbd_downloaded_bytes_total") == 123456789
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["fbd.json", "fbd.prom"]
@@ -0,0 +1,120 @@
+import networkx as nx
+import pytest
+
+from FBD.client.ontology import OntologyIndex
+from FBD.client.parse import Parse
+from FBD.core.config import Config
+
+
+OBO = """format-version: 1.2
+ontology: test
+
+[Term]
+id: T:1
+name: root
+
+[Term]
+id: T:2
+name: middle
+is_a: T:1
+
+[Term]
+id: T:3
+name: other
+is_a: T:1
+
+[Term]
+id: T:4
+name: leaf
+is_a: T:2
+is_a: T:3
+relationship: part_of T:5
+
+[Term]
+id: T:5
+name: whole
+
+[Typedef]
+id: part_of
+name: part of
+"""
+
+
+@pytest.fixture
+def obo_path(tmp_path, monkeypatch):
+    monkeypatch.setattr(Config, "CACHE_DIR", tmp_path / "cache")
+    path = tmp_path / "test.obo"
+    path.write_text(OBO, encoding="utf-8")
+    return path
+
+
+def test_index_matches_networkx_closure(obo_path):
+    graph = Parse.obo_to_graph(obo_path)
+    index = OntologyIndex.from_graph(graph)
+    is_a = nx.DiGraph((c, p) for c, p, k in graph.edges(keys=True) if k == "is_a")
+    is_a.add_nodes_from(graph)
+
+    for term in graph:
+        # obonet edges point child -> parent, so networkx "descendants" are ancestors
+        assert set(index.ancestors(term)) == nx.descendants(is_a, term)
+        assert set(index.descendants(term)) == nx.ancestors(is_a, term)
+
+
+def test_queries(obo_path):
+    index = OntologyIndex.from_obo(obo_path)
+
+    assert len(index) == 5
+    assert index.name("T:4") == "leaf"
+    assert sorted(index.parents("T:4")) == ["T:2", "T:3"]
+    assert index.parents("T:4", relation="part_of") == ["T:5"]
+    assert index.children("T:5", relation="part_of") == ["T:4"]
+    assert index.is_a("T:4", "T:1")
+    assert index.is_a("T:1", "T:1")
+    assert not index.is_a("T:1", "T:4")
+    assert not index.is_a("T:4", "T:5")
+    assert not index.is_a("T:missing", "T:1")
+    assert index.is_a(["T:4", "T:5", "T:missing", "T:1"], "T:1").tolist() == [True, False, False, True]
+
+
+def test_closure_relations_include_part_of(obo_path):
+    index = OntologyIndex.from_obo(obo_path, closure_relations=("is_a", "part_of"))
+
+    assert set(index.ancestors("T:4")) == {"T:1", "T:2", "T:3", "T:5"}
+    assert index.is_a("T:4", "T:5")
+
+
+def test_cycles_do_not_hang():
+    index = OntologyIndex.from_edges(
+        [("a", None), ("b", None), ("c", None)],
+        [("a", "is_a", "b"), ("b", "is_a", "a"), ("c", "is_a", "a")],
+    )
+
+    assert index.ancestors("a") == ["b"]
+    assert sorted(index.ancestors("c")) == ["a", "b"]
+    assert sorted(index.descendants("a")) == ["b", "c"]
+
+
+def test_from_obo_uses_parsed_cache(obo_path, monkeypatch):
+    first = OntologyIndex.from_obo(obo_path)
+    cache_path = OntologyIndex.cache_path(obo_path)
+    assert cache_path.exists()
+
+    def fail(*args, **kwargs):
+        raise AssertionError("obo file was parsed again")
+
+    monkeypatch.setattr(Parse, "obo_to_graph", staticmethod(fail))
+    cached = OntologyIndex.from_obo(obo_path)
+
+    assert cached.ids == first.ids
+    assert cached.names == first.names
+    assert cached.ancestors("T:4") == first.ancestors("T:4")
+    assert cached.parents("T:4", relation="part_of") == ["T:5"]
+
+
+def test_cache_invalidated_when_source_changes(obo_path):
+    OntologyIndex.from_obo(obo_path)
+    obo_path.write_text(OBO.replace("id: T:5\nname: whole", "id: T:5\nname: whole\nis_a: T:1"), encoding="utf-8")
+
+    index = OntologyIndex.from_obo(obo_path)
+
+    assert index.ancestors("T:5") == ["T:1"]
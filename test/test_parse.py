@@ -1,3 +1,4 @@
+import gzip
 import json
 from pathlib import Path
 
@@ -86,3 +87,246 @@ def test_parse_unknown_parser_raises(tmp_path):
 
     with pytest.raises(ValueError):
         Parse.parse(path, parser_type="unknown")
+
+
+def _write_flybase_tsv(path, rows=10):
+    lines = ["## FlyBase test file", "##FBgn_ID\tsymbol\tvalue"]
+    lines += [f"FBgn{i:07d}\tsym{i}\t{i}" for i in range(rows)]
+    lines.append("## Finished processing")
+    path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+
+
+def test_parse_tsv_chunks_match_full_parse(tmp_path):
+    path = tmp_path / "sample.tsv"
+    _write_flybase_tsv(path, rows=10)
+
+    full = Parse.parse(path, parser_type="tsv", header=2)
+    chunks = list(Parse.parse(path, parser_type="tsv", header=2, chunksize=4))
+
+    assert [len(c) for c in chunks] == [4, 4, 2]
+    pd.testing.assert_frame_equal(pd.concat(chunks), full)
+
+
+def test_parse_tsv_projection(tmp_path):
+    path = tmp_path / "sample.tsv"
+    _write_flybase_tsv(path, rows=3)
+
+    data = Parse.parse(path, parser_type="tsv", header=2, usecols=["value", "FBgn_ID"])
+
+    assert list(data.columns) == ["value", "FBgn_ID"]
+    assert data["FBgn_ID"].to_list() == ["FBgn0000000", "FBgn0000001", "FBgn0000002"]
+
+
+def test_parse_tsv_projection_unknown_column_raises(tmp_path):
+    path = tmp_path / "sample.tsv"
+    _write_flybase_tsv(path, rows=3)
+
+    with pytest.raises(ValueError, match="missing_col"):
+        Parse.parse(path, parser_type="tsv", header=2, usecols=["missing_col"])
+
+
+def test_parse_fb_chunks_and_projection(tmp_path):
+    path = tmp_path / "sample.fb"
+    lines = ["!header"] + [f"FB\tFBgn{i:07d}\tsym{i}" for i in range(5)]
+    path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+    config = {"start_line": 1, "columns": ["DB", "DB Object ID", "DB Object Symbol"]}
+
+    full = Parse.parse(path, parser_type="fb", config=config)
+    chunks = list(Parse.parse(path, parser_type="fb", config=config, chunksize=2))
+    projected = Parse.parse(path, parser_type="fb", config=config, usecols=["DB Object Symbol"])
+
+    assert [len(c) for c in chunks] == [2, 2, 1]
+    pd.testing.assert_frame_equal(pd.concat(chunks), full)
+    assert list(projected.columns) == ["DB Object Symbol"]
+    assert projected["DB Object Symbol"].to_list() == [f"sym{i}" for i in range(5)]
+
+
+def test_parse_fb_projection_drops_footer(tmp_path):
+    path = tmp_path / "rv.fb"
+    path.write_text("## header\n#a\tb\tc\nx\t1\t2\ny\t3\t4\n## Finished generating report\n", encoding="utf-8")
+
+    full = Parse.fb_to_df(path, 2, ["a", "b", "c"])
+    projected = Parse.fb_to_df(path, 2, ["a", "b", "c"], usecols=["b", "c"])
+    chunks = list(Parse.fb_to_df(path, 2, ["a", "b", "c"], usecols=["c"], chunksize=1))
+
+    assert full["a"].to_list() == ["x", "y"]
+    pd.testing.assert_frame_equal(projected, full[["b", "c"]])
+    assert [c["c"].to_list() for c in chunks] == [["2"], ["4"]]
+
+
+def test_parse_txt_chunks(tmp_path):
+    path = tmp_path / "sample.txt"
+    path.write_text("a,b\n1,x\n2,y\n3,z\n", encoding="utf-8")
+
+    chunks = list(Parse.parse(path, parser_type="txt", config={"sep": ","}, chunksize=2, usecols=["b"]))
+
+    assert [c["b"].to_list() for c in chunks] == [["x", "y"], ["z"]]
+
+
+def test_parse_txt_gzip(tmp_path):
+    path = tmp_path / "sample.txt"
+    with gzip.open(path, "wt", encoding="utf-8") as fh:
+        fh.write("a,b\n1,x\n2,y\n")
+
+    data = Parse.parse(path, parser_type="txt", config={"sep": ","}, usecols=["b"])
+
+    assert data["b"].to_list() == ["x", "y"]
+
+
+OBO = """format-version: 1.2
+ontology: fbbt
+subsetdef: cur "curated"
+
+[Term]
+id: FBbt:1
+name: organism
+def: "A whole {living} thing." [FBC:1]
+
+[Term]
+id: FBbt:2
+name: head
+is_a: FBbt:1 ! organism
+relationship: part_of FBbt:1 {source="FBC"} ! organism
+xref: X:1 {source="y"}
+
+[Term]
+id: FBbt:3
+name: old head
+is_obsolete: true
+
+[Typedef]
+id: part_of
+name: part of
+is_transitive: true
+
+[Instance]
+id: I:1
+instance_of: FBbt:1
+"""
+
+
+def test_iter_obo_filters(tmp_path):
+    path = tmp_path / "sample.obo.gz"
+    with gzip.open(path, "wt", encoding="utf-8") as f:
+        f.write(OBO)
+
+    stanzas = list(Parse.iter_obo(path))
+    names = list(Parse.iter_obo(path, stanza_types=["Term"], tags=["name"], ignore_obsolete=True))
+    part_of = list(Parse.iter_obo(path, stanza_types=["Term"], relationships=["part_of"]))
+
+    assert [t for t, _ in stanzas] == ["header", "Term", "Term", "Term", "Typedef", "Instance"]
+    assert stanzas[0][1]["subsetdef"] == ['cur "curated"']
+    assert stanzas[1][1]["def"] == '"A whole {living} thing." [FBC:1]'
+    assert stanzas[2][1]["xref"] == ["X:1"]
+    assert names == [("Term", {"id": "FBbt:1", "name": "organism"}), ("Term", {"id": "FBbt:2", "name": "head"})]
+    assert "is_a" not in part_of[1][1]
+    assert part_of[1][1]["relationship"] == ["part_of FBbt:1"]
+
+
+def test_obo_to_graph_matches_obonet(tmp_path):
+    obonet = pytest.importorskip("obonet")
+    path = tmp_path / "sample.obo"
+    path.write_text(OBO, encoding="utf-8")
+
+    expected = obonet.read_obo(path)
+    graph = Parse.obo_to_graph(path)
+
+    assert graph.graph == expected.graph
+    assert dict(graph.nodes(data=True)) == dict(expected.nodes(data=True))
+    assert list(graph.edges(keys=True)) == list(expected.edges(keys=True))
+
+
+def test_obo_to_graph_relationship_filter(tmp_path):
+    path = tmp_path / "sample.obo"
+    path.write_text(OBO, encoding="utf-8")
+
+    graph = Parse.obo_to_graph(path, relationships=["is_a"])
+
+    assert list(graph.edges(keys=True)) == [("FBbt:2", "FBbt:1", "is_a")]
+
+
+def test_parse_json_chunks_and_projection(tmp_path, monkeypatch):
+    records = [{"id": f"FBgn{i:07d}", "score": i * 1.5, "nested": {"n": [i, "]}"]}} for i in range(7)]
+    path = tmp_path / "sample.json.gz"
+    with gzip.open(path, "wt", encoding="utf-8") as f:
+        json.dump({"metaData": {"note": "[{"}, "data": records}, f, indent=1)
+    # Tiny reads so records and numbers straddle buffer refills.
+    monkeypatch.setattr("FBD.client.parse._JSON_BLOCK_SIZE", 3)
+    monkeypatch.setattr("FBD.client.parse.optional_import", lambda name: None)
+
+    full = Parse.parse(path, parser_type="json")
+    chunks = list(Parse.parse(path, parser_type="json", chunksize=3))
+    projected = Parse.parse(path, parser_type="json", usecols=["score", "id"])
+
+    assert [len(c) for c in chunks] == [3, 3, 1]
+    pd.testing.assert_frame_equal(pd.concat(chunks), full)
+    pd.testing.assert_frame_equal(projected, full[["score", "id"]])
+
+    with pytest.raises(ValueError, match="missing"):
+        Parse.parse(path, parser_type="json", usecols=["missing"])
+
+
+def test_parse_json_stream_without_data_array_raises(tmp_path):
+    path = tmp_path / "sample.json"
+    path.write_text(json.dumps({"metaData": {}}), encoding="utf-8")
+
+    with pytest.raises(ValueError, match="'data'"):
+        list(Parse.parse(path, parser_type="json", chunksize=10))
+
+
+def _write_parallel_tsv(path, rows=200):
+    lines = ["## FlyBase test file", "", "##FBgn_ID\tsymbol\tvalue"]
+    for i in range(rows):
+        if i % 37 == 0:
+            lines.append("")
+        elif i % 23 == 0:
+            lines.append(f"FBgn{i:07d}\tsym{i}")
+        elif i % 29 == 0:
+            lines.append("\t\t")
+        else:
+            lines.append(f"FBgn{i:07d}\tsym{i}\t{i}")
+    lines.append("## Finished processing")
+    path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+
+
+@pytest.mark.parametrize("workers", [2, 3, 7])
+def test_parallel_tsv_matches_sequential(tmp_path, workers):
+    path = tmp_path / "sample.tsv"
+    _write_parallel_tsv(path)
+
+    sequential = Parse.tsv_to_df(path, header=2)["data"]
+    parallel = Parse.tsv_to_df(path, header=2, workers=workers)["data"]
+
+    pd.testing.assert_frame_equal(parallel, sequential, check_index_type=True)
+
+    projected = Parse.tsv_to_df(path, header=2, usecols=["value", "FBgn_ID"], workers=workers)["data"]
+    pd.testing.assert_frame_equal(projected, sequential[["value", "FBgn_ID"]])
+
+
+def test_parallel_tsv_split_is_line_aligned(tmp_path):
+    path = tmp_path / "sample.tsv"
+    _write_parallel_tsv(path)
+    content = path.read_bytes()
+
+    header_line, ranges = Parse._tsv_split(path, header=2, parts=4)
+
+    assert header_line == b"##FBgn_ID\tsymbol\tvalue\n"
+    assert len(ranges) == 4
+    assert ranges[0][0] == content.index(header_line) + len(header_line)
+    assert ranges[-1][1] == len(content)
+    for (_, end), (start, _) in zip(ranges, ranges[1:]):
+        assert end == start and content[start - 1:start] == b"\n"
+
+
+@pytest.mark.parametrize("bad_line", ['FBgn9\t"quoted\tvalue"\t9', "FBgn9\tsym9\t9\textra"])
+def test_parallel_tsv_irregular_falls_back_to_sequential(tmp_path, bad_line):
+    path = tmp_path / "sample.tsv"
+    _write_parallel_tsv(path)
+    lines = path.read_text(encoding="utf-8").splitlines()
+    lines.insert(150, bad_line)
+    path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+
+    sequential = Parse.tsv_to_df(path, header=2)["data"]
+    parallel = Parse.tsv_to_df(path, header=2, workers=3)["data"]
+
+    pd.testing.assert_frame_equal(parallel, sequential, check_index_type=True)
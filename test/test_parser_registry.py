@@ -0,0 +1,173 @@
+import gzip
+from unittest.mock import patch, MagicMock
+
+import pandas as pd
+import pytest
+
+from FBD.core.config import Config
+from FBD.client.downloader import Downloader
+from FBD.client.parse import Parse
+from FBD.client.parser_dispatcher import ParserDispatcher
+from FBD.client.parser_registry import ParserRegistry, ParserSpec
+from FBD.fbd import FBD
+
+
+@pytest.fixture(autouse=True)
+def restore_registry():
+    ParserRegistry.candidates("tsv")
+    saved = {k: list(v) for k, v in ParserRegistry._parsers.items()}
+    yield
+    ParserRegistry._parsers.clear()
+    ParserRegistry._parsers.update(saved)
+
+
+FLYBASE_TSV = (
+    "## FlyBase test file\n"
+    "## Generated for tests\n"
+    "#\n"
+    "##FBgn_ID\tsymbol\tvalue\n"
+    "FBgn0000001\tabc\t1\n"
+    "FBgn0000002\tdef\t2\n"
+    "FBgn0000003\tghi\n"
+    "## Finished processing\n"
+)
+
+
+def test_builtin_parser_types_are_registered():
+    assert {"tsv", "affy", "json", "obo", "txt", "fb"} <= set(ParserRegistry.parser_types())
+
+
+def test_select_prefers_fastest_capable_parser(tmp_path):
+    path = tmp_path / "sample.tsv"
+    path.write_text(FLYBASE_TSV, encoding="utf-8")
+
+    assert ParserRegistry.select("tsv", file_path=path, header=4).name == "tsv-c"
+
+
+def test_select_falls_back_when_probe_rejects_file(tmp_path):
+    path = tmp_path / "quoted.tsv"
+    path.write_text('col1\tcol2\n"a\tb"\t2\n', encoding="utf-8")
+
+    assert ParserRegistry.select("tsv", file_path=path, header=1).name == "tsv"
+
+
+def test_select_falls_back_on_extra_fields(tmp_path):
+    path = tmp_path / "ragged.tsv"
+    path.write_text("col1\tcol2\n1\t2\n3\t4\t5\n", encoding="utf-8")
+
+    assert ParserRegistry.select("tsv", file_path=path, header=1).name == "tsv"
+
+
+def test_select_unknown_parser_type_raises():
+    with pytest.raises(ValueError, match="Unsupported parser_type"):
+        ParserRegistry.select("xyz")
+
+
+def test_select_without_capable_parser_raises():
+    with pytest.raises(ValueError, match="chunking"):
+        ParserRegistry.select("obo", chunking=True)
+
+
+def test_register_custom_parser_is_used_by_dispatcher(tmp_path):
+    path = tmp_path / "file.custom"
+    path.write_text("payload", encoding="utf-8")
+    target = MagicMock(return_value="parsed")
+
+    ParserRegistry.register(ParserSpec("custom", target, speed=5))
+    result = ParserDispatcher.parse("ds", path, {"parser_type": "custom", "parse_config": {"k": 1}})
+
+    assert result == "parsed"
+    target.assert_called_once_with(path, {"k": 1}, None)
+
+
+def test_register_duplicate_name_requires_replace():
+    ParserRegistry.register(ParserSpec("custom", MagicMock()))
+
+    with pytest.raises(ValueError):
+        ParserRegistry.register(ParserSpec("custom", MagicMock()))
+
+    ParserRegistry.register(ParserSpec("custom", MagicMock()), replace=True)
+    assert len(ParserRegistry.candidates("custom")) == 1
+
+
+def test_entry_point_plugins_are_loaded():
+    plugin = ParserSpec("plugin_type", MagicMock(), name="plugin")
+    entry_point = MagicMock()
+    entry_point.load.return_value = plugin
+
+    ParserRegistry._entry_points_loaded = False
+    with patch("FBD.client.parser_registry.importlib_metadata.entry_points", return_value=[entry_point]):
+        assert ParserRegistry.candidates("plugin_type") == [plugin]
+
+
+def test_broken_entry_point_plugin_warns():
+    entry_point = MagicMock()
+    entry_point.name = "broken"
+    entry_point.load.side_effect = ImportError("missing dependency")
+
+    ParserRegistry._entry_points_loaded = False
+    with patch("FBD.client.parser_registry.importlib_metadata.entry_points", return_value=[entry_point]):
+        with pytest.warns(UserWarning, match="broken"):
+            ParserRegistry.candidates("tsv")
+
+
+@pytest.mark.parametrize("content,header", [
+    (FLYBASE_TSV, 4),
+    ("col1\tcol2\n1\t2\n\n3\n", 1),
+    ("## a\n#col1\tcol2\n1\tNA\n\t\n", 2),
+])
+def test_c_engine_matches_python_engine_on_regular_files(tmp_path, content, header):
+    path = tmp_path / "sample.tsv"
+    path.write_text(content, encoding="utf-8")
+
+    assert Parse._tsv_is_regular(path, header=header)
+    expected = Parse.tsv_to_df(path, header)["data"]
+    actual = Parse.tsv_to_df(path, header, engine="c")["data"]
+    pd.testing.assert_frame_equal(actual, expected)
+
+
+def test_tsv_is_regular_scans_across_blocks(tmp_path):
+    path = tmp_path / "sample.tsv"
+    body = "".join(f"FBgn{i:07d}\tsym{i}\n" for i in range(2000))
+    path.write_text("col1\tcol2\n" + body + "x\ty\tz\n", encoding="utf-8")
+
+    assert not Parse._tsv_is_regular(path, header=1, block_size=64)
+
+    path.write_text("col1\tcol2\n" + body, encoding="utf-8")
+    assert Parse._tsv_is_regular(path, header=1, block_size=64)
+
+
+def test_select_parallel_tsv_when_workers_configured(tmp_path):
+    path = tmp_path / "sample.tsv"
+    path.write_text(FLYBASE_TSV, encoding="utf-8")
+    gz_path = tmp_path / "sample.tsv.gz"
+    gz_path.write_bytes(gzip.compress(FLYBASE_TSV.encode()))
+
+    with patch.object(Config, "PARSE_WORKERS", 2), patch.object(Config, "PARSE_PARALLEL_MIN_BYTES", 0):
+        assert ParserRegistry.select("tsv", file_path=path, header=4).name == "tsv-parallel"
+        assert ParserRegistry.select("tsv", file_path=path, header=4, chunking=True).name == "tsv-c"
+        assert ParserRegistry.select("tsv", file_path=gz_path, header=4, compressed=True).name == "tsv-c"
+
+    with patch.object(Config, "PARSE_PARALLEL_MIN_BYTES", 0):
+        assert ParserRegistry.select("tsv", file_path=path, header=4).name == "tsv-c"
+
+
+def test_tsv_regularity_is_kept_in_metadata_until_the_file_changes(serve):
+    serve("ggi", "tsv", rows=300, gz=True)
+    probe = patch.object(Parse, "_tsv_is_regular", wraps=Parse._tsv_is_regular)
+
+    with probe as scans:
+        first = FBD().download_file("ggi")
+        again = FBD().download_file("ggi", chunksize=100)
+        pd.testing.assert_frame_equal(pd.concat(list(again)), first)
+        assert scans.call_count == 1
+
+        saved = Downloader._load_metadata_cache("ggi")
+        local = Downloader.local_path(saved)
+        assert list(saved["local_probes"]["results"].values()) == [True]
+
+        with open(local, "a") as f:
+            f.write('"quoted"\tFBgn0000001\tx\tFBgn0000002\tsuppressible\tFBrf0000001\n')
+        FBD().download_file("ggi")
+        assert scans.call_count == 2
+        assert list(Downloader._load_metadata_cache("ggi")["local_probes"]["results"].values()) == [False]
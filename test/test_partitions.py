@@ -0,0 +1,123 @@
+import pandas as pd
+import pytest
+
+from FBD.client.partitions import PartitionedCache
+from FBD.core.events import Events
+from FBD.fbd import FBD
+
+
+@pytest.fixture
+def stub_datasets():
+    return {"ggi": ("tsv", 600, True)}
+
+
+def records(df):
+    return sorted(df.astype(object).itertuples(index=False, name=None))
+
+
+def test_partition_records_statistics_per_partition(stub):
+    df = FBD().download_file("ggi")
+    stats = FBD("ggi").partition("Interaction_type")
+
+    types = stats[stats["column"] == "Interaction_type"].set_index("key")
+    assert types["rows"].to_dict() == df["Interaction_type"].value_counts().to_dict()
+    assert (types["min"] == types.index).all() and (types["distinct"] == 1).all()
+
+    genes = stats[stats["column"] == "Ending_gene(s)_FBgn"].set_index("key")
+    for key, part in df.groupby("Interaction_type"):
+        assert genes.loc[key, ["min", "max", "distinct"]].tolist() == [
+            part["Ending_gene(s)_FBgn"].min(), part["Ending_gene(s)_FBgn"].max(),
+            part["Ending_gene(s)_FBgn"].nunique(),
+        ]
+
+
+def test_where_reads_only_matching_partitions(stub):
+    df = FBD().download_file("ggi")
+    stats = FBD("ggi").partition("Interaction_type")
+
+    events = []
+    with Events.subscribed(events.append):
+        subset = FBD().download_file("ggi", where={"Interaction_type": ["suppressible", "enhanceable"]})
+        chunks = list(FBD().download_file(
+            "ggi", where={"Interaction_type": "suppressible"}, columns=["Ending_gene(s)_FBgn"], chunksize=50,
+        ))
+        gene = df["Ending_gene(s)_FBgn"].iloc[3]
+        by_gene = FBD().download_file("ggi", where={"Ending_gene(s)_FBgn": gene})
+
+    expected = df[df["Interaction_type"].isin(["suppressible", "enhanceable"])]
+    assert records(subset) == records(expected)
+
+    suppressible = df[df["Interaction_type"] == "suppressible"]
+    assert all(len(chunk) <= 50 for chunk in chunks)
+    assert list(chunks[0].columns) == ["Ending_gene(s)_FBgn"]
+    pd.testing.assert_frame_equal(pd.concat(chunks), suppressible[["Ending_gene(s)_FBgn"]])
+
+    assert records(by_gene) == records(df[df["Ending_gene(s)_FBgn"] == gene])
+
+    reads = [e.fields for e in events if e.name == "partitions.read"]
+    assert [(r["partitions"], r["total"]) for r in reads[:2]] == [(2, 4), (1, 4)]
+    genes = stats[stats["column"] == "Ending_gene(s)_FBgn"]
+    assert reads[2]["partitions"] == ((genes["min"] <= gene) & (gene <= genes["max"])).sum()
+
+    partition = {"key": "x", "columns": [{"name": "n", "min": 1, "max": 5}]}
+    assert PartitionedCache.can_match(partition, "k", {"n": [0, 3]})
+    assert not PartitionedCache.can_match(partition, "k", {"n": 7})
+    assert not PartitionedCache.can_match(partition, "k", {"k": "y", "n": 3})
+
+
+def test_where_without_layout_filters_while_parsing(stub):
+    df = FBD().download_file("ggi")
+
+    events = []
+    with Events.subscribed(events.append):
+        chunks = FBD().download_file(
+            "ggi", where={"Interaction_type": "phenotypic"}, columns=["Starting_gene(s)_FBgn"], chunksize=100,
+        )
+        result = pd.concat(list(chunks))
+
+    expected = df.loc[df["Interaction_type"] == "phenotypic", ["Starting_gene(s)_FBgn"]]
+    pd.testing.assert_frame_equal(result, expected)
+    assert not [e for e in events if e.name == "partitions.read"]
+
+
+@pytest.mark.parametrize("where, columns", [
+    ({"Interaction_type": ["suppressible", "phenotypic"]}, None),
+    ({"Interaction_type": "enhanceable", "Ending_gene(s)_FBgn": ["FBgn0000001", "FBgn0000002"]}, None),
+    ({"Interaction_type": "suppressible"}, ["Starting_gene(s)_symbol", "Publication_FBrf"]),
+    ({"Interaction_type": "nothing"}, None),
+])
+def test_layout_and_parse_return_the_same_frame(stub, where, columns):
+    parsed = FBD().download_file("ggi", where=where, columns=columns)
+    parsed_chunks = pd.concat(list(FBD().download_file("ggi", where=where, columns=columns, chunksize=70)))
+    FBD("ggi").partition("Interaction_type")
+
+    events = []
+    with Events.subscribed(events.append):
+        partitioned = FBD().download_file("ggi", where=where, columns=columns)
+        chunks = list(FBD().download_file("ggi", where=where, columns=columns, chunksize=70))
+
+    assert len([e for e in events if e.name == "partitions.read"]) == 2
+    pd.testing.assert_frame_equal(partitioned, parsed)
+    assert all(len(chunk) <= 70 for chunk in chunks)
+    if chunks:
+        pd.testing.assert_frame_equal(pd.concat(chunks), parsed_chunks)
+    else:
+        assert parsed_chunks.empty
+
+
+def test_stale_layout_is_ignored_and_bad_columns_raise(stub, tmp_path, monkeypatch):
+    FBD("ggi").partition("Interaction_type")
+    local = tmp_path / "downloads" / stub.datasets["ggi"]["filename"].removesuffix(".gz")
+    lines = local.read_text().splitlines(keepends=True)
+    lines.insert(-1, "zyx\tFBgn0000001\tzyx\tFBgn0000002\tsuppressible\tFBrf0000001\n")
+    local.write_text("".join(lines))
+
+    assert PartitionedCache.meta("ggi", local) is None
+    fresh = FBD().download_file("ggi", where={"Starting_gene(s)_symbol": "zyx"})
+    assert fresh["Ending_gene(s)_FBgn"].tolist() == ["FBgn0000002"]
+
+    monkeypatch.setattr(PartitionedCache, "MAX_PARTITIONS", 100)
+    with pytest.raises(ValueError, match="more than 100"):
+        PartitionedCache.get("ggi", "Publication_FBrf")
+    with pytest.raises(ValueError, match="Unknown"):
+        FBD().download_file("ggi", where={"nope": 1})
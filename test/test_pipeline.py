@@ -0,0 +1,84 @@
+import gzip
+from unittest.mock import patch
+
+import pandas as pd
+import pytest
+
+from benchmarks import fixtures
+from FBD.client.downloader import Downloader
+from FBD.client.parser_dispatcher import ParserDispatcher
+from FBD.client.pipeline import DownloadStream
+from FBD.core.config import Config
+
+
+@pytest.fixture(autouse=True)
+def small_queue(monkeypatch):
+    monkeypatch.setattr(DownloadStream, "QUEUE_SIZE", 2)
+
+
+@pytest.fixture
+def stub_options():
+    return {"chunk_size": 4096}
+
+
+def load(dataset, **kwargs):
+    result = Downloader.download_file(dataset, refresh=True, **kwargs)
+    assert result["status"] == "ok", result
+    data = result["data"]
+    return pd.concat(list(data)) if kwargs.get("chunksize") else data
+
+
+@pytest.mark.parametrize("kind", ["tsv", "fb", "json"])
+@pytest.mark.parametrize("gz", [False, True])
+@pytest.mark.parametrize("options", [{}, {"chunksize": 97}])
+def test_pipeline_matches_sequential(serve, kind, gz, options):
+    meta = serve("ds", kind, rows=3000, gz=gz)
+
+    expected = load("ds", **options)
+    local = Config.DOWNLOAD_DIR / meta["filename"].removesuffix(".gz")
+    local.unlink()
+    with patch.object(ParserDispatcher, "parse", side_effect=AssertionError("sequential fallback")):
+        actual = load("ds", pipeline=True, **options)
+
+    pd.testing.assert_frame_equal(actual, expected)
+    assert local.exists()
+    assert not list(Config.DOWNLOAD_DIR.glob("*.gz")) or not gz
+    assert Downloader.download_file("ds")["data"] is not None
+
+
+def write_irregular_tsv(path, rows, wide_at):
+    lines = ["## preamble", "#a\tb\tc"]
+    for i in range(rows):
+        lines.append(f"x{i}\ty{i}\t{i}\textra" if i == wide_at else f"x{i}\ty{i}\t{i}")
+    with gzip.open(path, "wt", encoding="utf-8") as f:
+        f.write("\n".join(lines) + "\n")
+
+
+@pytest.mark.parametrize("options", [{}, {"chunksize": 50}])
+def test_pipeline_falls_back_on_irregular_tsv(tmp_path, stub, monkeypatch, options):
+    path = tmp_path / "irregular.tsv.gz"
+    write_irregular_tsv(path, rows=5000, wide_at=4000)
+    stub.add("ds", {"filename": path.name, "header": 2, "parser_type": "tsv", "parse_config": None, "path": path})
+
+    expected = load("ds", **options)
+    sequential = ParserDispatcher.parse
+    fallbacks = []
+    monkeypatch.setattr(ParserDispatcher, "parse", lambda *a, **k: fallbacks.append(a) or sequential(*a, **k))
+    actual = load("ds", pipeline=True, **options)
+
+    pd.testing.assert_frame_equal(actual, expected)
+    assert len(fallbacks) == 1
+
+
+def test_pipeline_truncated_download_leaves_no_cache_file(tmp_path, stub):
+    meta = fixtures.build(tmp_path / "fixtures", "tsv", rows=3000, gz=True)
+    truncated = tmp_path / "truncated" / meta["filename"]
+    truncated.parent.mkdir()
+    truncated.write_bytes(meta["path"].read_bytes()[:-100])
+    stub.add("ds", {**meta, "path": truncated})
+
+    with pytest.raises(EOFError):
+        result = Downloader.download_file("ds", refresh=True, pipeline=True)
+        result["data"]
+
+    assert list(Config.DOWNLOAD_DIR.iterdir()) == []
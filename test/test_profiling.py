@@ -0,0 +1,110 @@
+import threading
+from unittest.mock import patch
+
+import numpy as np
+import pytest
+
+from benchmarks import fixtures
+from benchmarks.resources import profile_synthetic
+from FBD.client.downloader import Downloader
+from FBD.client.parse import Parse
+from FBD.core.config import Config
+from FBD.core.events import Events
+from FBD.core.profiling import Profile, resource_table
+from FBD.fbd import FBD
+
+
+def test_profile_measures_nested_stages():
+    with Profile("ds") as prof:
+        with Events.span("outer"):
+            with Events.span("inner"):
+                big = np.ones(2_000_000)  # 16 MB
+                del big
+            small = np.ones(100_000)
+
+    report = prof.report()
+    assert Events._span_hooks == ()
+    assert set(report["stages"]) == {"outer", "inner"}
+    inner, outer = report["stages"]["inner"], report["stages"]["outer"]
+    assert inner["peak_bytes"] >= 16_000_000
+    assert outer["peak_bytes"] >= inner["peak_bytes"]
+    assert report["peak_bytes"] >= inner["peak_bytes"]
+    assert outer["seconds"] >= inner["seconds"]
+    del small
+
+
+def test_profile_aggregates_chunk_stages(tmp_path):
+    meta = fixtures.build(tmp_path, "fb", rows=200)
+
+    with Profile() as prof:
+        chunks = list(Parse.parse(meta["path"], "fb", config=meta["parse_config"], chunksize=30))
+
+    clean = prof.report()["stages"]["parse.clean"]
+    assert clean["count"] == len(chunks) == 4
+    assert clean["rows"] == 100
+
+
+def test_fbd_download_file_profile_returns_report():
+    report = {"dataset": "ds", "seconds": 1.0, "peak_bytes": 5_000_000, "max_rss_bytes": None, "stages": {}}
+    with patch("FBD.fbd.Downloader.download_file") as mock_dl:
+        mock_dl.return_value = {"status": "ok", "data": {"a": 1}, "profile": report}
+        data, profile = FBD("ds").download_file(profile=True)
+
+    assert data == {"a": 1}
+    assert profile is report
+    assert mock_dl.call_args.kwargs["profile"] is True
+
+
+def test_profile_downloads_config_keeps_return_shape(monkeypatch):
+    monkeypatch.setattr(Config, "PROFILE_DOWNLOADS", True)
+    with patch("FBD.client.downloader.Downloader._download_file") as mock_dl:
+        mock_dl.return_value = {"status": "ok", "data": {"a": 1}}
+        fbd = FBD("ds")
+        data = fbd.download_file()
+        internal = Downloader.download_file("ds")
+
+    assert data == {"a": 1}
+    assert fbd.last_profile["dataset"] == "ds"
+    assert "download.file" in fbd.last_profile["stages"]
+    assert "profile" not in internal
+
+
+def test_profile_rejects_nested_and_concurrent_profiles():
+    with Profile("outer") as outer:
+        assert Profile.active()
+        with pytest.raises(RuntimeError, match="Profile"):
+            with Profile("inner"):
+                pass
+
+        errors = []
+
+        def concurrent():
+            try:
+                with Profile("thread"):
+                    pass
+            except RuntimeError as e:
+                errors.append(e)
+
+        thread = threading.Thread(target=concurrent)
+        thread.start()
+        thread.join()
+        assert len(errors) == 1
+
+        with Profile("lenient", strict=False) as lenient:
+            pass
+        assert lenient.report() is None
+
+    assert not Profile.active()
+    assert outer.report()["dataset"] == "outer"
+
+
+def test_resource_table_over_synthetic_catalog(tmp_path):
+    table = profile_synthetic(rows=200, fixtures_dir=tmp_path, verbose=False)
+
+    assert len(table) == 2 * len(fixtures.WRITERS)
+    assert "error" not in table
+    tsv = table.set_index("dataset").loc["tsv.gz"]
+    assert tsv["peak_mb"] > 0
+    assert tsv["parse.read.peak_mb"] <= tsv["peak_mb"]
+    assert tsv["decompress.seconds"] > 0
+    assert list(resource_table([]).columns) == []
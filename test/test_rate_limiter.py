@@ -0,0 +1,216 @@
+import json
+import multiprocessing
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+from FBD.core.config import Config
+from FBD.core.rate_limiter import RateLimiter, RateLimitExceeded
+
+
+@pytest.fixture
+def limiter_config(tmp_path, monkeypatch):
+    monkeypatch.setattr(Config, "CACHE_DIR", tmp_path)
+    monkeypatch.setattr(Config, "DOWNLOAD_RATE_LIMIT_ENABLED", True)
+    monkeypatch.setattr(Config, "DOWNLOAD_MAX_CALLS", 15)
+    monkeypatch.setattr(Config, "DOWNLOAD_WINDOW_SECONDS", 3600)
+    yield tmp_path
+
+
+def _try_checks(limiter, attempts):
+    granted = 0
+    for _ in range(attempts):
+        try:
+            limiter.check()
+            granted += 1
+        except RuntimeError:
+            pass
+    return granted
+
+
+def _process_worker(cache_dir, max_calls, attempts, start, results):
+    # Con "spawn" los procesos hijos no heredan los monkeypatch.
+    Config.CACHE_DIR = Path(cache_dir)
+    Config.DOWNLOAD_RATE_LIMIT_ENABLED = True
+    Config.DOWNLOAD_MAX_CALLS = max_calls
+    Config.DOWNLOAD_WINDOW_SECONDS = 3600
+
+    limiter = RateLimiter("download")
+    start.wait()
+    results.put(_try_checks(limiter, attempts))
+
+
+def test_check_persists_calls(limiter_config):
+    limiter = RateLimiter("download")
+    limiter.check()
+    limiter.check()
+
+    calls = json.loads((limiter_config / "download_rate.json").read_text())
+    assert len(calls) == 2
+
+
+def test_check_sees_calls_from_other_instances(limiter_config):
+    Config.DOWNLOAD_MAX_CALLS = 2
+    first = RateLimiter("download")
+    second = RateLimiter("download")
+
+    first.check()
+    second.check()
+
+    with pytest.raises(RuntimeError):
+        first.check()
+
+
+def test_check_ignores_expired_calls(limiter_config):
+    Config.DOWNLOAD_MAX_CALLS = 1
+    (limiter_config / "download_rate.json").write_text(json.dumps([0.0]))
+
+    RateLimiter("download").check()
+
+
+def test_check_never_exceeds_budget_across_threads(limiter_config):
+    shared = RateLimiter("download")
+    results = []
+    lock = threading.Lock()
+
+    def worker(limiter):
+        granted = _try_checks(limiter, 5)
+        with lock:
+            results.append(granted)
+
+    # Mitad de los hilos comparten instancia, la otra mitad usa la suya.
+    threads = [
+        threading.Thread(target=worker, args=(shared if i % 2 else RateLimiter("download"),))
+        for i in range(16)
+    ]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert sum(results) == Config.DOWNLOAD_MAX_CALLS
+    calls = json.loads((limiter_config / "download_rate.json").read_text())
+    assert len(calls) == Config.DOWNLOAD_MAX_CALLS
+
+
+def test_check_never_exceeds_budget_across_processes(limiter_config):
+    methods = multiprocessing.get_all_start_methods()
+    ctx = multiprocessing.get_context("fork" if "fork" in methods else "spawn")
+    start = ctx.Event()
+    results = ctx.Queue()
+    processes = [
+        ctx.Process(
+            target=_process_worker,
+            args=(str(limiter_config), Config.DOWNLOAD_MAX_CALLS, 6, start, results),
+        )
+        for _ in range(8)
+    ]
+    for p in processes:
+        p.start()
+    start.set()
+
+    granted = [results.get(timeout=60) for _ in processes]
+    for p in processes:
+        p.join(timeout=60)
+
+    assert sum(granted) == Config.DOWNLOAD_MAX_CALLS
+    calls = json.loads((limiter_config / "download_rate.json").read_text())
+    assert len(calls) == Config.DOWNLOAD_MAX_CALLS
+
+
+def test_check_raises_with_retry_after(limiter_config):
+    Config.DOWNLOAD_MAX_CALLS = 1
+    limiter = RateLimiter("download")
+    limiter.check()
+
+    with pytest.raises(RateLimitExceeded) as excinfo:
+        limiter.check()
+
+    assert 3590 < excinfo.value.retry_after <= 3600
+
+
+def test_estimate_wait(limiter_config):
+    Config.DOWNLOAD_MAX_CALLS = 2
+    limiter = RateLimiter("download")
+    assert limiter.estimate_wait() == 0.0
+
+    limiter.check()
+    limiter.check()
+
+    assert 3590 < limiter.estimate_wait() <= 3600
+
+
+def test_wait_mode_blocks_until_slot_frees(limiter_config):
+    Config.DOWNLOAD_MAX_CALLS = 1
+    Config.DOWNLOAD_WINDOW_SECONDS = 0.3
+    limiter = RateLimiter("download")
+    limiter.check()
+
+    started = time.monotonic()
+    limiter.check(wait=True)
+
+    assert time.monotonic() - started >= 0.2
+
+
+def test_wait_mode_uses_config(limiter_config, monkeypatch):
+    monkeypatch.setattr(Config, "DOWNLOAD_RATE_LIMIT_MODE", "wait")
+    Config.DOWNLOAD_MAX_CALLS = 1
+    Config.DOWNLOAD_WINDOW_SECONDS = 0.2
+    limiter = RateLimiter("download")
+    limiter.check()
+    limiter.check()
+
+
+def test_wait_mode_fails_fast_past_deadline(limiter_config):
+    Config.DOWNLOAD_MAX_CALLS = 1
+    limiter = RateLimiter("download")
+    limiter.check()
+
+    started = time.monotonic()
+    with pytest.raises(RateLimitExceeded) as excinfo:
+        limiter.check(wait=True, deadline=time.time() + 1)
+
+    assert time.monotonic() - started < 0.5
+    assert excinfo.value.retry_after > 1
+
+
+def test_wait_mode_without_budget_fails_immediately(limiter_config):
+    Config.DOWNLOAD_MAX_CALLS = 0
+    limiter = RateLimiter("download")
+
+    with pytest.raises(RateLimitExceeded) as excinfo:
+        limiter.check(wait=True)
+
+    assert excinfo.value.retry_after == float("inf")
+
+
+def test_set_rate_limit_rejects_negative_max_calls(limiter_config):
+    with pytest.raises(ValueError, match="max_calls"):
+        Config.set_rate_limit(max_calls=-1, persist=False)
+
+    assert Config.DOWNLOAD_MAX_CALLS == 15
+
+
+def test_wait_mode_serves_higher_priority_first(limiter_config):
+    Config.DOWNLOAD_MAX_CALLS = 1
+    Config.DOWNLOAD_WINDOW_SECONDS = 0.4
+    limiter = RateLimiter("download")
+    limiter.check()
+
+    order = []
+
+    def worker(name, priority):
+        limiter.check(wait=True, priority=priority)
+        order.append(name)
+
+    low = threading.Thread(target=worker, args=("low", 0))
+    high = threading.Thread(target=worker, args=("high", 5))
+    low.start()
+    time.sleep(0.05)
+    high.start()
+    low.join(timeout=5)
+    high.join(timeout=5)
+
+    assert order == ["high", "low"]
@@ -0,0 +1,64 @@
+import numpy as np
+import pytest
+
+from FBD.client.resolver import SymbolResolver
+from FBD.core.events import Events
+from FBD.fbd import FBD
+
+
+@pytest.fixture
+def stub_datasets():
+    return {
+        SymbolResolver.SYNONYM_DATASET: ("synonyms", 400, False),
+        SymbolResolver.ID_DATASET: ("id_map", 400, False),
+    }
+
+
+def test_resolve_handles_every_kind_of_name(stub):
+    names = ["g1", "FBgn0000003", "FBgn9000000", "CG4", "CG50000", "gene 5", "old name 7", "CG10007",
+             "sym3", "G1", "nope", None, "g0", "FBal0000020"]
+    result = FBD.resolve_symbols(names)
+
+    assert result["input"].tolist() == names
+    assert result["FBgn"].tolist() == [
+        "FBgn0000001", "FBgn0000003", "FBgn0000000", "FBgn0000004", "FBgn0000000", "FBgn0000005",
+        "FBgn0000007", "FBgn0000007", None, None, None, None, "FBgn0000000", None,
+    ]
+    assert result["match"].tolist() == [
+        "symbol", "primary_id", "secondary_id", "annotation_id", "secondary_annotation_id", "fullname",
+        "synonym", "synonym", "synonym", None, None, None, "symbol", None,
+    ]
+    assert result["candidates"].tolist()[8:10] == [2, 0]
+
+
+def test_case_insensitive_lookup_and_ambiguous_candidates(stub):
+    resolver = FBD.get_symbol_resolver(organism=None, case_sensitive=False)
+
+    # sym0 is a synonym of FBgn0000000 (Dsim, kept without organism filter) and FBgn0000001.
+    assert resolver.candidates("SYM0") == ["FBgn0000000", "FBgn0000001"]
+    # Case-insensitive lookups fold "G1" onto the current symbol g1.
+    keys, kinds, counts = resolver.resolve_keys(np.array(["G1"], dtype=object))
+    assert counts.tolist() == [1] and kinds.tolist() == [1]
+
+
+def test_build_reuses_cache_and_rebuilds_only_the_changed_part(stub, tmp_path):
+    events = []
+    with Events.subscribed(events.append):
+        first = SymbolResolver.build()
+        again = SymbolResolver.build()
+        assert [e.fields["role"] for e in events if e.name == "resolver.build"] == ["synonyms", "id_map"]
+        np.testing.assert_array_equal(first.hashes, again.hashes)
+
+        local = tmp_path / "downloads" / stub.datasets[SymbolResolver.ID_DATASET]["filename"]
+        with open(local, "a") as f:
+            f.write("g999\tDmel\tFBgn0000999\t\tCG999\t\n")
+        rebuilt = SymbolResolver.build()
+
+    assert [e.fields["role"] for e in events if e.name == "resolver.build"] == ["synonyms", "id_map", "id_map"]
+    assert rebuilt.resolve(["CG999"])["FBgn"].tolist() == ["FBgn0000999"]
+    assert len(rebuilt) == len(first) + 3
+
+
+def test_missing_dataset_raises(stub):
+    with pytest.raises(ValueError):
+        SymbolResolver.build(id_dataset="not_there")
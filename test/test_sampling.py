@@ -0,0 +1,119 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from FBD.client.sampling import Reservoir, StratifiedReservoir
+from FBD.fbd import FBD
+
+
+def frame(rows):
+    return pd.DataFrame({"id": [f"r{i}" for i in range(rows)], "group": [f"g{i % 3}" for i in range(rows)]})
+
+
+def chunks(df, size):
+    return [df.iloc[i:i + size] for i in range(0, len(df), size)]
+
+
+def run(reservoir, df, size):
+    for chunk in chunks(df, size):
+        reservoir.update(chunk)
+    return reservoir.result()
+
+
+def test_reservoir_sample_is_independent_of_chunking():
+    df = frame(1000)
+
+    a = run(Reservoir(50, seed=7), df, 7)
+    b = run(Reservoir(50, seed=7), df, 1000)
+
+    assert len(a) == 50
+    assert a.index.is_monotonic_increasing
+    pd.testing.assert_frame_equal(a, b)
+    pd.testing.assert_frame_equal(a, df.loc[a.index])
+
+
+def test_reservoir_smaller_stream_returns_everything():
+    df = frame(20)
+    pd.testing.assert_frame_equal(run(Reservoir(50, seed=1), df, 6), df)
+
+
+def test_reservoir_is_uniform():
+    df = frame(100)
+    rng = np.random.default_rng(0)
+    counts = np.zeros(100)
+    trials = 2000
+    for _ in range(trials):
+        counts[run(Reservoir(10, rng), df, 13).index] += 1
+
+    # Each row is included with probability 10/100.
+    assert np.abs(counts / trials - 0.1).max() < 0.04
+
+
+def test_stratified_reservoir_allocates_proportionally():
+    df = pd.DataFrame({"id": range(1000), "group": ["a"] * 700 + ["b"] * 200 + ["c"] * 100})
+    df = df.sample(frac=1, random_state=0).reset_index(drop=True)
+
+    sample = run(StratifiedReservoir(50, "group", seed=3), df, 64)
+
+    assert sample["group"].value_counts().to_dict() == {"a": 35, "b": 10, "c": 5}
+    pd.testing.assert_frame_equal(sample, df.loc[sample.index])
+
+
+def test_reservoir_stays_uniform_after_shrink():
+    df = frame(100)
+    rng = np.random.default_rng(1)
+    counts = np.zeros(100)
+    trials = 2000
+    for _ in range(trials):
+        reservoir = Reservoir(30, rng)
+        reservoir.update(df.iloc[:40])
+        reservoir.shrink(10)
+        reservoir.update(df.iloc[40:])
+        counts[reservoir.result().index] += 1
+
+    assert np.abs(counts / trials - 0.1).max() < 0.04
+
+
+def test_stratified_reservoir_bounds_rows_held():
+    rng = np.random.default_rng(0)
+    groups = rng.choice(300, size=30_000, p=np.arange(1, 301) / np.arange(1, 301).sum())
+    df = pd.DataFrame({"id": range(len(groups)), "group": groups})
+
+    reservoir = StratifiedReservoir(100, "group", seed=5)
+    sample = run(reservoir, df, 1000)
+
+    held = sum(len(r) for r in reservoir.reservoirs.values())
+    assert held <= StratifiedReservoir.SLACK * 100 + len(reservoir.reservoirs)
+    assert held < 100 * len(reservoir.reservoirs) / 10
+    assert len(sample) == 100
+    expected = df["group"].value_counts() * 100 / len(df)
+    counts = sample["group"].value_counts().reindex(expected.index, fill_value=0)
+    assert (counts - expected).abs().max() < 1
+    pd.testing.assert_frame_equal(sample, df.loc[sample.index])
+
+
+def test_stratified_reservoir_rejects_too_many_strata(monkeypatch):
+    monkeypatch.setattr(StratifiedReservoir, "MAX_STRATA", 2)
+    with pytest.raises(ValueError, match="more than 2"):
+        StratifiedReservoir(5, "group").update(frame(10))
+
+
+def test_stratified_reservoir_unknown_column():
+    with pytest.raises(ValueError, match="stratify"):
+        StratifiedReservoir(5, "missing").update(frame(10))
+
+
+def test_fbd_sample_streams_dataset(serve):
+    serve("ds", "tsv", rows=3000, gz=True)
+
+    fbd = FBD("ds")
+    full = fbd.download_file()
+    sample = fbd.sample(n=100, seed=42, chunksize=256)
+    again = fbd.sample(n=100, seed=42, chunksize=1000)
+    stratified = fbd.sample(n=40, seed=1, stratify="Interaction_type", columns=["Starting_gene(s)_FBgn"])
+
+    assert len(sample) == 100
+    pd.testing.assert_frame_equal(sample, full.loc[sample.index])
+    pd.testing.assert_frame_equal(sample, again)
+    assert list(stratified.columns) == ["Starting_gene(s)_FBgn", "Interaction_type"]
+    assert len(stratified) == 40
@@ -0,0 +1,105 @@
+import sqlite3
+import threading
+from contextlib import closing
+from unittest.mock import patch
+
+import pytest
+
+from FBD.client.sql_store import SQLStore
+from FBD.core.events import Events
+from FBD.fbd import FBD
+
+
+@pytest.fixture
+def stub_datasets():
+    return {"gene-interactions": ("tsv", 300, True), "id_map": ("id_map", 10_000, False)}
+
+
+def test_load_creates_indexed_table(stub):
+    entry = FBD("gene-interactions").load_sql()
+
+    assert entry["table_name"] == "gene_interactions"
+    assert entry["rows"] == 300
+    assert entry["id_columns"].split(",") == [
+        "Starting_gene(s)_FBgn", "Ending_gene(s)_FBgn", "Publication_FBrf",
+    ]
+    with closing(sqlite3.connect(SQLStore.path())) as con:
+        plan = con.execute(
+            'EXPLAIN QUERY PLAN SELECT * FROM gene_interactions WHERE "Ending_gene(s)_FBgn" = ?', ("FBgn0000001",)
+        ).fetchall()
+    assert "USING INDEX" in str(plan)
+    assert SQLStore.tables()["dataset"].tolist() == ["gene-interactions"]
+
+
+def test_query_filters_and_joins_loaded_tables(stub):
+    df = FBD().download_file("gene-interactions")
+    target = df["Ending_gene(s)_FBgn"].iloc[5]
+
+    rows = FBD.query(
+        'SELECT * FROM gene_interactions WHERE "Ending_gene(s)_FBgn" = ?', params=(target,),
+        datasets="gene-interactions",
+    )
+    assert rows.to_dict("records") == df[df["Ending_gene(s)_FBgn"] == target].to_dict("records")
+
+    SQLStore.load("id_map")
+    joined = FBD.query(
+        'SELECT m.gene_symbol, m."primary_FBgn#" FROM id_map m WHERE m.annotation_ID IN (?, ?) ORDER BY 1',
+        params=("CG3", "CG999"),
+    )
+    assert joined.values.tolist() == [["g3", "FBgn0000003"], ["g999", "FBgn0000999"]]
+
+
+def test_download_reloads_tables_whose_file_was_transferred_again(stub, tmp_path):
+    SQLStore.load("id_map")
+    source = tmp_path / "fixtures" / "seed0" / stub.datasets["id_map"]["filename"]
+    with open(source, "a") as f:
+        f.write("new\tDmel\tFBgn0001234\t\tCG1234\t\n")
+
+    events = []
+    with Events.subscribed(events.append):
+        FBD().download_file("id_map", refresh=True)
+        assert SQLStore.tables()["rows"].tolist() == [1001]
+        with patch("FBD.client.sql_store.source_signature", side_effect=AssertionError("query() checked a file")):
+            count = FBD.query("SELECT COUNT(*) AS n FROM id_map")
+
+    assert count["n"].tolist() == [1001]
+    assert [e.dataset for e in events if e.name == "sql.load"] == ["id_map"]
+    assert SQLStore.load("id_map", refresh=True)["rows"] == 1001
+    assert [e.dataset for e in events if e.name == "sql.load"] == ["id_map"]
+
+
+def test_download_without_a_table_creates_no_store(stub):
+    FBD().download_file("id_map")
+    assert not SQLStore.path().exists()
+
+
+def test_concurrent_loads_use_separate_staging_tables(stub):
+    SQLStore.load("id_map")
+    errors = []
+
+    def load():
+        try:
+            SQLStore.load("id_map")
+        except Exception as exc:
+            errors.append(exc)
+
+    threads = [threading.Thread(target=load) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    with closing(sqlite3.connect(SQLStore.path())) as con:
+        names = [name for name, in con.execute("SELECT name FROM sqlite_master WHERE type = 'table'")]
+        assert con.execute("SELECT COUNT(*) FROM id_map").fetchone() == (1000,)
+    assert sorted(names) == ["_fbd_tables", "id_map"]
+
+
+def test_non_tabular_and_missing_datasets_raise(serve):
+    serve("ontology", "obo", rows=1000)
+
+    with pytest.raises(ValueError, match="chunking"):
+        SQLStore.load("ontology")
+    with pytest.raises(ValueError):
+        SQLStore.load("missing")
@@ -0,0 +1,101 @@
+import pandas as pd
+import pytest
+
+from FBD.client.text_index import ContentIndex, ContentStore, hash_terms, tokenize
+from FBD.core.config import Config
+from FBD.core.events import Events
+from FBD.fbd import FBD
+
+
+@pytest.fixture(autouse=True)
+def index_content(monkeypatch):
+    monkeypatch.setattr(Config, "INDEX_CONTENT", True)
+
+
+def frame():
+    return pd.DataFrame({
+        "symbol": ["wg", "hh", None, "wg"],
+        "phenotype": ["Wing blister, wing notch", "eye rough", "wing", "lethal"],
+        "score": [1, 2, 3, 4],
+    })
+
+
+def test_tokenize_lowercases_and_splits_on_non_word_characters():
+    assert tokenize("Wing-blister wg[1] wing") == ["wing", "blister", "wg", "1"]
+    assert tokenize(None) == []
+
+
+def test_builder_counts_terms_per_row_and_ranks_rows(tmp_path):
+    builder = ContentIndex.builder("d")
+    builder.update(frame().iloc[:2])
+    builder.update(frame().iloc[2:])
+    index = ContentIndex.load(builder.build().save(tmp_path / "d.terms.npz"))
+
+    assert index.meta["rows"] == 4
+    assert repr(index).endswith(f"{index.meta['terms']} terms)") and index._arrays is None
+    assert index.document_frequencies(hash_terms(["wing", "wg", "absent"])).tolist() == [2, 2, 0]
+
+    hashes = hash_terms(["wing", "wg"])
+    rows, scores, matched = index.score(hashes, [1.0, 1.0])
+    assert rows.tolist() == [0, 2, 3]
+    assert matched.tolist() == [2, 1, 1]
+    # Row 0 has both terms ("wing" twice); the short row 2 beats row 3 on one term.
+    assert scores[0] > scores[1] > scores[2]
+
+
+def test_download_indexes_dataset_and_search_ranks_hits(serve):
+    serve("ggi", "tsv", rows=500, gz=True)
+    serve("gaf", "fb", rows=300)
+
+    events = []
+    with Events.subscribed(events.append):
+        df = pd.concat(list(FBD().download_file("ggi", chunksize=120)))
+        FBD().download_file("gaf")
+        assert ContentStore.datasets() == ["gaf", "ggi"]
+
+        gene = df["Ending_gene(s)_FBgn"].iloc[7]
+        hits = FBD.search_content(f"{gene} suppressible", limit=None)
+
+    mentions = df.apply(lambda row: row.astype(str).str.lower().str.contains(r"\bsuppressible\b").any(), axis=1)
+    expected = set(df.index[mentions | (df == gene).any(axis=1)])
+    assert set(hits.loc[hits["dataset"] == "ggi", "row"]) == expected
+    assert hits["score"].is_monotonic_decreasing
+    # The row naming the rare gene outranks rows holding only the common term.
+    assert hits.iloc[0]["dataset"] == "ggi" and (df.iloc[hits.iloc[0]["row"]] == gene).any()
+    assert [e.name for e in events].count("index.content") == 2
+
+    search = [e for e in events if e.name == "index.search"][0]
+    assert search.fields["searched"] == 2 and search.fields["terms"] == 2
+    assert FBD.search_content("nothingmatchesthis").empty
+
+
+def test_changed_file_reindexes_only_that_dataset(serve, cache):
+    ggi = serve("ggi", "tsv", rows=50)
+    serve("gaf", "fb", rows=50)
+
+    FBD().download_file("ggi")
+    FBD().download_file("gaf")
+    gaf_index = ContentStore.path("gaf").stat().st_mtime_ns
+
+    local = cache / "downloads" / ggi["filename"]
+    lines = local.read_text().splitlines(keepends=True)
+    lines.insert(-1, "zyx\tFBgn0000001\tzyx\tFBgn0000002\tsupercalifragilistic\tFBrf0000001\n")
+    local.write_text("".join(lines))
+    assert ContentStore.load("ggi") is None
+    assert FBD.search_content("supercalifragilistic").empty
+
+    FBD().download_file("ggi")
+    hits = FBD.search_content("supercalifragilistic")
+
+    assert hits[["dataset", "row"]].values.tolist() == [["ggi", 50]]
+    assert ContentStore.path("gaf").stat().st_mtime_ns == gaf_index
+
+
+def test_without_indexing_search_with_datasets_builds_the_index(serve, monkeypatch):
+    monkeypatch.setattr(Config, "INDEX_CONTENT", False)
+    serve("ggi", "tsv", rows=50)
+
+    FBD().download_file("ggi")
+    assert ContentStore.datasets() == []
+    assert FBD.search_content("suppressible").empty
+    assert set(FBD.search_content("suppressible", datasets="ggi")["dataset"]) == {"ggi"}
@@ -0,0 +1,50 @@
+import io
+from unittest.mock import MagicMock
+
+import pytest
+import requests
+from urllib3.exceptions import ProtocolError
+
+from benchmarks import fixtures
+from benchmarks.server import EdgeFunctionStub
+from FBD.client.transfer import Transfer
+
+
+def test_to_file_reuses_one_buffer_and_reports_progress(tmp_path, monkeypatch):
+    payload = bytes(range(256)) * 1000
+    response = MagicMock()
+    response.raw = io.BytesIO(payload)
+    response.headers = {"Content-Length": str(len(payload))}
+    monkeypatch.setattr(Transfer, "PROGRESS_INTERVAL", 0)
+
+    updates = []
+    written = Transfer.to_file(response, tmp_path / "out", progress=updates.append, buffer_size=4096)
+
+    assert written == len(payload)
+    assert (tmp_path / "out").read_bytes() == payload
+    reads = -(-len(payload) // 4096)
+    assert [u["bytes"] for u in updates[:-1]] == [min(i * 4096, len(payload)) for i in range(1, reads + 1)]
+    last = updates[-1]
+    assert last["done"] is True and last["bytes"] == last["total"] == len(payload)
+    assert last["bytes_per_second"] > 0
+
+
+def test_to_file_maps_urllib3_errors_to_requests(tmp_path):
+    response = MagicMock()
+    response.raw.readinto.side_effect = ProtocolError("connection broken")
+
+    with pytest.raises(requests.exceptions.ChunkedEncodingError):
+        Transfer.to_file(response, tmp_path / "out")
+
+
+def test_to_file_against_local_http_server(tmp_path):
+    meta = fixtures.build(tmp_path / "fixtures", "tsv", rows=2000, gz=True)
+    updates = []
+
+    with EdgeFunctionStub({"interactions": meta}, chunk_size=1000) as stub:
+        response = requests.get(f"{stub.url}/files/{meta['filename']}", stream=True, timeout=10)
+        written = Transfer.to_file(response, tmp_path / "out.gz", progress=updates.append, buffer_size=1 << 12)
+
+    assert (tmp_path / "out.gz").read_bytes() == meta["path"].read_bytes()
+    assert written == meta["path"].stat().st_size
+    assert updates[-1]["total"] == written and updates[-1]["done"] is True